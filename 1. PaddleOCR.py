@@ -1,293 +1,512 @@
 # 간단하고 안정적인 PaddleOCR 프로그램
 import os
-import json
-from PIL import Image, ImageDraw, ImageFont
+import sys
+import time
+import argparse
+import itertools
+import threading
+import queue
+from collections import deque
+import multiprocessing
 import numpy as np
+from ocr_cache import OCRResultCache
+from ocr_cascade import (STAT_NAMES, CascadeConfig, build_cascade,
+                         summarize as summarize_cascade, print_report as print_cascade_report)
+from ocr_crop_cache import COUNTER_NAMES, CropCache, CropCacheEngine, summarize, print_report
+from ocr_layout import LayoutConfig
+from ocr_engine import get_engine, warmup_engine, registry
+from ocr_stream import prefetch, read_and_decode
+from ocr_result import OCRResult
+from ocr_metrics import metrics
+from ocr_tiling import TileConfig, needs_tiling, extract_tiled
+from ocr_preprocess import preprocess_image, preprocessing_loader
+from ocr_document import OCRDocument, load_image, source_label, draw_results
+from ocr_multipage import DEFAULT_DPI, is_document, iter_pages
+from ocr_files import iter_files, parse_shard, in_shard, SNIFF_MODES
+from ocr_writer import ShardedResultWriter
+from ocr_manifest import RunManifest
+from ocr_workqueue import WorkQueue
+from ocr_output import BackgroundOutput
+from ocr_visualize import VisualizeConfig
+from ocr_autotune import available_cpus, load_profile
+from ocr_scheduler import DEFAULT_LANES, SizeScheduler, estimate_pixels
 
-# PaddleOCR import
-try:
-    from paddleocr import PaddleOCR
-    print("PaddleOCR 모듈 로드 성공")
-except ImportError as e:
-    print(f"PaddleOCR 모듈 로드 실패: {e}")
-    exit(1)
+# PaddleOCR는 엔진이 처음 필요할 때 레지스트리(ocr_engine)에서 import합니다.
+# 이 모듈을 import하는 것만으로는 Paddle을 로드하지 않습니다.
 
 class SimpleOCR:
-    def __init__(self, lang='en'):
+    def __init__(self, lang='en', cpu_threads=None, cache=None, verbose=False, tiling=True,
+                 preprocess=None, output=None, visualize=True, cascade=None, layout=None, crop_cache=None,
+                 device=None):
         """
         간단한 OCR 클래스
         
         Args:
             lang (str): 언어 설정 ('en', 'korean', 'ch' 등)
+            cpu_threads (int): CPU 추론 스레드 수 (None이면 PaddleOCR 기본값)
+            cache (OCRResultCache or str): 결과 캐시 또는 캐시 파일 경로 (None이면 사용 안 함)
+            verbose (bool): 인식된 텍스트를 한 줄씩 출력할지 여부
+            tiling (TileConfig or bool): 큰 이미지 타일 모드 설정
+                                         (True면 기본 설정, False면 항상 한 번에 처리)
+            preprocess (PreprocessConfig): 전처리(기울기 보정/이진화/노이즈 제거) 설정
+                                           (None이면 전처리 없음)
+            output (BackgroundOutput or int): 결과 저장을 백그라운드에서 처리할 출력 단계
+                                              (정수면 그 크기의 대기열로 생성, None이면 호출 스레드에서 저장)
+            visualize (VisualizeConfig or bool): save_results()의 시각화 설정
+                                                 (True면 원본 크기 JPEG, False면 시각화 생략)
+            cascade (CascadeConfig): 2단계 캐스케이드 설정 - 신뢰도가 낮은 라인만 무거운 모델로 재인식
+                                     (None이면 한 모델만 사용)
+            layout (LayoutConfig or bool): 레이아웃 분석 설정 - 평문/텍스트/JSON을 단 → 줄 → 문단의
+                                           읽기 순서로 출력 (True면 기본 설정, None이면 검출 순서)
+            crop_cache (CropCache or str or bool): 조각 캐시 - 반복되는 텍스트 라인(양식 라벨, 머리글 등)은
+                                                   인식을 생략하고 이전 결과 재사용
+                                                   (True면 메모리에만, 경로면 SQLite 저장소와 함께, None이면 사용 안 함)
+            device (str): 엔진 장치 ('cpu', 'gpu', 'stub' - PaddleOCR 없는 가짜 엔진, None이면 PaddleOCR 기본값)
         """
         print(f"OCR 초기화 중... 언어: {lang}")
+        self.verbose = verbose
+        self.tiling = TileConfig() if tiling is True else (tiling or None)
+        self.preprocess = preprocess
+        # 레이아웃은 결과의 후처리라 캐시 키(settings)에는 넣지 않음
+        self.layout = LayoutConfig() if layout is True else (layout or None)
+        self.output = BackgroundOutput(max_pending=output) if isinstance(output, int) and output > 0 else output
+        self.visualize = VisualizeConfig() if visualize is True else (visualize or None)
+        self.cache = OCRResultCache(cache) if isinstance(cache, str) else cache
+        load_start = time.perf_counter()
         try:
-            # 최소한의 설정으로 시작
-            self.ocr = PaddleOCR(lang=lang)
+            # 최소한의 설정으로 시작 (같은 설정의 모델은 레지스트리에서 공유)
+            options = {'lang': lang}
+            if device:
+                options['device'] = device
+            if cpu_threads:
+                options['cpu_threads'] = cpu_threads
+            self.ocr = get_engine(**options)
+            self.engine_options = options
             print("OCR 초기화 완료")
         except Exception as e:
             print(f"OCR 초기화 실패: {e}")
             # 언어 설정 없이 재시도
             try:
-                self.ocr = PaddleOCR()
+                self.ocr = get_engine()
+                self.engine_options = {}
                 print("OCR 초기화 완료 (기본 설정)")
             except Exception as e2:
                 print(f"기본 설정으로도 초기화 실패: {e2}")
                 raise e2
+        # 캐시 키에 쓰는 설정 (전처리 결과가 다르면 다른 항목으로 저장)
+        self.settings = dict(self.engine_options)
+        if self.preprocess is not None:
+            self.settings['preprocess'] = self.preprocess.to_dict()
+        # 타일 모드 여부/설정에 따라 결과가 다르므로 캐시 키에 포함
+        self.settings['tiling'] = self.tiling.to_dict() if self.tiling is not None else None
+        # 캐스케이드: 검출/1차 인식은 가벼운 모델, 기준 미만 라인만 무거운 모델로 재인식
+        self.cascade = cascade
+        if cascade is not None:
+            self.ocr = build_cascade(self.engine_options, cascade)
+            self.settings['cascade'] = cascade.to_dict()
+        # 조각 캐시: 검출과 인식 사이에서 거의 같은 조각은 이전 인식 결과 재사용
+        self.crop_cache = CropCache() if crop_cache is True else (
+            CropCache(store_path=crop_cache) if isinstance(crop_cache, str) else crop_cache)
+        if self.crop_cache is not None:
+            try:
+                self.ocr = CropCacheEngine(self.ocr, self.crop_cache, self.settings)
+            except ValueError as e:
+                print(f"조각 캐시 사용 안 함: {e}")
+                self.crop_cache = None
+        # 시작 시간 (엔진 로드는 Paddle import 포함, 추론 시간은 warmup()에서 기록)
+        self.startup = {'load_seconds': time.perf_counter() - load_start,
+                        'first_inference_seconds': None, 'warm_inference_seconds': None}
+    
+    def warmup(self, runs=2):
+        """
+        더미 추론으로 모델 초기화와 커널 준비를 미리 수행 (첫 요청의 지연 제거)
+        
+        Args:
+            runs (int): 더미 추론 횟수 (2회 이상이면 워밍된 추론 시간도 측정)
+            
+        Returns:
+            dict: 시작 시간 - load_seconds(엔진 로드), first_inference_seconds(첫 추론),
+                  warm_inference_seconds(워밍된 추론), cold_start_seconds(로드 + 첫 추론)
+        """
+        timings = warmup_engine(self.ocr, runs)
+        self.startup['first_inference_seconds'] = timings[0]
+        self.startup['warm_inference_seconds'] = timings[-1] if len(timings) > 1 else None
+        self.startup['cold_start_seconds'] = self.startup['load_seconds'] + timings[0]
+        warm = self.startup['warm_inference_seconds']
+        print(f"콜드 스타트: {self.startup['cold_start_seconds']:.2f}초 "
+              f"(엔진 로드 {self.startup['load_seconds']:.2f}초 + 첫 추론 {timings[0]:.2f}초)"
+              + (f", 워밍된 추론: {warm:.3f}초" if warm is not None else ""))
+        return self.startup
+    
+    def document(self, image, name=None):
+        """
+        이미지 한 장의 처리 세션 생성 (디코딩/추론 결과를 모든 출력에서 재사용)
+        
+        Args:
+            image: 이미지 경로, 바이트, BGR NumPy 배열, PIL 이미지 (OCRDocument면 그대로 반환)
+            name (str): 결과에 기록할 이름 (None이면 경로 또는 입력 형식)
+            
+        Returns:
+            OCRDocument: 문서 세션
+        """
+        if isinstance(image, OCRDocument):
+            return image
+        return OCRDocument(image, self._extract_timed, name, self.layout)
+    
+    def _extract_timed(self, image, cache_source, label):
+        """OCRDocument용 추출 함수 (처리 시간 포함)"""
+        start_time = time.time()
+        texts, result = self._extract(image, cache_source, label)
+        return texts, result, time.time() - start_time
     
-    def extract_text(self, image_path):
+    def extract_text(self, image):
         """
         이미지에서 텍스트 추출
         
         Args:
-            image_path (str): 이미지 파일 경로
+            image: 이미지 경로, 바이트, BGR NumPy 배열, PIL 이미지 또는 OCRDocument
+            
+        Returns:
+            tuple: (OCRResult, 원시 결과) - 캐시 적중 시 원시 결과는 None
+                   OCRResult는 [{'text', 'confidence', 'bbox'}, ...] 리스트처럼 사용할 수 있음
+        """
+        document = self.document(image)
+        return document.texts, document.raw
+    
+    def _extract(self, image, cache_source, label, preprocessed=False):
+        """
+        텍스트 추출 본체
+        
+        Args:
+            image: PaddleOCR 입력 (이미지 경로 또는 BGR NumPy 배열)
+            cache_source: 캐시 키 계산에 사용할 원본 (이미지 경로 또는 원본 바이트)
+            label (str): 로그에 표시할 이름
+            preprocessed (bool): image가 이미 전처리된 배열인지 여부
             
         Returns:
-            tuple: (텍스트 리스트, 원시 결과)
+            tuple: (OCRResult, 원시 결과)
         """
-        print(f"이미지 분석 중: {image_path}")
+        print(f"이미지 분석 중: {label}")
+        
+        cache_key = None
+        if self.cache is not None:
+            try:
+                cache_key = self.cache.make_key(cache_source, self.settings)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    print(f"캐시 적중: {len(cached)}개의 텍스트 블록")
+                    metrics.inc('cache_hits')
+                    return OCRResult.from_dicts(cached), None
+            except Exception as cache_error:
+                print(f"캐시 조회 실패 (OCR 실행으로 진행): {cache_error}")
+                cache_key = None
         
         try:
-            # OCR 실행
-            result = self.ocr.ocr(image_path)
+            if self.preprocess is not None and not preprocessed:
+                image = self._preprocess(image)
+            
+            if needs_tiling(image, self.tiling):
+                return self._extract_tiled(image, cache_key)
             
-            print(f"OCR 결과 타입: {type(result)}")
-            print(f"OCR 결과 길이: {len(result) if result else 0}")
+            # OCR 실행 (검출/방향 분류/인식 단계 시간은 엔진 계측 프록시가 기록)
+            with metrics.stage('inference'):
+                result = self.ocr.ocr(image)
+            metrics.inc('images')
             
             if not result:
                 print("OCR 결과가 없습니다.")
-                return [], result
+                self._store_cache(cache_key, [])
+                return OCRResult.empty(), result
             
-            # 결과 처리 - 딕셔너리 형태 결과 처리
-            texts = []
+            # 결과 처리 - 세 가지 결과 형식을 하나의 정규화 함수로 처리
+            with metrics.stage('parse'):
+                texts = OCRResult.from_raw(result)
+            metrics.inc('lines', len(texts))
+            print(f"결과 형식: {texts.source_format}")
             
-            # result[0]이 딕셔너리인 경우 (최신 PaddleOCR 형태)
-            if len(result) > 0 and isinstance(result[0], dict):
-                page_result = result[0]
-                print(f"딕셔너리 형태 결과 감지")
-                print(f"딕셔너리 키들: {list(page_result.keys())}")
-                
-                if 'rec_texts' in page_result and 'rec_scores' in page_result:
-                    rec_texts = page_result['rec_texts']
-                    rec_scores = page_result['rec_scores']
-                    rec_boxes = page_result.get('rec_boxes', [])
-                    
-                    print(f"감지된 텍스트 개수: {len(rec_texts)}")
-                    print(f"신뢰도 개수: {len(rec_scores)}")
-                    print(f"박스 개수: {len(rec_boxes)}")
-                    
-                    for i in range(len(rec_texts)):
-                        text = rec_texts[i] if i < len(rec_texts) else ""
-                        confidence = rec_scores[i] if i < len(rec_scores) else 0.0
-                        
-                        # rec_boxes에서 좌표 추출
-                        if i < len(rec_boxes):
-                            # rec_boxes는 [x1, y1, x2, y2] 형태일 수 있음
-                            box = rec_boxes[i]
-                            if len(box) == 4:  # [x1, y1, x2, y2]
-                                x1, y1, x2, y2 = box
-                                bbox = [[int(x1), int(y1)], [int(x2), int(y1)], [int(x2), int(y2)], [int(x1), int(y2)]]
-                            else:
-                                # NumPy 배열을 Python 리스트로 변환
-                                bbox = [[int(p[0]), int(p[1])] for p in box] if hasattr(box, '__iter__') else []
-                        else:
-                            bbox = []
-                        
-                        if text and str(text).strip():
-                            texts.append({
-                                'text': str(text),
-                                'confidence': float(confidence),
-                                'bbox': bbox
-                            })
-                            print(f"텍스트 {i+1}: '{text}' (신뢰도: {confidence:.3f})")
-                
-            # 기존 리스트 형태 결과 처리 (이전 버전 호환성)
-            elif len(result) > 0 and isinstance(result[0], list):
-                page_result = result[0]
-                print(f"리스트 형태 결과 감지")
-                print(f"감지된 텍스트 블록 개수: {len(page_result) if page_result else 0}")
-                
-                if page_result:
-                    for i, line in enumerate(page_result):
-                        try:
-                            if line and len(line) >= 2:
-                                bbox = line[0]  # 좌표
-                                text_info = line[1]  # 텍스트 정보
-                                
-                                # text_info의 형식 확인
-                                if isinstance(text_info, (list, tuple)) and len(text_info) >= 2:
-                                    # 표준 형식: (text, confidence)
-                                    text = text_info[0]
-                                    confidence = text_info[1]
-                                elif isinstance(text_info, str):
-                                    # 텍스트만 있는 경우
-                                    text = text_info
-                                    confidence = 1.0
-                                else:
-                                    print(f"예상하지 못한 text_info 형식: {text_info}")
-                                    continue
-                                
-                                if text and str(text).strip():
-                                    # NumPy 배열을 JSON 호환 형태로 변환
-                                    json_bbox = []
-                                    if bbox and hasattr(bbox, '__iter__'):
-                                        try:
-                                            if hasattr(bbox, 'tolist'):
-                                                json_bbox = bbox.tolist()
-                                            else:
-                                                json_bbox = [[int(p[0]), int(p[1])] for p in bbox]
-                                        except:
-                                            json_bbox = []
-                                    
-                                    texts.append({
-                                        'text': str(text),
-                                        'confidence': float(confidence),
-                                        'bbox': json_bbox
-                                    })
-                                    print(f"텍스트 {i+1}: '{text}' (신뢰도: {confidence:.3f})")
-                                    
-                        except Exception as line_error:
-                            print(f"라인 {i+1} 처리 중 오류: {line_error}")
-                            continue
-            
-            else:
-                print(f"예상하지 못한 결과 형태: {type(result[0]) if len(result) > 0 else 'empty'}")
+            if self.verbose:
+                for i, (text, confidence) in enumerate(zip(texts.texts, texts.scores.tolist()), 1):
+                    print(f"텍스트 {i}: '{text}' (신뢰도: {confidence:.3f})")
             
             print(f"총 {len(texts)}개의 텍스트 블록 발견")
+            self._store_cache(cache_key, texts)
             return texts, result
             
         except Exception as e:
             print(f"OCR 처리 중 오류: {e}")
+            metrics.inc('errors')
             import traceback
             traceback.print_exc()
-            return [], None
+            return OCRResult.empty(), None
+    
+    def _extract_tiled(self, image, cache_key):
+        """
+        큰 이미지를 겹치는 타일로 나눠 처리 (박스는 원본 이미지 좌표)
+        
+        Returns:
+            tuple: (OCRResult, None) - 타일 모드에는 단일 원시 결과가 없음
+        """
+        if not hasattr(image, 'shape'):
+            _, image = read_and_decode(image)
+        with metrics.stage('inference'):
+            texts = extract_tiled(self.ocr, image, self.tiling,
+                                  engine_factory=self._engine_replica)
+        metrics.inc('images')
+        metrics.inc('lines', len(texts))
+        print(f"총 {len(texts)}개의 텍스트 블록 발견 (타일 모드)")
+        self._store_cache(cache_key, texts)
+        return texts, None
+    
+    def _cascade_engine(self):
+        """캐스케이드 엔진 (조각 캐시를 쓰면 그 안쪽 엔진, 캐스케이드가 없으면 None)"""
+        if self.cascade is None:
+            return None
+        return self.ocr.engine if self.crop_cache is not None else self.ocr
+    
+    def cascade_report(self):
+        """
+        캐스케이드 통계 (타일 병렬 처리용 복제본 포함)
+        
+        Returns:
+            dict: ocr_cascade.summarize() 결과 (캐스케이드를 쓰지 않으면 None)
+        """
+        engine = self._cascade_engine()
+        return engine.report() if engine is not None else None
+    
+    def print_cascade_report(self):
+        """캐스케이드 통계 출력 (캐스케이드를 쓰지 않으면 출력하지 않음)"""
+        engine = self._cascade_engine()
+        if engine is not None:
+            engine.print_report()
     
-    def get_plain_text(self, image_path):
+    def _engine_replica(self, replica):
+        """타일 병렬 처리용 엔진 복제본 (캐스케이드면 두 모델 모두 복제, 통계와 조각 캐시는 공유)"""
+        if self.cascade is not None:
+            engine = build_cascade(self.engine_options, self.cascade, replica,
+                                   share_stats_with=self._cascade_engine())
+        else:
+            engine = get_engine(**self.engine_options, replica=replica)
+        if self.crop_cache is not None:
+            engine = CropCacheEngine(engine, self.crop_cache, self.settings)
+        return engine
+    
+    def _preprocess(self, image):
+        """이미지를 디코딩하고 설정된 전처리 적용"""
+        if not hasattr(image, 'shape'):
+            _, image = read_and_decode(image)
+        image, report = preprocess_image(image, self.preprocess)
+        timings = ', '.join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in report['timings'].items())
+        print(f"전처리: {', '.join(report['applied']) or '생략'} "
+              f"(기울기 {report['skew']:.2f}°, 대비 {report['contrast']:.0f}, 노이즈 {report['noise']:.1f}; {timings})")
+        return image
+    
+    def _store_cache(self, cache_key, texts):
+        """추출 결과를 캐시에 저장 (캐시 오류는 OCR 결과에 영향을 주지 않음)"""
+        if self.cache is None or cache_key is None:
+            return
+        try:
+            self.cache.put(cache_key, texts)
+        except Exception as cache_error:
+            print(f"캐시 저장 실패: {cache_error}")
+    
+    def _cached_result(self, cache_source):
+        """
+        캐시에 있는 결과 (디코딩 스레드에서 전처리 전에 호출)
+        
+        Returns:
+            OCRResult: 캐시된 결과 (캐시를 쓰지 않거나 없으면 None)
+        """
+        if self.cache is None:
+            return None
+        try:
+            cached = self.cache.get(self.cache.make_key(cache_source, self.settings))
+        except Exception:
+            # 조회 실패는 추출 단계에서 다시 조회하며 보고
+            return None
+        return OCRResult.from_dicts(cached) if cached is not None else None
+    
+    def iter_extract(self, images, prefetch_size=4, decode_workers=2):
+        """
+        여러 이미지를 순서대로 처리하며 결과가 준비되는 즉시 반환하는 제너레이터
+        
+        이미지 읽기/디코딩은 백그라운드 스레드에서 최대 prefetch_size개까지 미리
+        진행되므로 모델이 디스크를 기다리지 않으며, 입력 개수와 관계없이
+        메모리 사용량이 일정합니다.
+        
+        Args:
+            images (iterable): 이미지 경로/바이트/배열/PIL 이미지 (지연 이터레이터 가능)
+            prefetch_size (int): 미리 디코딩해 둘 최대 이미지 수
+            decode_workers (int): 디코딩 스레드 수
+            
+        Yields:
+            tuple: (입력 항목, 텍스트 리스트, 오류) - 읽기/디코딩 실패 시 오류는 예외 객체
+        """
+        # 캐시 조회와 전처리도 디코딩 스레드에서 수행되어 이전 이미지의 추론과 겹쳐 실행됨
+        loader = preprocessing_loader(load_image, self.preprocess, self._cached_result)
+        loaded = prefetch(images, loader,
+                          max_workers=decode_workers, max_ahead=prefetch_size)
+        for item, decoded, error in loaded:
+            if error is not None:
+                print(f"이미지 로드 실패: {source_label(item)} - {error}")
+                yield item, OCRResult.empty(), error
+                continue
+            cache_source, image, cached = decoded
+            if cached is not None:
+                print(f"이미지 분석 중: {source_label(item)}")
+                print(f"캐시 적중: {len(cached)}개의 텍스트 블록")
+                metrics.inc('cache_hits')
+                yield item, cached, None
+                continue
+            texts, _ = self._extract(image, cache_source, source_label(item), preprocessed=True)
+            yield item, texts, None
+    
+    def iter_extract_pages(self, path, dpi=DEFAULT_DPI, lookahead=2):
+        """
+        다중 페이지 문서(PDF, TIFF)를 페이지 단위로 처리하는 제너레이터
+        
+        페이지는 한 장씩 렌더링되어 일반 이미지와 같은 추출 경로(전처리, 타일 모드,
+        캐시)를 거칩니다. 다음 페이지 렌더링은 현재 페이지 추론과 겹쳐 실행되며
+        메모리에는 최대 lookahead + 1 페이지만 올라갑니다.
+        
+        Args:
+            path (str): PDF 또는 TIFF 파일 경로
+            dpi (int): 렌더링 해상도
+            lookahead (int): 미리 렌더링해 둘 최대 페이지 수
+            
+        Yields:
+            tuple: (페이지 번호(0부터), OCRResult, 오류) - 렌더링 실패 시 오류는 예외 객체
+        """
+        transform = None
+        if self.preprocess is not None:
+            transform = lambda page: preprocess_image(page, self.preprocess)[0]
+        for page_index, image, error in iter_pages(path, dpi, lookahead, transform):
+            label = f"{source_label(path)} [페이지 {page_index + 1}]"
+            if error is not None:
+                print(f"페이지 로드 실패: {label} - {error}")
+                yield page_index, OCRResult.empty(), error
+                continue
+            texts, _ = self._extract(image, image, label, preprocessed=True)
+            yield page_index, texts, None
+    
+    def extract_document(self, path, dpi=DEFAULT_DPI, lookahead=2):
+        """
+        다중 페이지 문서의 결과를 페이지 번호와 함께 묶어서 반환
+        
+        Args:
+            path (str): PDF 또는 TIFF 파일 경로
+            dpi (int): 렌더링 해상도
+            lookahead (int): 미리 렌더링해 둘 최대 페이지 수
+            
+        Returns:
+            dict: {'document_path', 'total_pages', 'total_blocks',
+                   'pages': [{'page_index', 'total_blocks', 'results'}, ...]}
+        """
+        pages = []
+        for page_index, texts, error in self.iter_extract_pages(path, dpi, lookahead):
+            page = {'page_index': page_index, 'total_blocks': len(texts), 'results': texts.to_dicts()}
+            if error is not None:
+                page['error'] = f"{type(error).__name__}: {error}"
+            pages.append(page)
+        return {
+            'document_path': source_label(path),
+            'total_pages': len(pages),
+            'total_blocks': sum(page['total_blocks'] for page in pages),
+            'pages': pages
+        }
+    
+    def get_plain_text(self, image):
         """
         이미지에서 평문 텍스트만 추출
         
         Args:
-            image_path (str): 이미지 파일 경로
+            image: 이미지 경로, 바이트, BGR NumPy 배열, PIL 이미지 또는 OCRDocument
             
         Returns:
             str: 추출된 텍스트
         """
-        texts, _ = self.extract_text(image_path)
+        document = self.document(image)
         
-        if not texts:
+        if not document.texts:
             return ""
         
-        # 텍스트만 추출하여 줄바꿈으로 연결
-        plain_texts = [item['text'] for item in texts]
-        return '\n'.join(plain_texts)
+        # 레이아웃 설정이 있으면 읽기 순서(문단은 빈 줄로 구분), 없으면 검출 순서로 줄바꿈 연결
+        return document.plain_text()
     
-    def save_results(self, image_path, output_prefix="ocr_result"):
+    def save_results(self, image, output_prefix="ocr_result"):
         """
         OCR 결과를 다양한 형태로 저장
         
+        OCRDocument를 넘기면 이미 계산된 결과와 디코딩된 픽셀을 그대로 사용합니다.
+        
         Args:
-            image_path (str): 이미지 파일 경로
+            image: 이미지 경로, 바이트, BGR NumPy 배열, PIL 이미지 또는 OCRDocument
             output_prefix (str): 출력 파일 접두사
         """
-        texts, raw_result = self.extract_text(image_path)
+        document = self.document(image)
         
-        if not texts:
+        if not document.texts:
             print("저장할 텍스트가 없습니다.")
             return
         
-        # 1. 텍스트 파일로 저장
-        txt_path = f"{output_prefix}.txt"
-        with open(txt_path, 'w', encoding='utf-8') as f:
-            for item in texts:
-                f.write(f"{item['text']}\n")
-        print(f"텍스트 파일 저장: {txt_path}")
-        
-        # 2. JSON 파일로 저장 (상세 정보 포함)
-        json_path = f"{output_prefix}.json"
-        json_data = {
-            'image_path': image_path,
-            'total_blocks': len(texts),
-            'results': texts
-        }
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
-        print(f"JSON 파일 저장: {json_path}")
+        # 출력 단계가 있으면 저장은 백그라운드에서, 호출 스레드는 바로 다음 이미지로
+        if self.output is not None:
+            self.output.submit(self._write_results, document, output_prefix)
+        else:
+            self._write_results(document, output_prefix)
+    
+    def _write_results(self, document, output_prefix):
+        """텍스트/JSON/시각화 파일 저장 (출력 스레드 또는 호출 스레드에서 실행)"""
+        with metrics.stage('write'):
+            # 1. 텍스트 파일로 저장
+            document.save_text(f"{output_prefix}.txt")
+            
+            # 2. JSON 파일로 저장 (상세 정보 포함)
+            document.save_json(f"{output_prefix}.json")
         
-        # 3. 시각화 이미지 저장
-        self.visualize_results(image_path, texts, f"{output_prefix}_visual.jpg")
+        # 3. 시각화 저장 (디코딩해 둔 픽셀 재사용, 표본 추출 설정이면 일부만)
+        if self.visualize is not None:
+            with metrics.stage('visualize'):
+                document.visualize(f"{output_prefix}{self.visualize.suffix()}", self.visualize)
+    
+    def flush_output(self):
+        """백그라운드 출력 단계에 남은 저장 작업이 모두 끝날 때까지 대기"""
+        if self.output is not None:
+            self.output.flush()
     
-    def visualize_results(self, image_path, texts, output_path):
+    def visualize_results(self, image, texts, output_path, config=None):
         """
         OCR 결과를 시각화하여 이미지로 저장
         
         Args:
-            image_path (str): 원본 이미지 경로
-            texts (list): 추출된 텍스트 리스트
-            output_path (str): 출력 이미지 경로
+            image: 원본 이미지 (경로, 바이트, BGR 배열, PIL 이미지 또는 OCRDocument)
+            texts (OCRResult or list): 추출된 텍스트 리스트
+            output_path (str): 출력 경로 (SVG/JSON 오버레이는 config.format으로 지정)
+            config (VisualizeConfig): 축소 캔버스, 신뢰도 필터, 표본 추출 등 시각화 설정
+                                      (None이면 원본 크기 JPEG)
         """
-        try:
-            # 원본 이미지 로드
-            image = Image.open(image_path).convert('RGB')
-            draw = ImageDraw.Draw(image)
-            
-            # 기본 폰트 사용
-            try:
-                font = ImageFont.load_default()
-            except:
-                font = None
-            
-            # 각 텍스트 블록에 대해 박스와 텍스트 그리기
-            for i, item in enumerate(texts):
-                bbox = item['bbox']
-                text = item['text']
-                confidence = item['confidence']
-                
-                if len(bbox) >= 4:
-                    # 박스 좌표 추출 (4개 점의 좌표)
-                    points = [(int(p[0]), int(p[1])) for p in bbox]
-                    
-                    # 박스 그리기
-                    draw.polygon(points, outline='red', width=2)
-                    
-                    # 텍스트 표시
-                    text_to_show = f"{text} ({confidence:.2f})"
-                    text_x = int(bbox[0][0])
-                    text_y = int(bbox[0][1]) - 20
-                    
-                    # 배경 박스
-                    if font:
-                        try:
-                            bbox_text = draw.textbbox((text_x, text_y), text_to_show, font=font)
-                            draw.rectangle(bbox_text, fill='yellow', outline='red')
-                            draw.text((text_x, text_y), text_to_show, fill='black', font=font)
-                        except:
-                            draw.text((text_x, text_y), text_to_show, fill='red')
-                    else:
-                        draw.text((text_x, text_y), text_to_show, fill='red')
-            
-            # 이미지 저장
-            image.save(output_path)
-            print(f"시각화 이미지 저장: {output_path}")
-            
-        except Exception as e:
-            print(f"시각화 중 오류: {e}")
+        if isinstance(image, OCRDocument):
+            image = image.image
+        return draw_results(image, texts, output_path, config)
 
-def find_image_files(directory="."):
-    """현재 디렉토리에서 이미지 파일 찾기"""
-    image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp']
-    image_files = []
-    
-    for file in os.listdir(directory):
-        if any(file.lower().endswith(ext) for ext in image_extensions):
-            image_files.append(file)
+def find_image_files(directory=".", include_documents=False, recursive=False, sniff='auto'):
+    """
+    디렉토리에서 이미지 파일 찾기 (directory 기준 상대 경로, 폴더별 이름순)
     
-    return image_files
+    Args:
+        directory (str): 검색할 디렉토리
+        include_documents (bool): 다중 페이지 문서(PDF, TIFF)도 포함할지 여부
+        recursive (bool): 하위 폴더까지 검색할지 여부
+        sniff (str): 형식 판별 방식 ('auto', 'extension', 'magic' - iter_files() 참고)
+    """
+    # 하위 폴더 탐색/내용 확인은 iter_files() 사용
+    return [os.path.relpath(path, directory) for path in iter_files(
+        directory, recursive=recursive, sniff=sniff, include_documents=include_documents, ordered=True)]
 
 def main():
     print("=== 간단한 PaddleOCR 텍스트 추출 프로그램 ===\n")
     
-    # 이미지 파일 찾기
-    image_files = find_image_files()
+    # 이미지 파일 찾기 (현재 디렉토리에 없으면 하위 폴더까지)
+    image_files = find_image_files() or find_image_files(recursive=True)
     
     if not image_files:
         print("현재 디렉토리에 이미지 파일이 없습니다.")
@@ -302,14 +521,15 @@ def main():
     languages_to_try = ['korean', 'ch', 'en']
     
     ocr = None
+    document = None
     for lang in languages_to_try:
         try:
             print(f"언어 '{lang}'로 OCR 초기화 시도...")
             ocr = SimpleOCR(lang=lang)
             
-            # 바로 테스트해보기
-            test_texts, _ = ocr.extract_text(image_path)
-            if test_texts:
+            # 바로 테스트해보기 (이 결과를 아래 출력/저장에서 그대로 재사용)
+            document = ocr.document(image_path)
+            if document.texts:
                 print(f"언어 '{lang}'로 텍스트 감지 성공!")
                 break
             else:
@@ -319,13 +539,13 @@ def main():
             print(f"언어 '{lang}' 초기화 실패: {e}")
             continue
     
-    if not ocr:
+    if not ocr or document is None:
         print("모든 언어 설정으로 OCR 초기화에 실패했습니다.")
         return
     
     # 1. 간단한 텍스트 추출
     print("\n1. 평문 텍스트 추출:")
-    plain_text = ocr.get_plain_text(image_path)
+    plain_text = document.plain_text()
     if plain_text:
         print(plain_text)
     else:
@@ -335,7 +555,7 @@ def main():
     
     # 2. 상세 결과
     print("2. 상세 결과:")
-    texts, _ = ocr.extract_text(image_path)
+    texts = document.texts
     
     if texts:
         for i, item in enumerate(texts, 1):
@@ -353,10 +573,13 @@ def main():
     # 3. 결과 저장
     if texts:
         print("3. 결과 저장 중...")
-        ocr.save_results(image_path, "ocr_output")
+        ocr.save_results(document, "ocr_output")
         print("저장 완료!")
     else:
         print("3. 저장할 결과가 없습니다.")
+    
+    # 모델 로드 현황 (모델당 한 번만 로드됨)
+    registry.print_report()
 
 def try_different_settings(image_path):
     """다양한 설정으로 OCR 시도"""
@@ -373,7 +596,8 @@ def try_different_settings(image_path):
         try:
             print(f"\n설정 {i+1}: {settings}")
             
-            ocr = PaddleOCR(**settings)
+            # 이미 로드된 모델은 레지스트리에서 재사용
+            ocr = get_engine(**settings)
             
             # OCR 실행
             result = ocr.ocr(image_path)
@@ -394,51 +618,557 @@ def try_different_settings(image_path):
     print("모든 설정으로 시도했지만 텍스트를 감지하지 못했습니다.")
     return None
 
-def batch_process(input_folder, output_folder):
+# 워커 프로세스마다 한 번만 생성되어 재사용되는 OCR 인스턴스
+_worker_ocr = None
+# 조각 캐시/캐스케이드 카운터를 워커 간에 합산하는 공유 배열과 이 워커가 마지막으로 더한 값
+_worker_crop_counters = None
+_worker_crop_published = None
+_worker_cascade_counters = None
+_worker_cascade_published = None
+
+def _init_batch_worker(lang, threads_per_worker, cache_path=None, crop_cache=None, crop_counters=None,
+                       device=None, cascade=None, cascade_counters=None):
+    """
+    배치 워커 프로세스 초기화 (프로세스당 한 번 모델 로드)
+    
+    Args:
+        lang (str): 언어 설정
+        threads_per_worker (int): 워커당 CPU 스레드 수
+        cache_path (str): 결과 캐시 파일 경로 (워커 간 공유)
+        crop_cache (str or bool): 조각 캐시 (True면 워커별 메모리, 경로면 워커 간 공유 저장소)
+        crop_counters (multiprocessing.Array): 조각 캐시 카운터 합산용 공유 배열 (COUNTER_NAMES 순서)
+        device (str): 엔진 장치 (SimpleOCR 참고)
+        cascade (CascadeConfig): 2단계 캐스케이드 설정
+        cascade_counters (multiprocessing.Array): 캐스케이드 통계 합산용 공유 배열 (STAT_NAMES 순서)
+    """
+    global _worker_ocr, _worker_crop_counters, _worker_crop_published
+    global _worker_cascade_counters, _worker_cascade_published
+    # 워커 간 스레드 과다 할당 방지
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = str(threads_per_worker)
+    _worker_ocr = SimpleOCR(lang=lang, cpu_threads=threads_per_worker, cache=cache_path, crop_cache=crop_cache,
+                            device=device, cascade=cascade)
+    _worker_crop_counters = crop_counters
+    _worker_crop_published = (0,) * len(COUNTER_NAMES)
+    _worker_cascade_counters = cascade_counters
+    _worker_cascade_published = (0,) * len(STAT_NAMES)
+
+def _add_counters(shared, current, published):
+    """카운터의 증가분(current - published)을 공유 배열에 더하고 current 반환"""
+    with shared.get_lock():
+        for i, (value, previous) in enumerate(zip(current, published)):
+            shared[i] += value - previous
+    return current
+
+def _publish_counters():
+    """이 워커의 조각 캐시/캐스케이드 카운터 증가분을 공유 배열에 더함"""
+    global _worker_crop_published, _worker_cascade_published
+    if _worker_crop_counters is not None and _worker_ocr.crop_cache is not None:
+        _worker_crop_published = _add_counters(_worker_crop_counters, _worker_ocr.crop_cache.counters(),
+                                               _worker_crop_published)
+    engine = _worker_ocr._cascade_engine()
+    if _worker_cascade_counters is not None and engine is not None:
+        _worker_cascade_published = _add_counters(_worker_cascade_counters, engine.counters(),
+                                                  _worker_cascade_published)
+
+def _save_batch_text(image_path, output_file, texts, error):
+    """
+    배치 결과 한 건을 텍스트 파일로 저장 (output_file이 None이면 저장하지 않고 결과를 반환)
+    
+    Returns:
+        tuple: (이미지 경로, 상태, 오류 메시지, 결과) - 상태는 'saved', 'empty', 'error'
+               결과는 샤드 출력 모드에서만 [(페이지 번호, OCRResult, 오류)] 목록, 그 외에는 None
+    """
+    if output_file is None:
+        status = 'error' if error is not None else ('saved' if texts else 'empty')
+        message = f"{type(error).__name__}: {error}" if error is not None else None
+        return image_path, status, message, [(None, texts, message)]
+    if error is not None:
+        return image_path, 'error', f"{type(error).__name__}: {error}", None
+    try:
+        if not texts:
+            return image_path, 'empty', None, None
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(texts.plain_text())
+        return image_path, 'saved', None, None
+    except Exception as e:
+        # 개별 파일 오류는 기록만 하고 처리는 계속
+        return image_path, 'error', f"{type(e).__name__}: {e}", None
+
+def _collect_batch_document(ocr, path):
+    """
+    다중 페이지 문서 한 건의 페이지별 결과 수집 (샤드 출력 모드)
+    
+    Returns:
+        tuple: (문서 경로, 상태, 오류 메시지, [(페이지 번호, OCRResult, 오류)])
+    """
+    pages, errors = [], []
+    try:
+        for page_index, texts, error in ocr.iter_extract_pages(path):
+            message = f"{type(error).__name__}: {error}" if error is not None else None
+            if message:
+                errors.append(f"페이지 {page_index + 1}: {message}")
+            pages.append((page_index, texts, message))
+    except Exception as e:
+        errors.append(f"{type(e).__name__}: {e}")
+        pages.append((None, OCRResult.empty(), errors[-1]))
+    if errors:
+        return path, 'error', '; '.join(errors), pages
+    if not any(len(texts) for _, texts, _ in pages):
+        return path, 'empty', None, pages
+    return path, 'saved', None, pages
+
+def _save_batch_document(ocr, path, output_file):
+    """
+    다중 페이지 문서 한 건을 페이지 구분선과 함께 텍스트 파일로 저장 (페이지 단위로 기록)
+    (output_file이 None이면 저장하지 않고 페이지별 결과를 반환)
+    
+    Returns:
+        tuple: (문서 경로, 상태, 오류 메시지, 결과) - 상태는 'saved', 'empty', 'error'
+    """
+    if output_file is None:
+        return _collect_batch_document(ocr, path)
+    try:
+        found, errors = 0, []
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for page_index, texts, error in ocr.iter_extract_pages(path):
+                if error is not None:
+                    errors.append(f"페이지 {page_index + 1}: {type(error).__name__}: {error}")
+                f.write(f"--- 페이지 {page_index + 1} ---\n")
+                if texts:
+                    found += len(texts)
+                    f.write(texts.plain_text() + "\n")
+        if errors:
+            return path, 'error', '; '.join(errors), None
+        if not found:
+            os.remove(output_file)
+            return path, 'empty', None, None
+        return path, 'saved', None, None
+    except Exception as e:
+        return path, 'error', f"{type(e).__name__}: {e}", None
+
+def _iter_batch_results(ocr, tasks):
+    """
+    작업 목록을 입력 순서대로 처리 (연속된 이미지는 iter_extract로 묶어서 선행 로드)
+    
+    Args:
+        ocr (SimpleOCR): OCR 객체
+        tasks (list): (입력 경로, 출력 파일 경로) 목록 - 출력 파일 경로가 None이면 결과를 반환
+        
+    Yields:
+        tuple: (입력 경로, 상태, 오류 메시지, 결과)
+    """
+    for document, group in itertools.groupby(tasks, key=lambda task: is_document(task[0])):
+        if document:
+            for path, output_file in group:
+                yield _save_batch_document(ocr, path, output_file)
+            continue
+        # 연속된 이미지가 아무리 많아도 목록으로 만들지 않고 선행 로드 중인 것만 보관
+        outputs = deque()
+        
+        def paths(group=group, outputs=outputs):
+            for path, output_file in group:
+                outputs.append(output_file)
+                yield path
+        
+        for image_path, texts, error in ocr.iter_extract(paths()):
+            yield _save_batch_text(image_path, outputs.popleft(), texts, error)
+
+def _process_batch_chunk(chunk):
+    """
+    워커 프로세스에서 이미지/문서 묶음 처리 (iter_extract로 디코딩 선행 로드)
+    
+    Args:
+        chunk (list): (입력 경로, 출력 파일 경로) 목록
+        
+    Returns:
+        list: (입력 경로, 상태, 오류 메시지, 결과) 목록
+    """
+    try:
+        return list(_iter_batch_results(_worker_ocr, chunk))
+    finally:
+        _publish_counters()
+
+def _iter_lane_results(pool, tasks, scheduler, workers, stop):
+    """
+    작업을 크기별 레인에 나눠 워커 프로세스로 처리 (완료 순서로 반환)
+    
+    워커 수만큼의 스레드가 각자 한 번에 한 작업씩 풀에 보내므로 동시에 처리 중인 작업은
+    최대 workers개이고, 각 스레드가 맡는 레인은 scheduler.worker_lanes()가 정합니다.
+    
+    Args:
+        pool (multiprocessing.Pool): 워커 프로세스 풀
+        tasks (iterable): (입력 경로, 출력 파일 경로) 작업
+        scheduler (SizeScheduler): 레인 스케줄러
+        workers (int): 워커 프로세스 수
+        stop (threading.Event): 중단 신호
+        
+    Yields:
+        tuple: (입력 경로, 상태, 오류 메시지, 결과)
+    """
+    finished_results = queue.Queue()
+    
+    def produce():
+        try:
+            for task in tasks:
+                if stop.is_set():
+                    return
+                # 문서(PDF, 다중 페이지 TIFF)는 페이지 수를 모르므로 가장 큰 레인으로
+                pixels = None if is_document(task[0]) else estimate_pixels(task[0])
+                if scheduler.put(task, pixels) is None:
+                    return
+        finally:
+            scheduler.close()
+    
+    def work(home):
+        try:
+            while True:
+                ticket = scheduler.get(home)
+                if ticket is None:
+                    return
+                path, output_file = ticket.item
+                try:
+                    results = pool.apply(_process_batch_chunk, ([ticket.item],))
+                except Exception as e:
+                    message = f"{type(e).__name__}: {e}"
+                    pages = [(None, OCRResult.empty(), message)] if output_file is None else None
+                    results = [(path, 'error', message, pages)]
+                scheduler.task_done(ticket)
+                finished_results.put(results)
+        finally:
+            finished_results.put(None)
+    
+    homes = scheduler.worker_lanes(workers)
+    threads = [threading.Thread(target=produce, daemon=True)]
+    threads += [threading.Thread(target=work, args=(home,), daemon=True) for home in homes]
+    for thread in threads:
+        thread.start()
+    try:
+        remaining = len(homes)
+        while remaining:
+            results = finished_results.get()
+            if results is None:
+                remaining -= 1
+                continue
+            yield from results
+    finally:
+        scheduler.close(discard=True)
+
+def _chunked(iterable, size):
+    """이터러블을 size개씩 묶어 반환"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _batch_output_name(path, root):
+    """배치 출력 파일의 상대 이름 (폴더 입력은 하위 폴더 구조 유지, 경로 목록 입력은 파일 이름)"""
+    if root is not None:
+        return os.path.splitext(os.path.relpath(path, root))[0]
+    return os.path.splitext(os.path.basename(path))[0]
+
+def batch_process(input_folder, output_folder, workers=1, threads_per_worker=None,
+                  lang='en', ordered=True, cache_path=None, chunk_size=8,
+                  output_format='files', shard_records=10000, columnar=None,
+                  include=None, exclude=None, recursive=True, sniff='auto', shard=None,
+                  manifest=None, max_attempts=3, work_queue=None, enqueue=True, lanes=None,
+                  crop_cache=None, device=None, cascade=None):
     """
-    폴더 내 모든 이미지 일괄 처리
+    폴더(하위 폴더 포함) 또는 경로 스트림의 모든 이미지와 다중 페이지 문서(PDF, TIFF) 일괄 처리
+    
+    workers가 2 이상이면 워커 프로세스 풀을 사용합니다. 각 워커는 시작 시
+    PaddleOCR 모델을 한 번만 로드하고 이후 모든 이미지에 재사용합니다.
+    워커 하나당 모델 메모리(약 500MB)가 추가로 필요합니다.
+    
+    입력 경로는 하나씩 탐색하며 바로 처리하므로 파일 수와 관계없이 메모리 사용량이 일정합니다.
     
     Args:
-        input_folder (str): 입력 폴더
-        output_folder (str): 출력 폴더
+        input_folder (str or iterable): 입력 폴더, 또는 이미지 경로를 하나씩 반환하는 이터러블
+                                        (예: iter_files()의 결과)
+        output_folder (str): 출력 폴더 (폴더 입력이면 하위 폴더 구조를 그대로 유지)
+        workers (int or str): 워커 프로세스 수 (1이면 현재 프로세스에서 순차 처리,
+                              'auto'면 ocr_autotune.py로 저장한 최대 처리량 설정)
+        threads_per_worker (int): 워커당 CPU 스레드 수 (None이면 사용 가능한 코어 수 / workers)
+        lang (str): 언어 설정
+        ordered (bool): True면 입력 순서대로 결과 수집,
+                        False면 완료되는 순서대로 수집 (처리량 우선)
+        cache_path (str): 결과 캐시 파일 경로 (None이면 캐시 사용 안 함)
+        chunk_size (int): 병렬 처리 시 워커에 한 번에 넘기는 이미지 수
+        output_format (str): 'files'면 이미지당 .txt 파일,
+                             'jsonl'이면 샤드 파일에 레코드를 이어 씀 (매니페스트 포함)
+        shard_records (int): 'jsonl' 모드에서 샤드당 최대 레코드 수
+        columnar (str): 'jsonl' 모드에서 함께 만들 열 기반 파일 형식 ('npz', 'parquet' 또는 None)
+        include (list): 폴더 입력에서 포함할 glob 패턴 (루트 기준 상대 경로)
+        exclude (list): 폴더 입력에서 제외할 glob 패턴
+        recursive (bool): 폴더 입력에서 하위 폴더까지 처리할지 여부
+        sniff (str): 형식 판별 방식 ('auto', 'extension', 'magic' - iter_files() 참고)
+        shard (tuple or str): (i, N) 또는 'i/N' - 이 샤드에 속하는 파일만 처리
+                              (N대의 장비가 같은 트리를 조율 없이 나눠 처리)
+        manifest (RunManifest or str): 진행 기록 또는 기록 파일 경로 (None이면 기록 없음)
+                                       지정하면 재실행 시 끝난 파일은 건너뛰고, 실패한 파일은
+                                       max_attempts까지 재시도하며, 새로 추가/변경된 파일만 처리
+        max_attempts (int): manifest/work_queue가 경로일 때 실패한 파일의 최대 시도 횟수
+        work_queue (WorkQueue or str): 공유 작업 대기열 또는 대기열 파일 경로 (None이면 사용 안 함)
+                                       여러 장비에서 같은 대기열로 실행하면 항목을 임대하여 나눠 처리
+                                       ('jsonl' 출력은 워커별 하위 폴더에 기록)
+        enqueue (bool): work_queue 사용 시 입력 폴더를 먼저 대기열에 추가할지 여부
+                        (False면 이미 채워진 대기열만 처리)
+        lanes (tuple or bool): 픽셀 수 기준 처리 레인 (True면 DEFAULT_LANES, workers가 2 이상일 때만 적용)
+                               큰 이미지가 작은 이미지를 막지 않도록 레인마다 워커를 나눠 배정하고
+                               결과는 완료 순서로 수집 (요약의 'lanes'에 레인별 대기/처리 시간)
+        crop_cache (str or bool): 조각 캐시 - 반복되는 텍스트 라인은 인식을 생략
+                                  (True면 워커별 메모리, 경로면 워커/실행 간 공유 저장소,
+                                   요약의 'crop_cache'에 적중률과 절약 시간 추정)
+        device (str): 엔진 장치 ('cpu', 'gpu', 'stub' - SimpleOCR 참고, None이면 레지스트리 기본값)
+        cascade (CascadeConfig): 2단계 캐스케이드 설정 - 신뢰도가 낮은 라인만 무거운 모델로 재인식
+                                 (요약의 'cascade'에 워커 합산 승격 비율과 단계별 시간)
+        
+    Returns:
+        dict: 처리 요약 ('saved', 'empty', 'errors' 목록)
     """
-    print(f"배치 처리 시작: {input_folder} -> {output_folder}")
+    if isinstance(input_folder, (str, os.PathLike)):
+        root = input_folder
+        image_files = iter_files(input_folder, include=include, exclude=exclude, recursive=recursive,
+                                 sniff=sniff, include_documents=True, shard=shard)
+    else:
+        root = None
+        image_files = iter(input_folder)
+        if shard is not None:
+            # 경로 스트림도 같은 해시로 나눔 (장비마다 같은 스트림을 받는 경우)
+            shard = parse_shard(shard) if isinstance(shard, str) else shard
+            image_files = (path for path in image_files if in_shard(os.fspath(path), shard))
+    print(f"배치 처리 시작: {root or '<경로 스트림>'} -> {output_folder}")
+    
+    summary = {'saved': 0, 'empty': 0, 'errors': []}
     
     # 출력 폴더 생성
     os.makedirs(output_folder, exist_ok=True)
     
-    # OCR 초기화
-    ocr = SimpleOCR(lang='en')
+    if output_format not in ('files', 'jsonl'):
+        raise ValueError(f"지원하지 않는 출력 형식: {output_format}")
+    if isinstance(manifest, (str, os.PathLike)):
+        manifest = RunManifest(manifest, max_attempts=max_attempts)
+    if manifest is not None:
+        # 대기열 모드에서는 다른 장비가 처리할 항목도 걸러지므로 파일 정보를 보관하지 않음
+        image_files = manifest.filter(image_files, remember=work_queue is None)
     
-    # 이미지 파일 찾기
-    image_files = find_image_files(input_folder)
+    if isinstance(work_queue, (str, os.PathLike)):
+        work_queue = WorkQueue(work_queue, max_attempts=max_attempts)
+    if work_queue is not None:
+        # 폴더 입력은 루트 기준 상대 경로로 넣어 장비마다 마운트 위치가 달라도 같은 항목이 되게 함
+        def queue_key(path):
+            return os.path.relpath(path, root) if root is not None else os.fspath(path)
+        
+        if enqueue:
+            added = work_queue.enqueue(queue_key(path) for path in image_files)
+            print(f"작업 대기열에 {added}개 추가: {work_queue.queue_path}")
+        claims = work_queue.iter_claims(batch=max(1, chunk_size))
+        image_files = (os.path.join(root, key) if root is not None else key for key in claims)
+        if output_format == 'jsonl':
+            # 샤드 매니페스트는 한 프로세스만 쓰므로 워커마다 별도 폴더 사용
+            output_folder = os.path.join(output_folder, work_queue.worker_id.replace(':', '-'))
+            os.makedirs(output_folder, exist_ok=True)
     
-    if not image_files:
-        print("처리할 이미지가 없습니다.")
-        return
+    def commit_progress():
+        if manifest is not None:
+            manifest.commit()
+        if work_queue is not None:
+            work_queue.commit()
+    
+    writer = None
+    if output_format == 'jsonl':
+        # 샤드 출력은 샤드가 디스크에 확정된 뒤에만 진행 기록/대기열 완료를 커밋
+        # (중단되면 확정되지 않은 샤드의 파일은 다음 실행에서 다시 처리)
+        writer = ShardedResultWriter(output_folder, shard_records=shard_records, columnar=columnar,
+                                     on_shard_closed=commit_progress)
+    
+    def iter_tasks():
+        for path in image_files:
+            # 샤드 출력 모드에서는 개별 파일 없이 결과를 받아 출력기에 기록
+            if writer is not None:
+                yield path, None
+                continue
+            output_file = os.path.join(output_folder, f"{_batch_output_name(path, root)}.txt")
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            yield path, output_file
     
-    for filename in image_files:
-        print(f"\n처리 중: {filename}")
-        image_path = os.path.join(input_folder, filename)
+    tasks = iter_tasks()
+    scheduler = None
+    if workers == 'auto':
+        profile = load_profile(goal='throughput', engine='stub' if device == 'stub' else 'paddle', lang=lang)
+        if profile is not None:
+            workers = profile['processes']
+            threads_per_worker = threads_per_worker or profile['cpu_threads']
+            print(f"자동 조정 프로필: 워커 {workers}개 x 스레드 {threads_per_worker}개")
+        else:
+            workers = 1
+            print("자동 조정 프로필이 없어 워커 1개로 처리합니다 (python ocr_autotune.py로 보정)")
+    workers = max(1, workers)
+    stop = threading.Event()
+    crop_counters = None
+    cascade_counters = None
+    
+    if workers == 1:
+        # OCR 초기화 후 스트리밍 처리 (디코딩은 백그라운드에서 선행)
+        ocr = SimpleOCR(lang=lang, cpu_threads=threads_per_worker, cache=cache_path, crop_cache=crop_cache,
+                        device=device, cascade=cascade)
+        results = _iter_batch_results(ocr, tasks)
+    else:
+        if threads_per_worker is None:
+            threads_per_worker = max(1, available_cpus() // workers)
+        if lanes:
+            scheduler = SizeScheduler(DEFAULT_LANES if lanes is True else lanes, capacity=workers * 4)
+            ordered = False
+        print(f"병렬 처리: 워커 {workers}개 x 스레드 {threads_per_worker}개 "
+              f"({'입력 순서 유지' if ordered else '완료 순서'}"
+              f"{', 크기별 레인 ' + '/'.join(lane.name for lane in scheduler.lanes) if scheduler else ''})")
+        if crop_cache:
+            crop_counters = multiprocessing.Array('d', len(COUNTER_NAMES))
+        if cascade is not None:
+            cascade_counters = multiprocessing.Array('d', len(STAT_NAMES))
+        pool = multiprocessing.Pool(processes=workers,
+                                    initializer=_init_batch_worker,
+                                    initargs=(lang, threads_per_worker, cache_path, crop_cache, crop_counters, device,
+                                              cascade, cascade_counters))
+        imap = pool.imap if ordered else pool.imap_unordered
+        # Pool은 입력을 끝까지 미리 읽어 대기열에 쌓으므로, 처리 중인 묶음 수를 제한하여
+        # 파일이 수백만 개여도 경로 목록이 메모리에 쌓이지 않게 함
+        slots = threading.Semaphore(workers * 4)
         
-        # 텍스트 추출
-        plain_text = ocr.get_plain_text(image_path)
+        def feed():
+            for chunk in _chunked(tasks, max(1, chunk_size)):
+                while not slots.acquire(timeout=0.5):
+                    if stop.is_set():
+                        return
+                yield chunk
         
-        if plain_text:
-            # 텍스트 파일로 저장
-            base_name = os.path.splitext(filename)[0]
-            output_file = os.path.join(output_folder, f"{base_name}.txt")
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(plain_text)
-            
-            print(f"저장됨: {output_file}")
+        def collect(chunk_results):
+            for chunk in chunk_results:
+                slots.release()
+                yield from chunk
+        
+        if scheduler is not None:
+            results = _iter_lane_results(pool, tasks, scheduler, workers, stop)
         else:
-            print("텍스트가 감지되지 않았습니다.")
+            results = collect(imap(_process_batch_chunk, feed()))
+    
+    try:
+        for image_path, status, error, pages in results:
+            if writer is not None:
+                for page_index, texts, page_error in pages:
+                    writer.write(image_path, texts, page_error, page_index)
+            if manifest is not None:
+                manifest.record(image_path, status, error, defer=writer is not None)
+            if work_queue is not None:
+                work_queue.complete(queue_key(image_path), status, error, defer=writer is not None)
+            if status == 'saved':
+                summary['saved'] += 1
+                print(f"저장됨: {image_path}")
+            elif status == 'empty':
+                summary['empty'] += 1
+                print(f"텍스트가 감지되지 않았습니다: {image_path}")
+            else:
+                summary['errors'].append((image_path, error))
+                print(f"처리 실패: {image_path} - {error}")
+    finally:
+        stop.set()
+        if workers > 1:
+            pool.close()
+            pool.join()
+        if writer is not None:
+            writer.close()
+        if manifest is not None:
+            manifest.close()
+            print(f"진행 기록: 이전 실행에서 끝난 파일 {manifest.skipped}개 건너뜀")
+        if work_queue is not None:
+            work_queue.commit()
+            work_queue.print_progress()
+            work_queue.close()
+    
+    if not (summary['saved'] or summary['empty'] or summary['errors']):
+        print("처리할 이미지가 없습니다.")
+    
+    print(f"\n배치 처리 완료: 저장 {summary['saved']}개, "
+          f"텍스트 없음 {summary['empty']}개, 오류 {len(summary['errors'])}개")
+    if scheduler is not None:
+        summary['lanes'] = scheduler.report()
+        scheduler.print_report()
+    if crop_counters is not None:
+        summary['crop_cache'] = summarize(crop_counters[:])
+        print_report(summary['crop_cache'])
+    elif workers == 1 and ocr.crop_cache is not None:
+        summary['crop_cache'] = ocr.crop_cache.stats()
+        ocr.crop_cache.print_report()
+    if cascade_counters is not None:
+        summary['cascade'] = summarize_cascade(cascade_counters[:])
+        print_cascade_report(summary['cascade'])
+    elif workers == 1 and ocr.cascade is not None:
+        summary['cascade'] = ocr.cascade_report()
+        ocr.print_cascade_report()
+    return summary
+
+def batch_main(argv=None):
+    """명령줄 배치 처리 (예: python "1. PaddleOCR.py" batch scans out --shard 0/4)"""
+    parser = argparse.ArgumentParser(description="폴더 트리 일괄 OCR")
+    parser.add_argument('command', choices=['batch'])
+    parser.add_argument('input_folder')
+    parser.add_argument('output_folder')
+    parser.add_argument('--lang', default='korean')
+    parser.add_argument('--workers', type=lambda value: value if value == 'auto' else int(value), default=1,
+                        help="워커 프로세스 수 ('auto'면 자동 조정 프로필 사용)")
+    parser.add_argument('--threads', type=int, default=None, help="워커당 CPU 스레드 수")
+    parser.add_argument('--device', choices=['cpu', 'gpu', 'stub'], default=None,
+                        help="엔진 장치 (stub: PaddleOCR 없이 가짜 엔진으로 파이프라인 확인)")
+    parser.add_argument('--unordered', action='store_true', help="완료 순서대로 수집")
+    parser.add_argument('--lanes', action='store_true', help="크기별 레인으로 나눠 처리 (작은 이미지가 큰 이미지 뒤에서 기다리지 않음)")
+    parser.add_argument('--cache', help="결과 캐시 파일 경로")
+    parser.add_argument('--crop-cache', nargs='?', const=True, default=None, metavar='PATH',
+                        help="조각 캐시 사용 (반복되는 텍스트 라인은 인식 생략, 경로를 주면 SQLite 저장소에 보관)")
+    parser.add_argument('--cascade', metavar='REC_MODEL_DIR',
+                        help="2단계 캐스케이드 - 신뢰도가 낮은 라인만 이 인식 모델(server 등)로 재인식")
+    parser.add_argument('--cascade-threshold', type=float, default=0.85, help="2단계로 넘길 신뢰도 기준")
+    parser.add_argument('--format', choices=['files', 'jsonl'], default='files')
+    parser.add_argument('--columnar', choices=['npz', 'parquet'], default=None)
+    parser.add_argument('--include', action='append', help="포함할 glob 패턴 (여러 번 지정 가능)")
+    parser.add_argument('--exclude', action='append', help="제외할 glob 패턴 (여러 번 지정 가능)")
+    parser.add_argument('--no-recursive', action='store_true', help="하위 폴더 제외")
+    parser.add_argument('--sniff', choices=SNIFF_MODES, default='auto', help="형식 판별 방식")
+    parser.add_argument('--manifest', help="진행 기록 파일 경로 (재실행 시 끝난 파일 건너뜀)")
+    parser.add_argument('--max-attempts', type=int, default=3, help="실패한 파일의 최대 시도 횟수")
+    parser.add_argument('--queue', help="공유 작업 대기열 파일 경로 (여러 장비가 나눠 처리)")
+    parser.add_argument('--no-enqueue', action='store_true', help="대기열에 추가하지 않고 처리만")
+    parser.add_argument('--shard', type=parse_shard, default=None, help="i/N - N개로 나눈 것 중 i번째(0부터)만 처리")
+    args = parser.parse_args(argv)
+    cascade = None
+    if args.cascade:
+        cascade = CascadeConfig(threshold=args.cascade_threshold, heavy_options={'rec_model_dir': args.cascade})
+    
+    summary = batch_process(args.input_folder, args.output_folder, workers=args.workers,
+                            threads_per_worker=args.threads, lang=args.lang, ordered=not args.unordered,
+                            cache_path=args.cache, output_format=args.format, columnar=args.columnar,
+                            include=args.include, exclude=args.exclude, recursive=not args.no_recursive,
+                            sniff=args.sniff, shard=args.shard, manifest=args.manifest,
+                            max_attempts=args.max_attempts, work_queue=args.queue,
+                            enqueue=not args.no_enqueue, lanes=args.lanes, crop_cache=args.crop_cache,
+                            device=args.device, cascade=cascade)
+    return 1 if summary['errors'] else 0
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        sys.exit(batch_main())
+    
     # 기본 실행
     main()
     
     # 배치 처리 예제 (주석 해제하여 사용)
     # batch_process("input_images", "output_texts")
+    
+    # 병렬 배치 처리 예제 (워커 8개, 워커당 스레드 4개)
+    # batch_process("input_images", "output_texts", workers=8, threads_per_worker=4)
+    
+    # 샤드 출력 예제 (작은 파일 대신 JSONL 샤드 + 열 기반 npz + 매니페스트)
+    # batch_process("input_images", "output_shards", output_format='jsonl', columnar='npz')
@@ -4,14 +4,27 @@ import json
 import time
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
+from ocr_cache import OCRResultCache
+from ocr_cascade import build_cascade
+from ocr_crop_cache import CropCache, CropCacheEngine
+from ocr_layout import LayoutConfig
+from ocr_engine import get_engine, warmup_engine
+from ocr_stream import prefetch, read_and_decode
+from ocr_stages import predict_batch
+from ocr_result import OCRResult
+from ocr_metrics import metrics
+from ocr_tiling import TileConfig, needs_tiling, extract_tiled
+from ocr_preprocess import preprocess_image, preprocessing_loader
+from ocr_document import OCRDocument, load_image, source_label
+from ocr_multipage import DEFAULT_DPI, iter_pages
+from ocr_files import iter_files
+from ocr_output import BackgroundOutput
+from ocr_benchmark import measure
+from ocr_autotune import resolve_settings
+from ocr_scheduler import DEFAULT_LANES, SizeScheduler
 
-# PaddleOCR import
-try:
-    from paddleocr import PaddleOCR
-    print("PaddleOCR 모듈 로드 성공")
-except ImportError as e:
-    print(f"PaddleOCR 모듈 로드 실패: {e}")
-    exit(1)
+# PaddleOCR는 엔진이 처음 필요할 때 레지스트리(ocr_engine)에서 import합니다.
+# 이 모듈을 import하는 것만으로는 Paddle을 로드하지 않습니다.
 
 def check_gpu_availability():
     """GPU 사용 가능 여부 확인"""
@@ -32,284 +45,649 @@ def check_gpu_availability():
         return False
 
 class GPUAcceleratedOCR:
-    def __init__(self, lang='en', use_gpu=True):
+    def __init__(self, lang='en', use_gpu=True, cache=None, verbose=False, tiling=True,
+                 preprocess=None, output=None, cascade=None, tuning='auto', layout=None, crop_cache=None,
+                 device=None):
         """
         GPU 가속 OCR 클래스
         
         Args:
             lang (str): 언어 설정 ('en', 'korean', 'ch' 등)
             use_gpu (bool): GPU 사용 여부
+            cache (OCRResultCache or str): 결과 캐시 또는 캐시 파일 경로 (None이면 사용 안 함)
+            verbose (bool): 인식된 텍스트를 한 줄씩 출력할지 여부
+            tiling (TileConfig or bool): 큰 이미지 타일 모드 설정
+                                         (True면 기본 설정, False면 항상 한 번에 처리)
+            preprocess (PreprocessConfig): 전처리(기울기 보정/이진화/노이즈 제거) 설정
+                                           (None이면 전처리 없음)
+            output (BackgroundOutput or int): 결과 저장을 백그라운드에서 처리할 출력 단계
+                                              (정수면 그 크기의 대기열로 생성, None이면 호출 스레드에서 저장)
+            cascade (CascadeConfig): 2단계 캐스케이드 설정 - 신뢰도가 낮은 라인만 무거운 모델로 재인식
+                                     (None이면 한 모델만 사용)
+            tuning (str or dict): CPU 스레드/MKL-DNN/GPU 메모리 설정
+                                  ('auto'면 ocr_autotune.py로 저장한 이 장비의 프로필, 없으면
+                                  코어 수에 맞춘 기본값, dict면 직접 지정)
+            layout (LayoutConfig or bool): 레이아웃 분석 설정 - 평문/텍스트/JSON을 단 → 줄 → 문단의
+                                           읽기 순서로 출력 (True면 기본 설정, None이면 검출 순서)
+            crop_cache (CropCache or str or bool): 조각 캐시 - 반복되는 텍스트 라인(양식 라벨, 머리글 등)은
+                                                   인식을 생략하고 이전 결과 재사용
+                                                   (True면 메모리에만, 경로면 SQLite 저장소와 함께, None이면 사용 안 함)
+            device (str): 'stub'이면 PaddleOCR 없이 가짜 엔진 사용 (서비스/배치 경로 테스트용,
+                          None이면 use_gpu에 따름)
         """
-        self.use_gpu = use_gpu and check_gpu_availability()
+        self.verbose = verbose
+        self.use_gpu = use_gpu and device != 'stub' and check_gpu_availability()
+        self.cache = OCRResultCache(cache) if isinstance(cache, str) else cache
+        self.tiling = TileConfig() if tiling is True else (tiling or None)
+        self.preprocess = preprocess
+        # 레이아웃은 결과의 후처리라 캐시 키(settings)에는 넣지 않음
+        self.layout = LayoutConfig() if layout is True else (layout or None)
+        self.output = BackgroundOutput(max_pending=output) if isinstance(output, int) and output > 0 else output
         
         print(f"OCR 초기화 중... 언어: {lang}, GPU 사용: {self.use_gpu}")
+        # 장비별 스레드 수/MKL-DNN/GPU 메모리 (단일 프로세스 최소 지연 설정)
+        self.tuning, tuning_source = resolve_settings(tuning, self.use_gpu, goal='latency',
+                                                       engine='stub' if device == 'stub' else 'paddle', lang=lang)
+        print(f"엔진 설정 ({tuning_source}): 스레드 {self.tuning['cpu_threads']}개, "
+              f"MKL-DNN {'켜짐' if self.tuning['enable_mkldnn'] else '꺼짐'}")
+        load_start = time.perf_counter()
         
         try:
-            if self.use_gpu:
-                # GPU 설정
-                self.ocr = PaddleOCR(
-                    lang=lang,
-                    use_gpu=True,
-                    gpu_mem=2000,  # GPU 메모리 할당 (MB)
-                    cpu_threads=8,  # CPU 스레드 수
-                    enable_mkldnn=True,  # Intel MKL-DNN 최적화 활성화
-                    det_model_dir=None,  # 사전 훈련된 모델 경로 (기본값 사용)
-                    rec_model_dir=None,
-                    cls_model_dir=None
-                )
+            if device == 'stub':
+                engine_options = {'lang': lang, 'device': 'stub'}
+                self.ocr = get_engine(**engine_options)
+                self.settings = {'lang': lang, 'engine': 'stub'}
+                print("가짜 엔진으로 OCR 초기화 완료")
+            elif self.use_gpu:
+                # GPU 설정 (같은 설정의 모델은 레지스트리에서 공유)
+                engine_options = {
+                    'lang': lang,
+                    'device': 'gpu',
+                    'gpu_mem': self.tuning['gpu_mem'],  # GPU 메모리 할당 (MB)
+                    'cpu_threads': self.tuning['cpu_threads'],  # CPU 스레드 수
+                    'enable_mkldnn': self.tuning['enable_mkldnn'],  # Intel MKL-DNN 최적화
+                    'det_model_dir': None,  # 사전 훈련된 모델 경로 (기본값 사용)
+                    'rec_model_dir': None,
+                    'cls_model_dir': None
+                }
+                self.ocr = get_engine(**engine_options)
+                self.settings = {'lang': lang, 'use_gpu': True, 'enable_mkldnn': self.tuning['enable_mkldnn']}
                 print("GPU 가속 OCR 초기화 완료")
             else:
                 # CPU 최적화 설정
-                self.ocr = PaddleOCR(
-                    lang=lang,
-                    use_gpu=False,
-                    cpu_threads=8,
-                    enable_mkldnn=True
-                )
+                engine_options = {
+                    'lang': lang,
+                    'device': 'cpu',
+                    'cpu_threads': self.tuning['cpu_threads'],
+                    'enable_mkldnn': self.tuning['enable_mkldnn']
+                }
+                self.ocr = get_engine(**engine_options)
+                self.settings = {'lang': lang, 'use_gpu': False, 'enable_mkldnn': self.tuning['enable_mkldnn']}
                 print("CPU 최적화 OCR 초기화 완료")
                 
         except Exception as e:
             print(f"OCR 초기화 실패: {e}")
             # 기본 설정으로 폴백
             try:
-                self.ocr = PaddleOCR(lang=lang)
+                engine_options = {'lang': lang}
+                self.ocr = get_engine(**engine_options)
                 self.use_gpu = False
+                self.settings = {'lang': lang}
                 print("기본 설정으로 OCR 초기화 완료")
             except Exception as e2:
                 print(f"기본 설정으로도 초기화 실패: {e2}")
                 raise e2
+        # 타일 병렬 처리 시 같은 설정의 엔진 복제본을 만들 때 사용
+        self.engine_options = engine_options
+        # 전처리 결과가 다르면 캐시에 다른 항목으로 저장
+        if self.preprocess is not None:
+            self.settings['preprocess'] = self.preprocess.to_dict()
+        # 타일 모드 여부/설정에 따라 결과가 다르므로 캐시 키에 포함
+        self.settings['tiling'] = self.tiling.to_dict() if self.tiling is not None else None
+        # 캐스케이드: 검출/1차 인식은 가벼운 모델, 기준 미만 라인만 무거운 모델로 재인식
+        self.cascade = cascade
+        if cascade is not None:
+            self.ocr = build_cascade(self.engine_options, cascade)
+            self.settings['cascade'] = cascade.to_dict()
+        # 조각 캐시: 검출과 인식 사이에서 거의 같은 조각은 이전 인식 결과 재사용
+        self.crop_cache = CropCache() if crop_cache is True else (
+            CropCache(store_path=crop_cache) if isinstance(crop_cache, str) else crop_cache)
+        if self.crop_cache is not None:
+            try:
+                self.ocr = CropCacheEngine(self.ocr, self.crop_cache, self.settings)
+            except ValueError as e:
+                print(f"조각 캐시 사용 안 함: {e}")
+                self.crop_cache = None
+        # 시작 시간 (엔진 로드는 Paddle import 포함, 추론 시간은 warmup()에서 기록)
+        self.startup = {'load_seconds': time.perf_counter() - load_start,
+                        'first_inference_seconds': None, 'warm_inference_seconds': None}
+    
+    def warmup(self, runs=2):
+        """
+        더미 추론으로 모델 초기화와 커널 준비를 미리 수행 (첫 요청의 지연 제거)
+        
+        Args:
+            runs (int): 더미 추론 횟수 (2회 이상이면 워밍된 추론 시간도 측정)
+            
+        Returns:
+            dict: 시작 시간 - load_seconds(엔진 로드), first_inference_seconds(첫 추론),
+                  warm_inference_seconds(워밍된 추론), cold_start_seconds(로드 + 첫 추론)
+        """
+        timings = warmup_engine(self.ocr, runs)
+        self.startup['first_inference_seconds'] = timings[0]
+        self.startup['warm_inference_seconds'] = timings[-1] if len(timings) > 1 else None
+        self.startup['cold_start_seconds'] = self.startup['load_seconds'] + timings[0]
+        warm = self.startup['warm_inference_seconds']
+        print(f"콜드 스타트: {self.startup['cold_start_seconds']:.2f}초 "
+              f"(엔진 로드 {self.startup['load_seconds']:.2f}초 + 첫 추론 {timings[0]:.2f}초)"
+              + (f", 워밍된 추론: {warm:.3f}초" if warm is not None else ""))
+        return self.startup
+    
+    def document(self, image, name=None):
+        """
+        이미지 한 장의 처리 세션 생성 (디코딩/추론 결과를 모든 출력에서 재사용)
+        
+        Args:
+            image: 이미지 경로, 바이트, BGR NumPy 배열, PIL 이미지 (OCRDocument면 그대로 반환)
+            name (str): 결과에 기록할 이름 (None이면 경로 또는 입력 형식)
+            
+        Returns:
+            OCRDocument: 문서 세션
+        """
+        if isinstance(image, OCRDocument):
+            return image
+        return OCRDocument(image, self._extract_with_timing, name, self.layout)
     
-    def extract_text_with_timing(self, image_path):
+    def extract_text_with_timing(self, image):
         """
         이미지에서 텍스트 추출 (처리 시간 측정 포함)
         
         Args:
-            image_path (str): 이미지 파일 경로
+            image: 이미지 경로, 바이트, BGR NumPy 배열, PIL 이미지 또는 OCRDocument
             
         Returns:
-            tuple: (텍스트 리스트, 원시 결과, 처리 시간)
+            tuple: (OCRResult, 원시 결과, 처리 시간) - 캐시 적중 시 원시 결과는 None
+                   OCRResult는 [{'text', 'confidence', 'bbox'}, ...] 리스트처럼 사용할 수 있음
         """
-        print(f"이미지 분석 중: {image_path} ({'GPU' if self.use_gpu else 'CPU'} 모드)")
+        document = self.document(image)
+        return document.texts, document.raw, document.processing_time
+    
+    def _extract_with_timing(self, image, cache_source, label, preprocessed=False):
+        """
+        텍스트 추출 본체
+        
+        Args:
+            image: PaddleOCR 입력 (이미지 경로 또는 BGR NumPy 배열)
+            cache_source: 캐시 키 계산에 사용할 원본 (이미지 경로 또는 원본 바이트)
+            label (str): 로그에 표시할 이름
+            preprocessed (bool): image가 이미 전처리된 배열인지 여부
+            
+        Returns:
+            tuple: (OCRResult, 원시 결과, 처리 시간)
+        """
+        print(f"이미지 분석 중: {label} ({'GPU' if self.use_gpu else 'CPU'} 모드)")
         
         start_time = time.time()
         
-        try:
-            # OCR 실행 - 최신 API 사용
+        cache_key = None
+        if self.cache is not None:
             try:
-                result = self.ocr.predict(image_path)
-                print("predict() 메서드 사용")
-            except AttributeError:
-                # 구 버전 호환성
-                result = self.ocr.ocr(image_path)
-                print("ocr() 메서드 사용 (호환성 모드)")
+                cache_key = self.cache.make_key(cache_source, self.settings)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    processing_time = time.time() - start_time
+                    print(f"캐시 적중: {len(cached)}개의 텍스트 블록 ({processing_time * 1000:.1f}ms)")
+                    metrics.inc('cache_hits')
+                    return OCRResult.from_dicts(cached), None, processing_time
+            except Exception as cache_error:
+                print(f"캐시 조회 실패 (OCR 실행으로 진행): {cache_error}")
+                cache_key = None
+        
+        try:
+            if self.preprocess is not None and not preprocessed:
+                image = self._preprocess(image)
+            
+            if needs_tiling(image, self.tiling):
+                if not hasattr(image, 'shape'):
+                    _, image = read_and_decode(image)
+                with metrics.stage('inference'):
+                    texts = extract_tiled(
+                        self.ocr, image, self.tiling,
+                        engine_factory=self._engine_replica)
+                metrics.inc('images')
+                metrics.inc('lines', len(texts))
+                processing_time = time.time() - start_time
+                print(f"총 {len(texts)}개의 텍스트 블록 발견 (타일 모드, 처리 시간: {processing_time:.2f}초)")
+                self._store_cache(cache_key, texts)
+                return texts, None, processing_time
+            
+            # OCR 실행 - 최신 API 사용 (단계별 시간은 엔진 계측 프록시가 기록)
+            with metrics.stage('inference'):
+                try:
+                    result = self.ocr.predict(image)
+                    print("predict() 메서드 사용")
+                except AttributeError:
+                    # 구 버전 호환성
+                    result = self.ocr.ocr(image)
+                    print("ocr() 메서드 사용 (호환성 모드)")
+            metrics.inc('images')
             
             processing_time = time.time() - start_time
             print(f"OCR 처리 시간: {processing_time:.2f}초")
             
             if not result:
                 print("OCR 결과가 없습니다.")
-                return [], result, processing_time
+                self._store_cache(cache_key, [])
+                return OCRResult.empty(), result, processing_time
             
             print(f"결과 타입: {type(result)}")
             print(f"결과 길이: {len(result) if hasattr(result, '__len__') else 'N/A'}")
             
-            # 결과 처리 - 다양한 형식에 대응
-            texts = []
-            
-            # predict() 결과가 다른 형식일 수 있으므로 먼저 확인
-            if hasattr(result, 'rec_texts') and hasattr(result, 'rec_scores'):
-                # 새로운 predict() 결과 형식 - 직접 속성 접근
-                print("predict() 결과 형식 감지 - 직접 속성 접근")
-                rec_texts = result.rec_texts
-                rec_scores = result.rec_scores
-                rec_boxes = getattr(result, 'rec_boxes', [])
-                
-                print(f"감지된 텍스트 개수: {len(rec_texts)} ({'GPU' if self.use_gpu else 'CPU'} 처리)")
-                
-                for i in range(len(rec_texts)):
-                    text = rec_texts[i] if i < len(rec_texts) else ""
-                    confidence = rec_scores[i] if i < len(rec_scores) else 0.0
-                    
-                    # rec_boxes에서 좌표 추출
-                    if i < len(rec_boxes):
-                        box = rec_boxes[i]
-                        if hasattr(box, '__len__') and len(box) == 4:  # [x1, y1, x2, y2]
-                            x1, y1, x2, y2 = box
-                            bbox = [[int(x1), int(y1)], [int(x2), int(y1)], [int(x2), int(y2)], [int(x1), int(y2)]]
-                        else:
-                            bbox = [[int(p[0]), int(p[1])] for p in box] if hasattr(box, '__iter__') else []
-                    else:
-                        bbox = []
-                    
-                    if text and str(text).strip():
-                        texts.append({
-                            'text': str(text),
-                            'confidence': float(confidence),
-                            'bbox': bbox
-                        })
-                        print(f"텍스트 {i+1}: '{text}' (신뢰도: {confidence:.3f})")
-            
-            # 딕셔너리 형태 결과 처리 (기존 ocr() 방식)
-            elif len(result) > 0 and isinstance(result[0], dict):
-                page_result = result[0]
-                print(f"딕셔너리 형태 결과 감지")
-                
-                if 'rec_texts' in page_result and 'rec_scores' in page_result:
-                    rec_texts = page_result['rec_texts']
-                    rec_scores = page_result['rec_scores']
-                    rec_boxes = page_result.get('rec_boxes', [])
-                    
-                    print(f"감지된 텍스트 개수: {len(rec_texts)} ({'GPU' if self.use_gpu else 'CPU'} 처리)")
-                    
-                    for i in range(len(rec_texts)):
-                        text = rec_texts[i] if i < len(rec_texts) else ""
-                        confidence = rec_scores[i] if i < len(rec_scores) else 0.0
-                        
-                        # rec_boxes에서 좌표 추출
-                        if i < len(rec_boxes):
-                            box = rec_boxes[i]
-                            if len(box) == 4:  # [x1, y1, x2, y2]
-                                x1, y1, x2, y2 = box
-                                bbox = [[int(x1), int(y1)], [int(x2), int(y1)], [int(x2), int(y2)], [int(x1), int(y2)]]
-                            else:
-                                bbox = [[int(p[0]), int(p[1])] for p in box] if hasattr(box, '__iter__') else []
-                        else:
-                            bbox = []
-                        
-                        if text and str(text).strip():
-                            texts.append({
-                                'text': str(text),
-                                'confidence': float(confidence),
-                                'bbox': bbox
-                            })
-                            print(f"텍스트 {i+1}: '{text}' (신뢰도: {confidence:.3f})")
-                
-            # 리스트 형태 결과 처리 (이전 버전 호환성)
-            elif len(result) > 0 and isinstance(result[0], list):
-                page_result = result[0]
-                print(f"리스트 형태 결과 감지")
-                
-                if page_result:
-                    for i, line in enumerate(page_result):
-                        try:
-                            if line and len(line) >= 2:
-                                bbox = line[0]
-                                text_info = line[1]
-                                
-                                if isinstance(text_info, (list, tuple)) and len(text_info) >= 2:
-                                    text = text_info[0]
-                                    confidence = text_info[1]
-                                elif isinstance(text_info, str):
-                                    text = text_info
-                                    confidence = 1.0
-                                else:
-                                    continue
-                                
-                                if text and str(text).strip():
-                                    json_bbox = []
-                                    if bbox and hasattr(bbox, '__iter__'):
-                                        try:
-                                            if hasattr(bbox, 'tolist'):
-                                                json_bbox = bbox.tolist()
-                                            else:
-                                                json_bbox = [[int(p[0]), int(p[1])] for p in bbox]
-                                        except:
-                                            json_bbox = []
-                                    
-                                    texts.append({
-                                        'text': str(text),
-                                        'confidence': float(confidence),
-                                        'bbox': json_bbox
-                                    })
-                                    print(f"텍스트 {i+1}: '{text}' (신뢰도: {confidence:.3f})")
-                                    
-                        except Exception as line_error:
-                            print(f"라인 {i+1} 처리 중 오류: {line_error}")
-                            continue
+            texts = self._parse_result(result)
             
             print(f"총 {len(texts)}개의 텍스트 블록 발견 (처리 시간: {processing_time:.2f}초)")
+            self._store_cache(cache_key, texts)
             return texts, result, processing_time
             
         except Exception as e:
             processing_time = time.time() - start_time
             print(f"OCR 처리 중 오류: {e} (처리 시간: {processing_time:.2f}초)")
+            metrics.inc('errors')
             import traceback
             traceback.print_exc()
-            return [], None, processing_time
+            return OCRResult.empty(), None, processing_time
+    
+    def _parse_result(self, result):
+        """
+        다양한 형식의 PaddleOCR 결과를 OCRResult로 변환
+        
+        Args:
+            result: predict() 또는 ocr()의 원시 결과
+            
+        Returns:
+            OCRResult: 정규화된 결과
+        """
+        with metrics.stage('parse'):
+            texts = OCRResult.from_raw(result)
+        metrics.inc('lines', len(texts))
+        print(f"결과 형식: {texts.source_format}, 감지된 텍스트 개수: {len(texts)} "
+              f"({'GPU' if self.use_gpu else 'CPU'} 처리)")
+        
+        if self.verbose:
+            for i, (text, confidence) in enumerate(zip(texts.texts, texts.scores.tolist()), 1):
+                print(f"텍스트 {i}: '{text}' (신뢰도: {confidence:.3f})")
+        
+        return texts
+    
+    def _cascade_engine(self):
+        """캐스케이드 엔진 (조각 캐시를 쓰면 그 안쪽 엔진, 캐스케이드가 없으면 None)"""
+        if self.cascade is None:
+            return None
+        return self.ocr.engine if self.crop_cache is not None else self.ocr
+    
+    def cascade_report(self):
+        """
+        캐스케이드 통계 (타일 병렬 처리용 복제본 포함)
+        
+        Returns:
+            dict: ocr_cascade.summarize() 결과 (캐스케이드를 쓰지 않으면 None)
+        """
+        engine = self._cascade_engine()
+        return engine.report() if engine is not None else None
+    
+    def print_cascade_report(self):
+        """캐스케이드 통계 출력 (캐스케이드를 쓰지 않으면 출력하지 않음)"""
+        engine = self._cascade_engine()
+        if engine is not None:
+            engine.print_report()
+    
+    def _engine_replica(self, replica):
+        """타일 병렬 처리용 엔진 복제본 (캐스케이드면 두 모델 모두 복제, 통계와 조각 캐시는 공유)"""
+        if self.cascade is not None:
+            engine = build_cascade(self.engine_options, self.cascade, replica,
+                                   share_stats_with=self._cascade_engine())
+        else:
+            engine = get_engine(**self.engine_options, replica=replica)
+        if self.crop_cache is not None:
+            engine = CropCacheEngine(engine, self.crop_cache, self.settings)
+        return engine
+    
+    def _preprocess(self, image):
+        """이미지를 디코딩하고 설정된 전처리 적용"""
+        if not hasattr(image, 'shape'):
+            _, image = read_and_decode(image)
+        image, report = preprocess_image(image, self.preprocess)
+        timings = ', '.join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in report['timings'].items())
+        print(f"전처리: {', '.join(report['applied']) or '생략'} "
+              f"(기울기 {report['skew']:.2f}°, 대비 {report['contrast']:.0f}, 노이즈 {report['noise']:.1f}; {timings})")
+        return image
+    
+    def _store_cache(self, cache_key, texts):
+        """추출 결과를 캐시에 저장 (캐시 오류는 OCR 결과에 영향을 주지 않음)"""
+        if self.cache is None or cache_key is None:
+            return
+        try:
+            self.cache.put(cache_key, texts)
+        except Exception as cache_error:
+            print(f"캐시 저장 실패: {cache_error}")
+    
+    def _cached_result(self, cache_source):
+        """
+        캐시에 있는 결과 (디코딩 스레드에서 전처리 전에 호출)
+        
+        Returns:
+            OCRResult: 캐시된 결과 (캐시를 쓰지 않거나 없으면 None)
+        """
+        if self.cache is None:
+            return None
+        try:
+            cached = self.cache.get(self.cache.make_key(cache_source, self.settings))
+        except Exception:
+            # 조회 실패는 추출 단계에서 다시 조회하며 보고
+            return None
+        return OCRResult.from_dicts(cached) if cached is not None else None
+    
+    def iter_extract(self, images, prefetch_size=4, decode_workers=2):
+        """
+        여러 이미지를 순서대로 처리하며 결과가 준비되는 즉시 반환하는 제너레이터
+        
+        이미지 읽기/디코딩은 백그라운드 스레드에서 최대 prefetch_size개까지 미리
+        진행되므로 GPU/CPU가 디스크를 기다리지 않으며, 입력 개수와 관계없이
+        메모리 사용량이 일정합니다.
+        
+        Args:
+            images (iterable): 이미지 경로/바이트/배열/PIL 이미지 (지연 이터레이터 가능)
+            prefetch_size (int): 미리 디코딩해 둘 최대 이미지 수
+            decode_workers (int): 디코딩 스레드 수
+            
+        Yields:
+            tuple: (입력 항목, 텍스트 리스트, 처리 시간, 오류) - 읽기/디코딩 실패 시 오류는 예외 객체
+        """
+        # 캐시 조회와 전처리도 디코딩 스레드에서 수행되어 이전 이미지의 추론과 겹쳐 실행됨
+        loader = preprocessing_loader(load_image, self.preprocess, self._cached_result)
+        loaded = prefetch(images, loader,
+                          max_workers=decode_workers, max_ahead=prefetch_size)
+        for item, decoded, error in loaded:
+            if error is not None:
+                print(f"이미지 로드 실패: {source_label(item)} - {error}")
+                yield item, OCRResult.empty(), 0.0, error
+                continue
+            cache_source, image, cached = decoded
+            if cached is not None:
+                print(f"이미지 분석 중: {source_label(item)} ({'GPU' if self.use_gpu else 'CPU'} 모드)")
+                print(f"캐시 적중: {len(cached)}개의 텍스트 블록")
+                metrics.inc('cache_hits')
+                yield item, cached, 0.0, None
+                continue
+            texts, _, processing_time = self._extract_with_timing(image, cache_source, source_label(item),
+                                                                  preprocessed=True)
+            yield item, texts, processing_time, None
+    
+    def iter_extract_pages(self, path, dpi=DEFAULT_DPI, lookahead=2):
+        """
+        다중 페이지 문서(PDF, TIFF)를 페이지 단위로 처리하는 제너레이터
+        
+        다음 페이지 렌더링은 현재 페이지 추론과 겹쳐 실행되며 메모리에는
+        최대 lookahead + 1 페이지만 올라갑니다.
+        
+        Args:
+            path (str): PDF 또는 TIFF 파일 경로
+            dpi (int): 렌더링 해상도
+            lookahead (int): 미리 렌더링해 둘 최대 페이지 수
+            
+        Yields:
+            tuple: (페이지 번호(0부터), OCRResult, 처리 시간, 오류) - 렌더링 실패 시 오류는 예외 객체
+        """
+        transform = None
+        if self.preprocess is not None:
+            transform = lambda page: preprocess_image(page, self.preprocess)[0]
+        for page_index, image, error in iter_pages(path, dpi, lookahead, transform):
+            label = f"{source_label(path)} [페이지 {page_index + 1}]"
+            if error is not None:
+                print(f"페이지 로드 실패: {label} - {error}")
+                yield page_index, OCRResult.empty(), 0.0, error
+                continue
+            texts, _, processing_time = self._extract_with_timing(image, image, label, preprocessed=True)
+            yield page_index, texts, processing_time, None
     
-    def extract_text(self, image_path):
+    def extract_text_batch(self, images, batch_size=8, rec_batch_size=None, lanes=None):
+        """
+        여러 이미지를 배치 단위로 추론
+        
+        PaddleOCR 2.x 엔진에서는 배치 내 모든 이미지의 텍스트 라인 조각을 모아
+        한 번에 인식기로 보내고, 결과를 다시 이미지별로 나눕니다.
+        predict()가 있는 최신 엔진에서는 이미지 목록을 한 번의 predict() 호출로 전달합니다.
+        디코딩된 이미지는 최대 두 배치 분량만 메모리에 유지됩니다.
+        
+        Args:
+            images (list): 이미지 경로/바이트/배열/PIL 이미지/OCRDocument 목록
+                           (OCRDocument는 디코딩해 둔 픽셀 재사용, 결과도 문서에 채움)
+            batch_size (int): 한 번에 추론할 이미지 수
+            rec_batch_size (int): 인식기 배치 크기 (None이면 엔진 설정 유지)
+            lanes (tuple or bool): 크기별 레인 (True면 DEFAULT_LANES) - 같은 레인의 이미지끼리만
+                                   배치로 묶어 큰 이미지 한 장이 작은 이미지 배치를 느리게 하지 않음
+                                   (레인마다 대기 배치를 하나씩 메모리에 유지)
+            
+        Returns:
+            list: 입력 순서대로 (OCRResult, 원시 결과, 처리 시간) 목록
+                  처리 시간은 배치 처리 시간을 이미지 수로 나눈 값
+                  (타일 모드 대상인 큰 이미지는 배치에 넣지 않고 한 장씩 타일로 처리)
+        """
+        batch_size = max(1, batch_size)
+        results = [None] * len(images)
+        # 레인별 대기 배치 (레인을 쓰지 않으면 하나)
+        scheduler = SizeScheduler(DEFAULT_LANES if lanes is True else lanes) if lanes else None
+        lane_pending = [[] for _ in (scheduler.lanes if scheduler else (None,))]
+        
+        def flush(pending):
+            start_time = time.time()
+            try:
+                with metrics.stage('batch_inference'):
+                    raw_results = predict_batch(self.ocr, [image for _, image, _ in pending],
+                                                rec_batch_size)
+                metrics.inc('images', len(pending))
+            except Exception as e:
+                print(f"배치 처리 중 오류: {e}")
+                metrics.inc('errors', len(pending))
+                raw_results = [None] * len(pending)
+            per_image_time = (time.time() - start_time) / len(pending)
+            
+            for (index, _, cache_key), raw in zip(pending, raw_results):
+                texts = self._parse_result(raw) if raw else OCRResult.empty()
+                if raw is not None:
+                    self._store_cache(cache_key, texts)
+                results[index] = (texts, raw, per_image_time)
+            print(f"배치 {len(pending)}장 처리 완료: 이미지당 {per_image_time:.2f}초 "
+                  f"({'GPU' if self.use_gpu else 'CPU'} 모드)")
+            pending.clear()
+        
+        # 캐시 적중은 디코딩 스레드에서 전처리 전에 확인
+        loader = preprocessing_loader(load_image, self.preprocess, self._cached_result)
+        loaded = prefetch(enumerate(images), lambda item: loader(item[1]),
+                          max_ahead=batch_size)
+        for (index, source), decoded, error in loaded:
+            if error is not None:
+                print(f"이미지 로드 실패: {source_label(source)} - {error}")
+                results[index] = (OCRResult.empty(), None, 0.0)
+                continue
+            data, image, cached = decoded
+            if cached is not None:
+                metrics.inc('cache_hits')
+                results[index] = (cached, None, 0.0)
+                continue
+            
+            if needs_tiling(image, self.tiling):
+                # 타일 모드 (캐시 조회/저장 포함, 전처리는 로더에서 이미 적용)
+                results[index] = self._extract_with_timing(image, data, source_label(source), preprocessed=True)
+                continue
+            
+            cache_key = None
+            if self.cache is not None:
+                try:
+                    cache_key = self.cache.make_key(data, self.settings)
+                    cached = self.cache.get(cache_key)
+                    if cached is not None:
+                        metrics.inc('cache_hits')
+                        results[index] = (OCRResult.from_dicts(cached), None, 0.0)
+                        continue
+                except Exception as cache_error:
+                    print(f"캐시 조회 실패 (OCR 실행으로 진행): {cache_error}")
+                    cache_key = None
+            
+            lane = scheduler.lane_for(image.shape[0] * image.shape[1]) if scheduler else 0
+            pending = lane_pending[lane]
+            pending.append((index, image, cache_key))
+            if len(pending) >= batch_size:
+                flush(pending)
+        
+        for pending in lane_pending:
+            if pending:
+                flush(pending)
+        for source, result in zip(images, results):
+            if isinstance(source, OCRDocument):
+                source.set_result(*result)
+        return results
+    
+    def extract_text(self, image):
         """기존 호환성을 위한 메서드"""
-        texts, result, _ = self.extract_text_with_timing(image_path)
+        texts, result, _ = self.extract_text_with_timing(image)
         return texts, result
     
-    def get_plain_text(self, image_path):
+    def get_plain_text(self, image):
         """평문 텍스트만 추출"""
-        texts, _, _ = self.extract_text_with_timing(image_path)
+        document = self.document(image)
         
-        if not texts:
+        if not document.texts:
             return ""
         
-        plain_texts = [item['text'] for item in texts]
-        return '\n'.join(plain_texts)
+        # 레이아웃 설정이 있으면 읽기 순서(문단은 빈 줄로 구분), 없으면 검출 순서
+        return document.plain_text()
     
-    def benchmark_performance(self, image_path, iterations=3):
+    def benchmark_performance(self, image_path, iterations=3, warmup=1):
         """
-        GPU vs CPU 성능 비교
+        현재 설정(GPU 또는 CPU)의 처리 성능 측정
         
         Args:
-            image_path (str): 테스트할 이미지 경로
-            iterations (int): 반복 횟수
+            image_path: 테스트할 이미지 (경로/바이트/배열/PIL 이미지, 목록이면 여러 장)
+            iterations (int): 이미지당 반복 횟수
+            warmup (int): 측정 전 워밍업 횟수 (모델 초기화/커널 준비 비용 제외)
+            
+        Returns:
+            dict: p50/p95/p99 지연(초), 평균, 이미지/초, 라인/초, 최대 RSS
         """
-        print(f"\n=== 성능 벤치마크 ({iterations}회 반복) ===")
-        
-        # 현재 설정으로 테스트
+        image_paths = list(image_path) if isinstance(image_path, (list, tuple)) else [image_path]
         current_mode = "GPU" if self.use_gpu else "CPU"
-        times = []
+        print(f"\n=== {current_mode} 성능 벤치마크 (워밍업 {warmup}회, {iterations}회 반복) ===")
         
-        for i in range(iterations):
-            print(f"\n{current_mode} 테스트 {i+1}/{iterations}")
-            _, _, processing_time = self.extract_text_with_timing(image_path)
-            times.append(processing_time)
+        # 캐시가 결과를 왜곡하지 않도록 벤치마크 중에는 비활성화
+        cache, self.cache = self.cache, None
+        try:
+            stats = measure(lambda path: self.extract_text_with_timing(path)[0],
+                            image_paths, warmup=warmup, iterations=iterations)
+        finally:
+            self.cache = cache
         
-        avg_time = sum(times) / len(times)
-        print(f"\n{current_mode} 평균 처리 시간: {avg_time:.2f}초")
-        print(f"{current_mode} 최소/최대 시간: {min(times):.2f}초 / {max(times):.2f}초")
+        print(f"\n{current_mode} 지연 시간: p50 {stats['p50']:.2f}초 / p95 {stats['p95']:.2f}초 / "
+              f"p99 {stats['p99']:.2f}초 (평균 {stats['mean']:.2f}초)")
+        print(f"{current_mode} 처리량: {stats['images_per_sec']:.2f} 이미지/초, "
+              f"{stats['lines_per_sec']:.1f} 라인/초, 최대 RSS {stats['peak_rss_mb']:.0f}MB")
         
-        return avg_time
+        return stats
     
-    def save_results_with_metadata(self, image_path, output_prefix="ocr_result"):
-        """OCR 결과를 메타데이터와 함께 저장"""
-        texts, raw_result, processing_time = self.extract_text_with_timing(image_path)
+    def benchmark_batch_sizes(self, image_paths, batch_sizes=(1, 2, 4, 8, 16), rec_batch_size=None):
+        """
+        배치 크기별 처리량 비교
+        
+        Args:
+            image_paths (list): 테스트할 이미지 경로 목록
+            batch_sizes (tuple): 비교할 배치 크기
+            rec_batch_size (int): 인식기 배치 크기 (None이면 엔진 설정 유지)
+            
+        Returns:
+            list: 배치 크기별 {'batch_size', 'total_time', 'images_per_sec', 'lines_per_sec'}
+        """
+        print(f"\n=== 배치 크기별 성능 비교 (이미지 {len(image_paths)}장) ===")
+        
+        # 캐시가 결과를 왜곡하지 않도록 벤치마크 중에는 비활성화
+        cache, self.cache = self.cache, None
+        rows = []
+        try:
+            # 워밍업 (모델 초기화 비용 제외)
+            self.extract_text_batch(image_paths[:1], batch_size=1)
+            
+            for batch_size in batch_sizes:
+                start_time = time.time()
+                results = self.extract_text_batch(image_paths, batch_size=batch_size,
+                                                  rec_batch_size=rec_batch_size)
+                total_time = time.time() - start_time
+                lines = sum(len(texts) for texts, _, _ in results)
+                rows.append({
+                    'batch_size': batch_size,
+                    'total_time': total_time,
+                    'images_per_sec': len(image_paths) / total_time if total_time > 0 else 0.0,
+                    'lines_per_sec': lines / total_time if total_time > 0 else 0.0
+                })
+        finally:
+            self.cache = cache
+        
+        base = rows[0]['images_per_sec'] if rows and rows[0]['images_per_sec'] > 0 else None
+        print(f"\n{'배치':>6} {'총 시간(초)':>12} {'이미지/초':>10} {'라인/초':>10} {'가속비':>8}")
+        for row in rows:
+            speedup = row['images_per_sec'] / base if base else 0.0
+            print(f"{row['batch_size']:>6} {row['total_time']:>12.2f} {row['images_per_sec']:>10.2f} "
+                  f"{row['lines_per_sec']:>10.1f} {speedup:>7.2f}x")
+        return rows
+    
+    def save_results_with_metadata(self, image, output_prefix="ocr_result"):
+        """
+        OCR 결과를 메타데이터와 함께 저장
+        
+        OCRDocument를 넘기면 이미 계산된 결과를 그대로 사용합니다 (추가 추론 없음).
+        
+        Args:
+            image: 이미지 경로, 바이트, BGR NumPy 배열, PIL 이미지 또는 OCRDocument
+            output_prefix (str): 출력 파일 접두사
+        """
+        document = self.document(image)
+        texts, processing_time = document.texts, document.processing_time
         
         if not texts:
             print("저장할 텍스트가 없습니다.")
             return
         
-        # 텍스트 파일 저장
-        txt_path = f"{output_prefix}.txt"
-        with open(txt_path, 'w', encoding='utf-8') as f:
-            f.write(f"# OCR 결과 - {'GPU' if self.use_gpu else 'CPU'} 처리\n")
-            f.write(f"# 처리 시간: {processing_time:.2f}초\n")
-            f.write(f"# 감지된 텍스트 블록: {len(texts)}개\n\n")
-            for item in texts:
-                f.write(f"{item['text']}\n")
-        print(f"텍스트 파일 저장: {txt_path}")
-        
-        # JSON 파일 저장 (메타데이터 포함)
-        json_path = f"{output_prefix}.json"
-        json_data = {
-            'image_path': image_path,
-            'processing_mode': 'GPU' if self.use_gpu else 'CPU',
-            'processing_time_seconds': processing_time,
-            'total_blocks': len(texts),
-            'results': texts,
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-        }
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
-        print(f"JSON 파일 저장: {json_path}")
+        # 출력 단계가 있으면 저장은 백그라운드에서, 호출 스레드는 바로 다음 이미지로
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        if self.output is not None:
+            self.output.submit(self._write_results, document, output_prefix, timestamp)
+        else:
+            self._write_results(document, output_prefix, timestamp)
+    
+    def _write_results(self, document, output_prefix, timestamp):
+        """메타데이터 포함 텍스트/JSON 파일 저장 (출력 스레드 또는 호출 스레드에서 실행)"""
+        texts, processing_time = document.texts, document.processing_time
+        mode = 'GPU' if self.use_gpu else 'CPU'
+        with metrics.stage('write'):
+            # 텍스트 파일 저장
+            document.save_text(f"{output_prefix}.txt", header_lines=(
+                f"OCR 결과 - {mode} 처리",
+                f"처리 시간: {processing_time:.2f}초",
+                f"감지된 텍스트 블록: {len(texts)}개"
+            ))
+            
+            # JSON 파일 저장 (메타데이터 포함)
+            json_path = f"{output_prefix}.json"
+            json_data = document.to_dict(processing_mode=mode, processing_time_seconds=processing_time)
+            json_data['timestamp'] = timestamp
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(json_data, f, ensure_ascii=False, indent=2)
+            print(f"JSON 파일 저장: {json_path}")
+    
+    def flush_output(self):
+        """백그라운드 출력 단계에 남은 저장 작업이 모두 끝날 때까지 대기"""
+        if self.output is not None:
+            self.output.flush()
 
-def compare_gpu_cpu_performance(image_path):
+def compare_gpu_cpu_performance(image_path, iterations=3, warmup=1):
     """GPU와 CPU 성능 직접 비교"""
     print("\n=== GPU vs CPU 성능 비교 ===")
     
@@ -319,36 +697,39 @@ def compare_gpu_cpu_performance(image_path):
     if not gpu_available:
         print("GPU를 사용할 수 없습니다. CPU 모드만 테스트합니다.")
         cpu_ocr = GPUAcceleratedOCR(use_gpu=False)
-        cpu_time = cpu_ocr.benchmark_performance(image_path)
+        cpu_ocr.benchmark_performance(image_path, iterations, warmup)
         return
     
     # CPU 테스트
     print("\n--- CPU 테스트 ---")
     cpu_ocr = GPUAcceleratedOCR(use_gpu=False)
-    cpu_time = cpu_ocr.benchmark_performance(image_path)
+    cpu_stats = cpu_ocr.benchmark_performance(image_path, iterations, warmup)
     
     # GPU 테스트
     print("\n--- GPU 테스트 ---")
     gpu_ocr = GPUAcceleratedOCR(use_gpu=True)
-    gpu_time = gpu_ocr.benchmark_performance(image_path)
+    gpu_stats = gpu_ocr.benchmark_performance(image_path, iterations, warmup)
     
-    # 비교 결과
+    # 비교 결과 (중앙값 기준)
+    cpu_time, gpu_time = cpu_stats['p50'], gpu_stats['p50']
     speedup = cpu_time / gpu_time if gpu_time > 0 else 0
     print(f"\n=== 성능 비교 결과 ===")
-    print(f"CPU 평균 시간: {cpu_time:.2f}초")
-    print(f"GPU 평균 시간: {gpu_time:.2f}초")
+    print(f"CPU p50/p95: {cpu_time:.2f}초 / {cpu_stats['p95']:.2f}초")
+    print(f"GPU p50/p95: {gpu_time:.2f}초 / {gpu_stats['p95']:.2f}초")
     print(f"GPU 가속비: {speedup:.2f}x {'빠름' if speedup > 1 else '느림'}")
 
-def find_image_files(directory="."):
-    """현재 디렉토리에서 이미지 파일 찾기"""
-    image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp']
-    image_files = []
-    
-    for file in os.listdir(directory):
-        if any(file.lower().endswith(ext) for ext in image_extensions):
-            image_files.append(file)
+def find_image_files(directory=".", recursive=False, sniff='auto'):
+    """
+    디렉토리에서 이미지 파일 찾기 (directory 기준 상대 경로, 폴더별 이름순)
     
-    return image_files
+    Args:
+        directory (str): 검색할 디렉토리
+        recursive (bool): 하위 폴더까지 검색할지 여부
+        sniff (str): 형식 판별 방식 ('auto', 'extension', 'magic' - iter_files() 참고)
+    """
+    # 하위 폴더 탐색/내용 확인은 iter_files() 사용
+    return [os.path.relpath(path, directory) for path in iter_files(
+        directory, recursive=recursive, sniff=sniff, ordered=True)]
 
 def main():
     print("=== GPU 가속 PaddleOCR 텍스트 추출 프로그램 ===\n")
@@ -356,8 +737,8 @@ def main():
     # GPU 사용 가능 여부 확인
     gpu_available = check_gpu_availability()
     
-    # 이미지 파일 찾기
-    image_files = find_image_files()
+    # 이미지 파일 찾기 (현재 디렉토리에 없으면 하위 폴더까지)
+    image_files = find_image_files() or find_image_files(recursive=True)
     
     if not image_files:
         print("현재 디렉토리에 이미지 파일이 없습니다.")
@@ -386,8 +767,9 @@ def main():
     
     ocr = GPUAcceleratedOCR(lang='korean', use_gpu=use_gpu)
     
-    # 텍스트 추출 및 결과 출력
-    texts, _, processing_time = ocr.extract_text_with_timing(image_path)
+    # 텍스트 추출 및 결과 출력 (같은 결과를 저장에도 재사용)
+    document = ocr.document(image_path)
+    texts, processing_time = document.texts, document.processing_time
     
     if texts:
         print(f"\n추출된 텍스트 ({len(texts)}개 블록, {processing_time:.2f}초 소요):")
@@ -396,7 +778,7 @@ def main():
         
         # 결과 저장
         output_prefix = f"ocr_output_{'gpu' if use_gpu else 'cpu'}"
-        ocr.save_results_with_metadata(image_path, output_prefix)
+        ocr.save_results_with_metadata(document, output_prefix)
     else:
         print("텍스트를 찾을 수 없습니다.")
 
@@ -0,0 +1,448 @@
+# 호스트별 CPU 스레드 / MKL-DNN / 프로세스 수 자동 조정
+#
+# 대표 이미지로 짧은 측정을 돌려 이 장비에서 가장 빠른 설정을 찾고 프로필로 저장합니다.
+# 이후 GPUAcceleratedOCR(tuning='auto')와 batch_process(workers='auto')가 프로필을 자동으로 읽습니다.
+#
+# 사용 예:
+#   python ocr_autotune.py --lang korean --images samples/       # CPU 설정 보정 후 저장
+#   python ocr_autotune.py --gpu --images samples/                # GPU 모드 설정 보정
+#   python ocr_autotune.py --engine stub                         # PaddleOCR 없이 측정 경로 확인 (실제 프로필과 분리 저장)
+#   python ocr_autotune.py --show                                # 저장된 프로필 출력
+#
+# 측정은 3단계로 진행합니다 (전체 조합 대신 단계별로 좁혀서 짧게 끝냄):
+#   1. 단일 프로세스, 전체 코어 스레드로 MKL-DNN 켜기/끄기 비교 (CPU 모드)
+#   2. 단일 프로세스 스레드 수 변경
+#   3. 프로세스 수 x 프로세스당 스레드 수 분할 (코어 수를 나눠 가짐)
+# 단일 프로세스 중 p50 지연이 가장 짧은 설정을 'latency', 전체 중 이미지/초가 가장 높은
+# 설정을 'throughput'으로 저장합니다.
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from queue import Empty
+from threading import BrokenBarrierError
+
+DEFAULT_PROFILE_PATH = os.environ.get('OCR_AUTOTUNE_PROFILE') or os.path.join(
+    os.path.expanduser('~'), '.cache', 'paddleocr-simple', 'autotune.json')
+
+# 프로필이 없을 때 쓰는 기본값 (스레드 수는 사용 가능한 코어 수로 제한)
+DEFAULT_CPU_THREADS = 8
+DEFAULT_GPU_MEM = 2000
+
+# 프로세스당 모델 메모리 추정치 (MB) - 프로세스 수 후보를 메모리 한도로 제한
+PROCESS_MEMORY_MB = 1200
+
+TUNING_GOALS = ('latency', 'throughput')
+
+def _read_fields(path):
+    try:
+        with open(path) as f:
+            return f.read().split()
+    except OSError:
+        return None
+
+def available_cpus():
+    """
+    이 프로세스가 실제로 쓸 수 있는 CPU 수 (CPU 친화도와 cgroup 할당량 반영)
+
+    컨테이너에서는 os.cpu_count()가 호스트 전체 코어 수를 반환하므로 그대로 쓰면 과다 할당됩니다.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # cgroup v2: "할당량 주기" 또는 "max 주기"
+    quota = _read_fields('/sys/fs/cgroup/cpu.max')
+    if quota and quota[0] != 'max':
+        cpus = min(cpus, max(1, int(quota[0]) // int(quota[1])))
+    else:
+        # cgroup v1
+        quota = _read_fields('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')
+        period = _read_fields('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+        if quota and period and int(quota[0]) > 0:
+            cpus = min(cpus, max(1, int(quota[0]) // int(period[0])))
+    return max(1, cpus)
+
+def available_memory_mb():
+    """사용 가능한 메모리 (MB, cgroup 한도 반영, 알 수 없으면 None)"""
+    total = None
+    try:
+        total = os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    limit = _read_fields('/sys/fs/cgroup/memory.max') or \
+        _read_fields('/sys/fs/cgroup/memory/memory.limit_in_bytes')
+    if limit and limit[0].isdigit():
+        limit_mb = int(limit[0]) / (1024 * 1024)
+        total = min(total, limit_mb) if total else limit_mb
+    return total
+
+def gpu_memory_mb():
+    """첫 번째 GPU의 전체 메모리 (MB, GPU가 없으면 None)"""
+    try:
+        import paddle
+        if paddle.is_compiled_with_cuda() and paddle.device.cuda.device_count() > 0:
+            return paddle.device.cuda.get_device_properties(0).total_memory / (1024 * 1024)
+    except Exception:
+        pass
+    return None
+
+def host_key():
+    """프로필 키 - 같은 장비라도 할당 코어 수가 바뀌면 다시 보정"""
+    return f"{socket.gethostname()}/{platform.machine()}/{available_cpus()}cpu"
+
+def mode_key(use_gpu=False, engine='paddle', lang='korean'):
+    """장비 안의 프로필 키 - 모드/엔진/언어가 다른 보정 결과는 섞이지 않음"""
+    return f"{'gpu' if use_gpu else 'cpu'}/{engine}/{lang}"
+
+def default_settings(use_gpu=False):
+    """프로필이 없을 때의 설정 (코어 수를 넘지 않는 스레드 수)"""
+    settings = {'cpu_threads': min(DEFAULT_CPU_THREADS, available_cpus()),
+                'enable_mkldnn': True, 'processes': 1}
+    if use_gpu:
+        settings['gpu_mem'] = DEFAULT_GPU_MEM
+    return settings
+
+def _load_profiles(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def load_profile(use_gpu=False, goal='latency', path=None, engine='paddle', lang='korean'):
+    """
+    이 장비에 저장된 보정 결과
+
+    Args:
+        use_gpu (bool): GPU 모드 프로필 여부
+        goal (str): 'latency'(단일 프로세스 최소 지연) 또는 'throughput'(최대 처리량)
+        path (str): 프로필 파일 경로 (None이면 기본 경로)
+        engine (str): 보정에 쓴 엔진 - 다른 엔진('stub' 등)의 측정 결과는 읽지 않음
+        lang (str): 보정에 쓴 언어
+
+    Returns:
+        dict: {'cpu_threads', 'enable_mkldnn', 'processes'[, 'gpu_mem']} - 없으면 None
+    """
+    entry = _load_profiles(path or DEFAULT_PROFILE_PATH).get(host_key(), {}).get(mode_key(use_gpu, engine, lang))
+    # 키가 같아도 기록된 엔진이 다르면 사용하지 않음 (가짜 엔진 측정값이 실제 실행에 적용되지 않게)
+    if not entry or goal not in entry or entry.get('engine') != engine:
+        return None
+    return dict(entry[goal])
+
+def resolve_settings(tuning='auto', use_gpu=False, goal='latency', engine='paddle', lang='korean'):
+    """
+    엔진 설정 결정
+
+    Args:
+        tuning: 'auto'면 저장된 프로필(없으면 기본값), dict면 기본값에 덮어쓴 설정,
+                None이면 기본값
+        use_gpu (bool): GPU 모드 여부
+        goal (str): 'auto'일 때 읽을 프로필 목표
+        engine (str): 'auto'일 때 읽을 프로필의 엔진
+        lang (str): 'auto'일 때 읽을 프로필의 언어
+
+    Returns:
+        tuple: (설정 dict, 출처 - 'profile', 'custom' 또는 'default')
+    """
+    settings = default_settings(use_gpu)
+    if tuning == 'auto':
+        profile = load_profile(use_gpu, goal, engine=engine, lang=lang)
+        if profile is not None:
+            settings.update(profile)
+            return settings, 'profile'
+        return settings, 'default'
+    if isinstance(tuning, dict):
+        settings.update(tuning)
+        return settings, 'custom'
+    return settings, 'default'
+
+def save_profile(entry, use_gpu=False, path=None):
+    """보정 결과를 이 장비/모드/엔진/언어 키로 저장 (다른 키의 프로필은 유지, 원자적 교체)"""
+    path = path or DEFAULT_PROFILE_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    profiles = _load_profiles(path)
+    profiles.setdefault(host_key(), {})[mode_key(use_gpu, entry['engine'], entry['lang'])] = entry
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(profiles, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+def thread_candidates(cpus):
+    """단일 프로세스 스레드 수 후보 (코어 수 이하의 2의 거듭제곱 + 코어 수)"""
+    candidates = {cpus}
+    threads = max(1, cpus // 16)
+    while threads < cpus:
+        candidates.add(threads)
+        threads *= 2
+    return sorted(candidates)
+
+def process_candidates(cpus, use_gpu=False):
+    """프로세스 수 후보 (2의 거듭제곱, 메모리 한도 안에서, GPU 모드는 최대 4)"""
+    limit = cpus
+    memory_mb = available_memory_mb()
+    if memory_mb:
+        limit = min(limit, max(1, int(memory_mb // PROCESS_MEMORY_MB)))
+    if use_gpu:
+        limit = min(limit, 4)
+    candidates, processes = [], 2
+    while processes <= limit:
+        candidates.append(processes)
+        processes *= 2
+    return candidates
+
+def _sweep_worker(engine_options, paths, barrier, results):
+    """측정 프로세스: 엔진 로드/워밍업 후 모든 프로세스가 준비되면 동시에 측정 시작"""
+    try:
+        from ocr_engine import get_engine, warmup_engine
+        from ocr_benchmark import engine_extractor
+
+        engine = get_engine(**engine_options)
+        warmup_engine(engine)
+        extract = engine_extractor(engine)
+        if paths:
+            extract(paths[0])
+    except Exception as e:
+        barrier.abort()
+        results.put(('error', repr(e)))
+        return
+    try:
+        barrier.wait()
+    except BrokenBarrierError:
+        return
+    latencies, lines = [], 0
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            lines += len(extract(path))
+            latencies.append(time.perf_counter() - start)
+    except Exception as e:
+        results.put(('error', repr(e)))
+        return
+    results.put(('ok', latencies, lines))
+
+def measure_setting(engine_options, setting, paths, iterations=2, timeout=600):
+    """
+    설정 하나의 처리량/지연 측정 (설정마다 새 프로세스에서 실행)
+
+    Paddle의 스레드/MKL-DNN 설정은 프로세스 단위로 남으므로, 단일 프로세스 설정도
+    별도 프로세스에서 측정해 조건을 같게 맞춥니다.
+
+    Args:
+        engine_options (dict): get_engine() 인자 (lang, device 등)
+        setting (dict): {'cpu_threads', 'enable_mkldnn', 'processes'[, 'gpu_mem']}
+        paths (list): 대표 이미지 경로
+        iterations (int): 이미지 목록 반복 횟수
+        timeout (float): 설정 하나의 최대 측정 시간 (초)
+
+    Returns:
+        dict: images_per_sec, lines_per_sec, p50, p95 (실패 시 error)
+    """
+    from ocr_benchmark import percentile
+
+    processes = setting['processes']
+    options = dict(engine_options, cpu_threads=setting['cpu_threads'], enable_mkldnn=setting['enable_mkldnn'])
+    if 'gpu_mem' in setting:
+        options['gpu_mem'] = setting['gpu_mem']
+    # 프로세스마다 최소 2장은 처리하도록 반복 횟수 보정 후 번갈아 나눠 줌
+    repeats = max(iterations, -(-2 * processes // len(paths)))
+    work = list(paths) * repeats
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(processes + 1)
+    results = context.Queue()
+    workers = [context.Process(target=_sweep_worker,
+                               args=(options, work[index::processes], barrier, results), daemon=True)
+               for index in range(processes)]
+    for worker in workers:
+        worker.start()
+
+    try:
+        try:
+            barrier.wait(timeout)
+        except BrokenBarrierError:
+            try:
+                return {'error': results.get(timeout=5)[1]}
+            except Empty:
+                return {'error': '측정 프로세스 준비 시간 초과'}
+        start = time.perf_counter()
+        latencies, lines = [], 0
+        for _ in workers:
+            try:
+                outcome = results.get(timeout=timeout)
+            except Empty:
+                return {'error': '측정 시간 초과'}
+            if outcome[0] != 'ok':
+                return {'error': outcome[1]}
+            latencies.extend(outcome[1])
+            lines += outcome[2]
+        elapsed = time.perf_counter() - start
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+
+    return {'images_per_sec': len(latencies) / elapsed if elapsed > 0 else 0.0,
+            'lines_per_sec': lines / elapsed if elapsed > 0 else 0.0,
+            'p50': percentile(latencies, 50), 'p95': percentile(latencies, 95)}
+
+def _sample_paths(images, limit):
+    """대표 이미지 목록 (폴더는 이미지/문서를 탐색, 없으면 합성 이미지 생성)"""
+    paths = []
+    for item in images or ():
+        if os.path.isdir(item):
+            from ocr_files import iter_files
+            for path in iter_files(item, include_documents=False):
+                paths.append(path)
+                if len(paths) >= limit:
+                    break
+        else:
+            paths.append(item)
+        if len(paths) >= limit:
+            break
+    if paths:
+        return paths[:limit]
+
+    from ocr_benchmark import generate_corpus
+    corpus_dir = os.path.join(tempfile.gettempdir(), 'ocr_autotune_corpus')
+    corpus = generate_corpus(corpus_dir, resolutions=((1024, 768), (2048, 1536)),
+                             images_per_case=max(1, limit // 4))
+    return [path for case_paths in corpus.values() for path in case_paths][:limit]
+
+def calibrate(lang='korean', use_gpu=False, images=None, sample_size=8, iterations=2,
+              engine='paddle', save=True):
+    """
+    이 장비의 설정 보정 (3단계 측정 후 latency/throughput 설정 선택)
+
+    Args:
+        lang (str): 언어 설정
+        use_gpu (bool): GPU 모드 설정 보정 여부 (MKL-DNN 단계 생략, 프로세스 최대 4개)
+        images (list): 대표 이미지 파일/폴더 (None이면 합성 이미지)
+        sample_size (int): 측정에 쓸 최대 이미지 수
+        iterations (int): 설정당 이미지 목록 반복 횟수
+        engine (str): 'paddle' 또는 'stub'
+        save (bool): 결과를 프로필로 저장할지 여부 (경로는 OCR_AUTOTUNE_PROFILE 또는 기본 경로 -
+                     GPUAcceleratedOCR/batch_process가 읽는 파일과 같음)
+
+    Returns:
+        dict: {'latency': 설정, 'throughput': 설정, 'results': 측정 결과 목록, ...}
+    """
+    cpus = available_cpus()
+    paths = _sample_paths(images, sample_size)
+    if engine == 'stub':
+        engine_options = {'device': 'stub'}
+    else:
+        engine_options = {'lang': lang, 'device': 'gpu' if use_gpu else 'cpu'}
+    gpu_total = gpu_memory_mb() if use_gpu and engine != 'stub' else None
+    print(f"자동 조정 시작: 코어 {cpus}개, 이미지 {len(paths)}장 x {iterations}회, "
+          f"{'GPU' if use_gpu else 'CPU'} 모드")
+
+    measured = []
+
+    def run(threads, mkldnn, processes):
+        setting = {'cpu_threads': threads, 'enable_mkldnn': mkldnn, 'processes': processes}
+        if use_gpu:
+            # 프로세스마다 GPU 메모리 풀을 나눠 가짐
+            share = gpu_total * 0.8 / processes if gpu_total else DEFAULT_GPU_MEM
+            setting['gpu_mem'] = int(min(DEFAULT_GPU_MEM, share))
+        for previous in measured:
+            if previous['setting'] == setting:
+                return previous
+        result = measure_setting(engine_options, setting, paths, iterations)
+        row = {'setting': setting, **result}
+        measured.append(row)
+        if 'error' in result:
+            print(f"  프로세스 {processes} x 스레드 {threads}, MKL-DNN {'켜짐' if mkldnn else '꺼짐'}: "
+                  f"실패 ({result['error']})")
+        else:
+            print(f"  프로세스 {processes} x 스레드 {threads}, MKL-DNN {'켜짐' if mkldnn else '꺼짐'}: "
+                  f"{result['images_per_sec']:.2f} 이미지/초, p50 {result['p50'] * 1000:.0f}ms")
+        return row
+
+    def fastest(rows):
+        rows = [row for row in rows if 'error' not in row]
+        return min(rows, key=lambda row: row['p50']) if rows else None
+
+    # 1. MKL-DNN 켜기/끄기 (GPU 모드에서는 CPU 전처리에만 영향이 있어 켜진 상태로 고정)
+    mkldnn = True
+    if not use_gpu:
+        best = fastest([run(cpus, flag, 1) for flag in (True, False)])
+        mkldnn = best['setting']['enable_mkldnn'] if best else True
+
+    # 2. 단일 프로세스 스레드 수
+    for threads in thread_candidates(cpus):
+        run(threads, mkldnn, 1)
+
+    # 3. 프로세스 수 x 프로세스당 스레드 수
+    for processes in process_candidates(cpus, use_gpu):
+        run(max(1, cpus // processes), mkldnn, processes)
+
+    ok = [row for row in measured if 'error' not in row]
+    if not ok:
+        raise RuntimeError("모든 설정의 측정이 실패했습니다")
+    latency = fastest([row for row in ok if row['setting']['processes'] == 1]) or fastest(ok)
+    throughput = max(ok, key=lambda row: row['images_per_sec'])
+
+    entry = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'cpus': cpus,
+        'lang': lang,
+        'engine': engine,
+        'images': len(paths),
+        'latency': latency['setting'],
+        'throughput': throughput['setting'],
+        'results': measured
+    }
+    print(f"최소 지연 설정: {_describe(latency['setting'])} (p50 {latency['p50'] * 1000:.0f}ms)")
+    print(f"최대 처리량 설정: {_describe(throughput['setting'])} "
+          f"({throughput['images_per_sec']:.2f} 이미지/초)")
+    if save:
+        print(f"프로필 저장: {save_profile(entry, use_gpu)}")
+    return entry
+
+def _describe(setting):
+    text = (f"프로세스 {setting['processes']} x 스레드 {setting['cpu_threads']}, "
+            f"MKL-DNN {'켜짐' if setting['enable_mkldnn'] else '꺼짐'}")
+    if 'gpu_mem' in setting:
+        text += f", GPU 메모리 {setting['gpu_mem']}MB"
+    return text
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPU 스레드 / MKL-DNN / 프로세스 수 자동 조정")
+    parser.add_argument('--lang', default='korean')
+    parser.add_argument('--gpu', action='store_true', help="GPU 모드 설정 보정")
+    parser.add_argument('--images', nargs='*', help="대표 이미지 파일 또는 폴더 (없으면 합성 이미지)")
+    parser.add_argument('--sample-size', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=2)
+    parser.add_argument('--engine', choices=['paddle', 'stub'], default='paddle')
+    parser.add_argument('--no-save', action='store_true', help="측정만 하고 저장하지 않음")
+    parser.add_argument('--show', action='store_true', help="저장된 프로필 출력")
+    args = parser.parse_args(argv)
+
+    if args.show:
+        key = mode_key(args.gpu, args.engine, args.lang)
+        entry = _load_profiles(DEFAULT_PROFILE_PATH).get(host_key(), {}).get(key)
+        if entry is None:
+            print(f"이 장비({host_key()})의 {key} 프로필이 없습니다 ({DEFAULT_PROFILE_PATH})")
+            return 1
+        print(f"{host_key()} {key} ({entry['created']})")
+        for goal in TUNING_GOALS:
+            print(f"- {goal}: {_describe(entry[goal])}")
+        return 0
+
+    try:
+        calibrate(args.lang, args.gpu, args.images, args.sample_size, args.iterations,
+                  args.engine, save=not args.no_save)
+    except RuntimeError as e:
+        print(e)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
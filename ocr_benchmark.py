@@ -0,0 +1,326 @@
+# OCR 벤치마크 도구
+#
+# 사용 예:
+#   python ocr_benchmark.py --engine stub                       # PaddleOCR 없이 파싱/입출력 측정
+#   python ocr_benchmark.py --engine paddle --lang korean --output bench.json
+#   python ocr_benchmark.py --engine paddle --baseline bench_baseline.json
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+from PIL import Image, ImageDraw, ImageFont
+import numpy as np
+
+from ocr_engine import get_engine, get_rss_mb
+from ocr_result import OCRResult
+from ocr_metrics import metrics
+from ocr_stream import read_and_decode
+
+# 합성 이미지 해상도 (README 성능 표와 같은 크기)
+DEFAULT_RESOLUTIONS = ((1024, 768), (2048, 1536), (4096, 3072))
+
+# 텍스트 밀도별 줄 간격 비율 (줄 높이 대비)
+DENSITIES = {'sparse': 4.0, 'dense': 1.6}
+
+SAMPLE_WORDS = ['PaddleOCR', '벤치마크', 'invoice', '합계', '2024-05-01', 'TOTAL',
+                '서울특별시', 'receipt', '12,500원', 'No.', '품목', 'quantity']
+
+def get_peak_rss_mb():
+    """프로세스 최대 RSS (MB)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return get_rss_mb()
+
+def percentile(values, q):
+    """최근접 순위 방식 분위수 (q: 0~100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(np.ceil(q / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+def _load_font(size):
+    """벤치마크용 폰트 (Pillow 10.1+는 크기 지정 가능)"""
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+def generate_corpus(corpus_dir, resolutions=DEFAULT_RESOLUTIONS, densities=('sparse', 'dense'),
+                    images_per_case=3, seed=0):
+    """
+    합성 이미지 코퍼스 생성 (이미 있으면 재사용)
+
+    Args:
+        corpus_dir (str): 이미지 저장 폴더
+        resolutions (tuple): (너비, 높이) 목록
+        densities (tuple): 텍스트 밀도 ('sparse', 'dense')
+        images_per_case (int): 조합당 이미지 수
+        seed (int): 난수 시드 (같은 시드면 같은 이미지)
+
+    Returns:
+        dict: 케이스 이름 -> 이미지 경로 목록
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    corpus = {}
+    for width, height in resolutions:
+        for density in densities:
+            case = f"{width}x{height}_{density}"
+            paths = []
+            for index in range(images_per_case):
+                path = os.path.join(corpus_dir, f"{case}_{index}.png")
+                if not os.path.exists(path):
+                    _draw_synthetic_page(path, width, height, DENSITIES[density],
+                                         random.Random(f"{seed}:{case}:{index}"))
+                paths.append(path)
+            corpus[case] = paths
+    return corpus
+
+def _draw_synthetic_page(path, width, height, spacing, rng):
+    """흰 배경에 임의 단어로 된 텍스트 라인을 그려 저장"""
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    font_size = max(12, height // 48)
+    font = _load_font(font_size)
+    y = font_size
+    while y < height - font_size * 2:
+        x = rng.randint(font_size, font_size * 4)
+        line = ' '.join(rng.choice(SAMPLE_WORDS) for _ in range(rng.randint(3, 8)))
+        draw.text((x, y), line, fill='black', font=font)
+        y += int(font_size * spacing)
+    image.save(path)
+
+def measure(extract, image_paths, warmup=2, iterations=5):
+    """
+    지연 시간/처리량 측정
+
+    Args:
+        extract (callable): 이미지 경로를 받아 OCRResult(또는 텍스트 리스트)를 반환하는 함수
+        image_paths (list): 측정할 이미지 경로
+        warmup (int): 측정 전 워밍업 실행 횟수 (모델 초기화/커널 준비 비용 제외)
+        iterations (int): 이미지당 측정 반복 횟수
+
+    Returns:
+        dict: p50/p95/p99 지연(초), 이미지/초, 라인/초, 최대 RSS
+    """
+    for i in range(warmup):
+        extract(image_paths[i % len(image_paths)])
+
+    latencies, lines = [], 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for path in image_paths:
+            t0 = time.perf_counter()
+            texts = extract(path)
+            latencies.append(time.perf_counter() - t0)
+            lines += len(texts)
+    total = time.perf_counter() - start
+
+    return {
+        'runs': len(latencies),
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'mean': sum(latencies) / len(latencies) if latencies else 0.0,
+        'min': min(latencies) if latencies else 0.0,
+        'max': max(latencies) if latencies else 0.0,
+        'images_per_sec': len(latencies) / total if total > 0 else 0.0,
+        'lines_per_sec': lines / total if total > 0 else 0.0,
+        'peak_rss_mb': get_peak_rss_mb()
+    }
+
+def engine_extractor(engine):
+    """엔진으로 추론 후 OCRResult로 정규화하는 함수 생성 (콘솔 출력 없음)"""
+    def extract(image_path):
+        _, image = read_and_decode(image_path)
+        with metrics.stage('inference'):
+            result = engine.ocr(image)
+        with metrics.stage('parse'):
+            return OCRResult.from_raw(result)
+    return extract
+
+def run_micro_benchmarks(iterations=200, lines=1000):
+    """
+    엔진과 무관한 파싱/직렬화 마이크로벤치마크
+
+    Args:
+        iterations (int): 반복 횟수
+        lines (int): 합성 결과의 라인 수
+
+    Returns:
+        dict: 케이스 이름 -> 측정 결과
+    """
+    rng = np.random.default_rng(0)
+    boxes = rng.integers(0, 4000, size=(lines, 4, 2))
+    legacy = [[[box.tolist(), (f"text {i}", 0.9)] for i, box in enumerate(boxes)]]
+    as_dict = [{'rec_texts': [f"text {i}" for i in range(lines)],
+                'rec_scores': rng.random(lines).tolist(),
+                'rec_boxes': rng.integers(0, 4000, size=(lines, 4))}]
+    parsed = OCRResult.from_raw(legacy)
+
+    cases = {
+        f'parse_list_{lines}': lambda: OCRResult.from_raw(legacy),
+        f'parse_dict_{lines}': lambda: OCRResult.from_raw(as_dict),
+        f'to_json_{lines}': lambda: OCRResult(parsed.texts, parsed.scores, parsed.boxes).to_json(),
+    }
+    results = {}
+    for name, func in cases.items():
+        latencies = []
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - t0)
+        results[name] = {
+            'runs': iterations,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'lines_per_sec': lines / percentile(latencies, 50) if latencies else 0.0
+        }
+    return results
+
+def compare_with_baseline(report, baseline, tolerance=0.10):
+    """
+    기준 결과와 비교하여 성능 저하 항목 찾기
+
+    Args:
+        report (dict): 현재 벤치마크 결과
+        baseline (dict): 기준 벤치마크 결과
+        tolerance (float): 허용 저하 비율 (0.10 = 10%)
+
+    Returns:
+        list: 저하 항목 설명 문자열 목록
+    """
+    regressions = []
+    for section in ('cases', 'micro'):
+        current_cases = report.get(section, {})
+        for case, base in baseline.get(section, {}).items():
+            current = current_cases.get(case)
+            if current is None:
+                continue
+            for key in ('p50', 'p95'):
+                if base.get(key) and current[key] > base[key] * (1 + tolerance):
+                    regressions.append(f"{case} {key}: {base[key] * 1000:.1f}ms -> {current[key] * 1000:.1f}ms")
+            if base.get('images_per_sec') and \
+                    current['images_per_sec'] < base['images_per_sec'] * (1 - tolerance):
+                regressions.append(f"{case} 이미지/초: {base['images_per_sec']:.2f} -> "
+                                   f"{current['images_per_sec']:.2f}")
+    return regressions
+
+def print_report(report):
+    """벤치마크 결과 표 출력"""
+    print(f"\n=== 벤치마크 결과 ({report['engine']}, {report['host']['machine']}) ===")
+    print(f"{'케이스':<22} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'이미지/초':>9} {'라인/초':>9} {'RSS(MB)':>8}")
+    for case, row in report['cases'].items():
+        print(f"{case:<22} {row['p50'] * 1000:>9.1f} {row['p95'] * 1000:>9.1f} {row['p99'] * 1000:>9.1f} "
+              f"{row['images_per_sec']:>9.2f} {row['lines_per_sec']:>9.1f} {row['peak_rss_mb']:>8.0f}")
+    for case, row in report.get('micro', {}).items():
+        print(f"{case:<22} {row['p50'] * 1000:>9.2f} {row['p95'] * 1000:>9.2f} {row['p99'] * 1000:>9.2f} "
+              f"{'-':>9} {row['lines_per_sec']:>9.0f} {'-':>8}")
+
+def run_benchmark(engine='stub', lang='korean', device=None, corpus_dir='bench_corpus',
+                  resolutions=DEFAULT_RESOLUTIONS, densities=('sparse', 'dense'),
+                  images_per_case=3, warmup=2, iterations=5, micro=True):
+    """
+    전체 벤치마크 실행
+
+    Args:
+        engine (str): 'paddle'(실제 모델) 또는 'stub'(가짜 엔진, 파싱/입출력만 측정)
+        lang (str): 언어 설정 (paddle 엔진)
+        device (str): 'cpu', 'gpu' 또는 None
+        corpus_dir (str): 합성 이미지 폴더
+        resolutions (tuple): 측정할 해상도 목록
+        densities (tuple): 측정할 텍스트 밀도 목록
+        images_per_case (int): 케이스당 이미지 수
+        warmup (int): 케이스별 워밍업 횟수
+        iterations (int): 이미지당 반복 횟수
+        micro (bool): 파싱/직렬화 마이크로벤치마크 포함 여부
+
+    Returns:
+        dict: 기계가 읽을 수 있는 벤치마크 결과
+    """
+    corpus = generate_corpus(corpus_dir, resolutions, densities, images_per_case)
+
+    load_start = time.perf_counter()
+    if engine == 'stub':
+        ocr_engine = get_engine(device='stub')
+    else:
+        ocr_engine = get_engine(lang=lang, device=device)
+    load_time = time.perf_counter() - load_start
+    extract = engine_extractor(ocr_engine)
+
+    report = {
+        'engine': engine if engine == 'stub' else f"paddle/{lang}/{device or 'default'}",
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'host': {
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version()
+        },
+        'settings': {'warmup': warmup, 'iterations': iterations, 'images_per_case': images_per_case},
+        'model_load_seconds': load_time,
+        'cases': {}
+    }
+    for case, paths in corpus.items():
+        print(f"측정 중: {case} ({len(paths)}장 x {iterations}회)")
+        report['cases'][case] = measure(extract, paths, warmup=warmup, iterations=iterations)
+    if micro:
+        report['micro'] = run_micro_benchmarks()
+    return report
+
+def _parse_resolutions(text):
+    """'1024x768,2048x1536' -> ((1024, 768), (2048, 1536))"""
+    return tuple(tuple(int(v) for v in item.lower().split('x')) for item in text.split(',') if item)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PaddleOCR 벤치마크")
+    parser.add_argument('--engine', choices=['paddle', 'stub'], default='stub')
+    parser.add_argument('--lang', default='korean')
+    parser.add_argument('--device', choices=['cpu', 'gpu'], default=None)
+    parser.add_argument('--corpus-dir', default='bench_corpus')
+    parser.add_argument('--resolutions', default=','.join(f"{w}x{h}" for w, h in DEFAULT_RESOLUTIONS))
+    parser.add_argument('--densities', default='sparse,dense')
+    parser.add_argument('--images-per-case', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--no-micro', action='store_true', help="파싱/직렬화 마이크로벤치마크 생략")
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    parser.add_argument('--baseline', help="비교할 기준 결과 JSON")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="허용 저하 비율 (기본 0.10)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(engine=args.engine, lang=args.lang, device=args.device,
+                           corpus_dir=args.corpus_dir,
+                           resolutions=_parse_resolutions(args.resolutions),
+                           densities=tuple(d for d in args.densities.split(',') if d),
+                           images_per_case=args.images_per_case,
+                           warmup=args.warmup, iterations=args.iterations,
+                           micro=not args.no_micro)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n성능 저하 감지 ({len(regressions)}건, 허용 {args.tolerance:.0%}):")
+            for item in regressions:
+                print(f"- {item}")
+            return 1
+        print(f"\n기준 대비 성능 저하 없음 (허용 {args.tolerance:.0%})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
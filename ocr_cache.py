@@ -0,0 +1,202 @@
+# OCR 결과 디스크 캐시 (이미지 내용 기반 키)
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+def get_model_version():
+    """설치된 PaddleOCR 버전 (캐시 키의 모델 버전으로 사용)"""
+    try:
+        import paddleocr
+        return getattr(paddleocr, '__version__', 'unknown')
+    except ImportError:
+        return 'unknown'
+
+def hash_image_source(image):
+    """
+    이미지 내용의 SHA-256 해시 계산
+
+    Args:
+        image: 이미지 파일 경로, bytes 또는 NumPy 배열
+
+    Returns:
+        str: 16진수 해시 문자열
+    """
+    digest = hashlib.sha256()
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        digest.update(image)
+    elif isinstance(image, (str, os.PathLike)):
+        with open(image, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    elif hasattr(image, 'tobytes') and hasattr(image, 'shape'):
+        # NumPy 배열: 형태와 dtype까지 포함해야 같은 바이트의 다른 이미지와 구분됨
+        digest.update(f"{image.shape}:{image.dtype}".encode())
+        digest.update(image.tobytes())
+    else:
+        raise TypeError(f"해시를 계산할 수 없는 이미지 형식: {type(image)}")
+    return digest.hexdigest()
+
+class OCRResultCache:
+    def __init__(self, cache_path="ocr_cache.sqlite", max_size_mb=512, model_version=None):
+        """
+        이미지 내용 기반 OCR 결과 캐시
+
+        키는 이미지 바이트 해시 + 언어/엔진 설정 + 모델 버전으로 만들어지며,
+        값은 정규화된 텍스트 리스트(texts)입니다. SQLite(WAL 모드)를 사용하므로
+        여러 프로세스가 같은 캐시 파일을 동시에 사용할 수 있습니다.
+
+        Args:
+            cache_path (str): 캐시 데이터베이스 파일 경로
+            max_size_mb (int): 최대 캐시 크기 (MB), 초과 시 LRU 순으로 삭제
+            model_version (str): 모델 버전 (None이면 설치된 PaddleOCR 버전)
+        """
+        self.cache_path = cache_path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.model_version = model_version or get_model_version()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+        parent = os.path.dirname(os.path.abspath(cache_path))
+        os.makedirs(parent, exist_ok=True)
+        self._connect()
+
+    def _connect(self):
+        """현재 프로세스용 연결 반환 (fork 후에는 새로 연결)"""
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        conn = sqlite3.connect(self.cache_path, timeout=30, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, texts TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        conn.execute("INSERT OR IGNORE INTO meta VALUES ('total_size', 0)")
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def make_key(self, image, settings=None):
+        """
+        캐시 키 생성
+
+        Args:
+            image: 이미지 파일 경로, bytes 또는 NumPy 배열
+            settings (dict): 언어 및 엔진 설정
+
+        Returns:
+            str: 캐시 키
+        """
+        settings_json = json.dumps(settings or {}, sort_keys=True, default=str)
+        return f"{hash_image_source(image)}:{self.model_version}:" \
+               f"{hashlib.sha256(settings_json.encode()).hexdigest()[:16]}"
+
+    def get(self, key):
+        """
+        캐시 조회
+
+        Args:
+            key (str): 캐시 키
+
+        Returns:
+            list: 캐시된 텍스트 리스트 (없으면 None)
+        """
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT texts FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, texts):
+        """
+        캐시 저장 (크기 한도 초과 시 오래 사용되지 않은 항목부터 삭제)
+
+        Args:
+            key (str): 캐시 키
+            texts (list): 정규화된 텍스트 리스트
+        """
+        payload = json.dumps(list(texts), ensure_ascii=False)
+        size = len(payload.encode('utf-8'))
+        if size > self.max_size_bytes:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                delta = size - (old[0] if old else 0)
+                conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                             (key, payload, size, time.time()))
+                conn.execute("UPDATE meta SET value = value + ? WHERE name = 'total_size'", (delta,))
+                self._evict(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, conn):
+        """LRU 순서로 크기 한도까지 삭제 (트랜잭션 내부에서 호출)"""
+        total = conn.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()[0]
+        while total > self.max_size_bytes:
+            rows = conn.execute(
+                "SELECT key, size FROM entries ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_size_bytes:
+                    break
+        conn.execute("UPDATE meta SET value = ? WHERE name = 'total_size'", (max(total, 0),))
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries")
+            conn.execute("UPDATE meta SET value = 0 WHERE name = 'total_size'")
+
+    def stats(self):
+        """
+        캐시 통계
+
+        Returns:
+            dict: 적중/미스 횟수, 적중률, 항목 수, 사용 중인 크기
+        """
+        with self._lock:
+            conn = self._connect()
+            entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            total = conn.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'size_bytes': total,
+            'max_size_bytes': self.max_size_bytes
+        }
+
+    def close(self):
+        """데이터베이스 연결 종료"""
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
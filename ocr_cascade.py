@@ -0,0 +1,255 @@
+# 신뢰도 기반 2단계 모델 캐스케이드
+#
+# 가벼운(mobile) 모델로 모든 라인을 검출/인식한 뒤, 신뢰도가 기준 미만인 라인(또는
+# 평균 신뢰도가 낮은 페이지의 모든 라인)만 무거운(server) 인식 모델로 다시 인식합니다.
+# 검출과 라인 잘라내기는 한 번만 하고 같은 조각(crop)을 두 번째 모델에 넘깁니다.
+import time
+import threading
+import numpy as np
+from ocr_stages import has_stage_api, detect, crop_region, classify
+from ocr_metrics import metrics
+
+CASCADE_LEVELS = ('line', 'page')
+# 누적 통계 항목 (워커 공유 배열에 합산할 때의 순서)
+STAT_NAMES = ('pages', 'escalated_pages', 'lines', 'escalated_lines', 'improved_lines',
+              'tier1_seconds', 'tier2_seconds')
+
+class CascadeConfig:
+    def __init__(self, threshold=0.85, heavy_options=None, level='line', page_threshold=0.90):
+        """
+        캐스케이드 설정
+
+        Args:
+            threshold (float): 이 값 미만의 신뢰도를 가진 라인을 두 번째 모델로 다시 인식
+            heavy_options (dict): 두 번째(무거운) 모델의 엔진 옵션 - 첫 번째 모델 옵션에 덮어씀 (필수)
+                                  예: {'rec_model_dir': './ch_PP-OCRv4_rec_server_infer'}
+            level (str): 'line'이면 낮은 라인만, 'page'면 페이지 평균 신뢰도가 page_threshold
+                         미만일 때 그 페이지의 모든 라인을 다시 인식 (낮은 라인은 항상 포함)
+            page_threshold (float): 'page' 단계의 페이지 평균 신뢰도 기준
+
+        Raises:
+            ValueError: heavy_options가 비어 있는 경우 (두 단계가 같은 모델이 됨)
+        """
+        if not heavy_options:
+            raise ValueError("캐스케이드에는 두 번째 모델의 엔진 옵션(heavy_options)이 필요합니다 "
+                             "(예: {'rec_model_dir': './ch_PP-OCRv4_rec_server_infer'})")
+        if level not in CASCADE_LEVELS:
+            raise ValueError(f"지원하지 않는 캐스케이드 단위: {level} (지원: {', '.join(CASCADE_LEVELS)})")
+        self.threshold = threshold
+        self.heavy_options = dict(heavy_options or {})
+        self.level = level
+        self.page_threshold = page_threshold
+
+    def to_dict(self):
+        """캐시 키용 설정 딕셔너리"""
+        return {'threshold': self.threshold, 'heavy_options': self.heavy_options,
+                'level': self.level, 'page_threshold': self.page_threshold}
+
+class _CascadeRecognizer:
+    """엔진의 text_recognizer 자리에 들어가는 2단계 인식기 (한 번 호출 = 한 묶음의 조각)"""
+
+    # run_batch()가 조각별 페이지 번호를 함께 넘기도록 알림
+    accepts_groups = True
+
+    def __init__(self, cascade):
+        self._cascade = cascade
+
+    @property
+    def rec_batch_num(self):
+        return getattr(self._cascade.light.text_recognizer, 'rec_batch_num', None)
+
+    @rec_batch_num.setter
+    def rec_batch_num(self, value):
+        # run_batch()의 인식 배치 크기 설정을 두 모델 모두에 적용
+        for engine in (self._cascade.light, self._cascade.heavy):
+            if hasattr(engine.text_recognizer, 'rec_batch_num'):
+                engine.text_recognizer.rec_batch_num = value
+
+    def __call__(self, crops, groups=None):
+        return self._cascade.recognize(crops, groups), 0.0
+
+class CascadeEngine:
+    # warmup_engine()이 두 엔진을 따로 워밍업하도록 알림 (통계에 더미 추론이 섞이지 않음)
+    owns_warmup = True
+
+    def __init__(self, light, heavy, config, share_stats_with=None):
+        """
+        두 엔진을 하나의 PaddleOCR 2.x 엔진처럼 쓰는 캐스케이드 엔진
+
+        ocr()과 단계별 속성(text_detector, text_recognizer)을 제공하므로 기존의 단일 추론,
+        배치 추론(run_batch), 타일 모드에서 그대로 사용할 수 있습니다.
+
+        Args:
+            light: 첫 번째(가벼운) 엔진 - 검출, 방향 분류, 1차 인식
+            heavy: 두 번째(무거운) 엔진 - 신뢰도가 낮은 라인의 재인식에만 사용
+            config (CascadeConfig): 캐스케이드 설정
+            share_stats_with (CascadeEngine): 통계를 함께 누적할 엔진 (타일 병렬 처리용 복제본)
+
+        Raises:
+            ValueError: 엔진이 단계별 호출을 지원하지 않는 경우 (조각을 재사용할 수 없음)
+        """
+        if not (has_stage_api(light) and has_stage_api(heavy)):
+            raise ValueError("캐스케이드 모드는 단계별 호출(text_detector/text_recognizer)을 지원하는 엔진이 필요합니다")
+        self.light = light
+        self.heavy = heavy
+        self.config = config
+        self.text_detector = light.text_detector
+        self.text_classifier = getattr(light, 'text_classifier', None)
+        self.use_angle_cls = getattr(light, 'use_angle_cls', False)
+        self.drop_score = getattr(light, 'drop_score', 0.0)
+        self.text_recognizer = _CascadeRecognizer(self)
+        if share_stats_with is not None:
+            self._lock, self.stats = share_stats_with._lock, share_stats_with.stats
+        else:
+            self._lock = threading.Lock()
+            self.stats = dict.fromkeys(STAT_NAMES, 0)
+
+    def recognize(self, crops, groups=None):
+        """
+        조각 목록을 1차 인식 후 기준 미만만 2차 인식
+
+        Args:
+            crops (list): 텍스트 라인 조각
+            groups (list): 조각별 페이지 번호 (None이면 전체를 한 페이지로 봄)
+
+        Returns:
+            list: (텍스트, 신뢰도) 목록 - 2차 결과의 신뢰도가 더 높을 때만 교체
+        """
+        if not crops:
+            return []
+        start = time.perf_counter()
+        rec_res, _ = self.light.text_recognizer(crops)
+        tier1 = time.perf_counter() - start
+
+        scores = np.fromiter((score for _, score in rec_res), dtype=np.float32, count=len(rec_res))
+        escalate = scores < self.config.threshold
+        groups = np.zeros(len(crops), dtype=np.int64) if groups is None else np.asarray(groups)
+        page_ids, page_index, page_sizes = np.unique(groups, return_inverse=True, return_counts=True)
+        if self.config.level == 'page':
+            page_means = np.bincount(page_index, weights=scores, minlength=len(page_ids)) / page_sizes
+            low_pages = page_means < self.config.page_threshold
+            escalate |= low_pages[page_index]
+
+        selected = np.flatnonzero(escalate)
+        tier2, improved = 0.0, 0
+        if len(selected):
+            start = time.perf_counter()
+            heavy_res, _ = self.heavy.text_recognizer([crops[i] for i in selected.tolist()])
+            tier2 = time.perf_counter() - start
+            rec_res = list(rec_res)
+            for i, (text, score) in zip(selected.tolist(), heavy_res):
+                if score > scores[i]:
+                    rec_res[i] = (text, score)
+                    improved += 1
+
+        escalated_pages = int(np.count_nonzero(np.bincount(page_index[selected], minlength=len(page_ids))))
+        with self._lock:
+            stats = self.stats
+            stats['pages'] += len(page_ids)
+            stats['escalated_pages'] += escalated_pages
+            stats['lines'] += len(crops)
+            stats['escalated_lines'] += len(selected)
+            stats['improved_lines'] += improved
+            stats['tier1_seconds'] += tier1
+            stats['tier2_seconds'] += tier2
+        metrics.inc('cascade_lines', len(crops))
+        metrics.inc('cascade_escalated_lines', len(selected))
+        return rec_res
+
+    def ocr(self, image, **kwargs):
+        """PaddleOCR 2.x ocr()와 같은 형식의 결과 반환 (검출/조각은 한 번만)"""
+        if not hasattr(image, 'shape'):
+            from ocr_stream import read_and_decode
+            _, image = read_and_decode(image)
+        boxes = detect(self, image)
+        if not boxes:
+            return [None]
+        crops = classify(self, [crop_region(image, box) for box in boxes])
+        rec_res = self.recognize(crops)
+        return [[[np.asarray(box).tolist(), (text, float(score))]
+                 for box, (text, score) in zip(boxes, rec_res) if score >= self.drop_score]]
+
+    def warmup(self, runs=2):
+        """
+        두 엔진을 각각 더미 추론으로 워밍업 (warmup_engine() 참조)
+
+        Returns:
+            list: 실행별 두 엔진 소요 시간 합 (초)
+        """
+        from ocr_engine import warmup_engine
+
+        light = warmup_engine(self.light, runs)
+        heavy = warmup_engine(self.heavy, runs)
+        return [a + b for a, b in zip(light, heavy)]
+
+    def counters(self):
+        """STAT_NAMES 순서의 누적 통계"""
+        with self._lock:
+            return tuple(self.stats[name] for name in STAT_NAMES)
+
+    def report(self):
+        """
+        2단계로 넘어간 비율과 시간
+
+        Returns:
+            dict: summarize() 결과
+        """
+        return summarize(self.counters())
+
+    def print_report(self):
+        """캐스케이드 통계 출력"""
+        print_report(self.report())
+
+def summarize(counters):
+    """
+    누적 통계로 라인/페이지 승격 비율과 2단계 시간 비중 계산
+
+    Args:
+        counters: STAT_NAMES 순서의 값 (CascadeEngine.counters() 또는 워커 공유 배열)
+
+    Returns:
+        dict: 누적 통계 + line_escalation_rate, page_escalation_rate, tier2_time_share
+    """
+    stats = dict(zip(STAT_NAMES, (float(value) for value in counters)))
+    for name in ('pages', 'escalated_pages', 'lines', 'escalated_lines', 'improved_lines'):
+        stats[name] = int(stats[name])
+    total_seconds = stats['tier1_seconds'] + stats['tier2_seconds']
+    stats['line_escalation_rate'] = stats['escalated_lines'] / stats['lines'] if stats['lines'] else 0.0
+    stats['page_escalation_rate'] = stats['escalated_pages'] / stats['pages'] if stats['pages'] else 0.0
+    stats['tier2_time_share'] = stats['tier2_seconds'] / total_seconds if total_seconds else 0.0
+    return stats
+
+def print_report(report):
+    """캐스케이드 통계 출력"""
+    print("\n=== 캐스케이드 ===")
+    print(f"라인: {report['lines']}개 중 {report['escalated_lines']}개 2단계 "
+          f"({report['line_escalation_rate'] * 100:.1f}%), 개선 {report['improved_lines']}개")
+    print(f"페이지: {report['pages']}개 중 {report['escalated_pages']}개 2단계 "
+          f"({report['page_escalation_rate'] * 100:.1f}%)")
+    print(f"인식 시간: 1단계 {report['tier1_seconds']:.2f}초, 2단계 {report['tier2_seconds']:.2f}초 "
+          f"(2단계 비중 {report['tier2_time_share'] * 100:.1f}%)")
+
+def build_cascade(engine_options, config, replica=0, share_stats_with=None):
+    """
+    레지스트리에서 두 엔진을 가져와 캐스케이드 엔진 생성
+
+    Args:
+        engine_options (dict): 첫 번째 엔진의 get_engine() 인자
+        config (CascadeConfig): 캐스케이드 설정 (heavy_options를 첫 번째 옵션에 덮어씀)
+        replica (int): 엔진 복제본 번호 (타일 병렬 처리용)
+        share_stats_with (CascadeEngine): 통계를 함께 누적할 엔진
+
+    Returns:
+        CascadeEngine: 캐스케이드 엔진
+
+    Raises:
+        ValueError: heavy_options를 덮어써도 첫 번째 엔진 옵션과 같은 경우 (같은 엔진이 두 번 인식)
+    """
+    from ocr_engine import get_engine
+
+    heavy_options = {**engine_options, **config.heavy_options}
+    if heavy_options == dict(engine_options):
+        raise ValueError(f"두 번째 모델의 옵션이 첫 번째 모델과 같습니다: {config.heavy_options}")
+    light = get_engine(**engine_options, replica=replica)
+    heavy = get_engine(**heavy_options, replica=replica)
+    return CascadeEngine(light, heavy, config, share_stats_with)
@@ -0,0 +1,565 @@
+# 텍스트 라인 조각(crop) 단위 인식 결과 캐시 (지각 서명)
+#
+# 양식 라벨, 머리글/바닥글, 로고처럼 문서마다 반복되는 영역은 배치 하나에서 같은 조각을
+# 수천 번 인식합니다. 검출과 인식 사이에서 조각을 지각 서명으로 바꿔 거의 같은 조각이면
+# 이전 인식 결과를 재사용하고, 처음 보는 조각만 인식기로 보냅니다.
+#
+# - 서명: 녹색 채널 → 글자(잉크) 영역만 잘라 위치 차이 제거 → 글자 높이 기준 격자
+#   (hash_rows x 가로세로비)로 면적 평균 → 대비 정규화한 썸네일. 밝기/대비/여백이 달라도
+#   같은 썸네일이 됩니다.
+# - 검색: 썸네일을 이진화해 가로로 CHUNKS개 구간으로 나누고 구간별 해시로 색인합니다
+#   (다중 색인 해싱). 잡음으로 몇 구간이 바뀌어도 남은 구간으로 후보를 찾습니다.
+# - 확인: 지각 해시만으로는 "1,000"과 "1.000"처럼 글자 하나가 다른 조각이 같은 키가 될 수
+#   있으므로, 후보는 썸네일의 2x2 블록 평균 차이가 tolerance 이하일 때만 적중으로 봅니다.
+# - 신뢰도가 min_confidence 미만인 결과는 저장하지 않아 틀린 인식이 퍼지지 않습니다.
+# - 메모리는 max_memory_mb 한도의 LRU, store_path를 주면 SQLite(WAL)에도 보관하여
+#   실행 간, 워커 프로세스 간에 공유합니다.
+import os
+import json
+import math
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict, Counter, deque
+import numpy as np
+from ocr_stages import has_stage_api, detect, crop_region, classify, recognize
+from ocr_metrics import metrics
+
+# 썸네일을 나누는 색인 구간 수 (이 수보다 적은 구간이 바뀐 조각은 항상 후보로 찾음)
+CHUNKS = 4
+# 색인 구간마다 기억하는 최근 항목 수 (흔한 구간의 후보 검색 비용 상한)
+CHUNK_DEPTH = 64
+# 후보 중 확인할 최대 개수 (일치하는 구간이 많은 순)
+VERIFY_CANDIDATES = 8
+# 항목당 썸네일 외의 메모리 추정치 (바이트)
+ENTRY_OVERHEAD = 512
+
+# counters() 순서 (배치 워커 간 공유 배열에도 같은 순서로 누적)
+COUNTER_NAMES = ('lookups', 'hits', 'store_hits', 'recognized', 'recognize_seconds')
+
+def _area_means(gray, rows, cols):
+    """rows x cols 격자의 칸별 평균 밝기 (격자보다 작은 영역은 최근접 표본)"""
+    height, width = gray.shape
+    r = np.linspace(0, height, rows + 1).astype(np.int64)
+    c = np.linspace(0, width, cols + 1).astype(np.int64)
+    sums = np.add.reduceat(np.add.reduceat(gray, r[:-1], axis=0, dtype=np.float64), c[:-1], axis=1)
+    return sums / np.outer(np.maximum(np.diff(r), 1), np.maximum(np.diff(c), 1))
+
+class CropSignature:
+    __slots__ = ('thumb', 'chunks', 'key')
+
+    def __init__(self, thumb, chunks, key):
+        """
+        조각의 지각 서명
+
+        Args:
+            thumb (numpy.ndarray): 대비 정규화한 uint8 썸네일 (글자 = 255)
+            chunks (tuple): 색인 구간 키 (정보가 없는 빈/꽉 찬 구간은 제외)
+            key (str): 썸네일 내용 해시 (완전히 같은 조각끼리만 같음)
+        """
+        self.thumb = thumb
+        self.chunks = chunks
+        self.key = key
+
+    @property
+    def nbytes(self):
+        return self.thumb.nbytes + ENTRY_OVERHEAD
+
+def crop_signature(crop, rows=16):
+    """
+    텍스트 라인 조각의 지각 서명
+
+    Args:
+        crop (numpy.ndarray): BGR 또는 회색조 조각
+        rows (int): 썸네일 행 수 (열 수는 가로세로비에 맞춰 정사각형 칸이 되도록)
+
+    Returns:
+        CropSignature: 서명 - 너무 작거나 글자가 없는(대비 없는) 조각이면 None
+    """
+    image = np.asarray(crop)
+    # 녹색 채널을 휘도 근사로 사용 (채널 평균보다 훨씬 빠르고 서명에는 충분)
+    gray = image[:, :, 1] if image.ndim == 3 else image
+    if min(gray.shape[:2]) < 8:
+        return None
+    sample = gray[::2, ::2].ravel()
+    # 짧은 단어가 넓은 박스에 있으면 글자가 몇 %뿐이므로 1/99 백분위수로 대비 측정
+    low_index, high_index = int(len(sample) * 0.01), int(len(sample) * 0.99)
+    low, high = np.partition(sample, (low_index, high_index))[[low_index, high_index]].astype(np.float64)
+    if high - low < 24:
+        return None
+    # 글자는 소수 픽셀이므로 평균이 중간보다 밝으면 밝은 배경의 어두운 글자
+    middle = (low + high) / 2
+    dark_text = sample.mean() > middle
+    ink = gray < middle if dark_text else gray > middle
+    ink_rows, ink_cols = np.flatnonzero(ink.any(axis=1)), np.flatnonzero(ink.any(axis=0))
+    top, bottom, left, right = ink_rows[0], ink_rows[-1] + 1, ink_cols[0], ink_cols[-1] + 1
+    if bottom - top < 4:
+        return None
+    region = gray[top:bottom, left:right]
+    # 가로세로비는 1/12 옥타브(약 6%) 단위로 양자화해 검출 박스의 작은 흔들림을 흡수
+    aspect = 2 ** (round(math.log2((right - left) / (bottom - top)) * 12) / 12)
+    cols = int(min(max(round(rows * aspect), CHUNKS), 1024))
+    cells = (_area_means(region, rows, cols) - low) / (high - low)
+    thumb = np.clip((1 - cells if dark_text else cells) * 255 + 0.5, 0, 255).astype(np.uint8)
+
+    shape = f"{rows}x{cols}"
+    bits = thumb[::2, ::2] >= 128
+    chunks = []
+    for index, part in enumerate(np.array_split(bits, CHUNKS, axis=1)):
+        if part.any() and not part.all():
+            digest = hashlib.blake2b(np.packbits(part).tobytes(), digest_size=8).hexdigest()
+            chunks.append(f"{shape}:{index}:{digest}")
+    key = f"{shape}:{hashlib.blake2b(thumb.tobytes(), digest_size=16).hexdigest()}"
+    return CropSignature(thumb, tuple(chunks), key)
+
+def thumbs_match(a, b, tolerance=0.3):
+    """
+    두 썸네일이 같은 글자인지 확인 (2x2 블록 평균 차이의 최댓값이 tolerance 이하)
+
+    잡음은 블록 평균에서 작아지고, 쉼표/마침표나 0/8처럼 글자 일부가 다르면 그 블록에서
+    대비의 절반 가까이 차이가 나므로 둘을 구분할 수 있습니다.
+    """
+    if a.shape != b.shape:
+        return False
+    diff = np.abs(a.astype(np.int16) - b.astype(np.int16))
+    if diff.shape[0] % 2 or diff.shape[1] % 2:
+        diff = np.pad(diff, ((0, diff.shape[0] % 2), (0, diff.shape[1] % 2)), mode='edge')
+    blocks = diff[0::2, 0::2] + diff[1::2, 0::2] + diff[0::2, 1::2] + diff[1::2, 1::2]
+    return int(blocks.max()) <= tolerance * 255 * 4
+
+class _NearIndex:
+    """색인 구간 키 -> 최근 항목 (다중 색인 해싱)"""
+
+    def __init__(self):
+        self._chunks = {}
+
+    def add(self, item_id, chunks):
+        for chunk in chunks:
+            bucket = self._chunks.get(chunk)
+            if bucket is None:
+                bucket = self._chunks[chunk] = deque(maxlen=CHUNK_DEPTH)
+            bucket.append(item_id)
+
+    def remove(self, item_id, chunks):
+        for chunk in chunks:
+            bucket = self._chunks.get(chunk)
+            if bucket is None:
+                continue
+            try:
+                bucket.remove(item_id)
+            except ValueError:
+                pass
+            if not bucket:
+                del self._chunks[chunk]
+
+    def candidates(self, chunks, limit=VERIFY_CANDIDATES):
+        """일치하는 구간이 많은 순서의 후보 (같으면 최근 항목 먼저)"""
+        counts = Counter()
+        for chunk in chunks:
+            for item_id in reversed(self._chunks.get(chunk, ())):
+                counts[item_id] += 1
+        return [item_id for item_id, _ in counts.most_common(limit)]
+
+def summarize(counters):
+    """
+    누적 카운터로 적중률과 절약한 인식 시간 추정
+
+    Args:
+        counters: COUNTER_NAMES 순서의 값 (CropCache.counters() 또는 워커 공유 배열)
+
+    Returns:
+        dict: 카운터 + hit_rate, seconds_per_crop, estimated_saved_seconds
+    """
+    stats = dict(zip(COUNTER_NAMES, (float(value) for value in counters)))
+    for name in ('lookups', 'hits', 'store_hits', 'recognized'):
+        stats[name] = int(stats[name])
+    per_crop = stats['recognize_seconds'] / stats['recognized'] if stats['recognized'] else 0.0
+    stats['hit_rate'] = stats['hits'] / stats['lookups'] if stats['lookups'] else 0.0
+    stats['seconds_per_crop'] = per_crop
+    stats['estimated_saved_seconds'] = stats['hits'] * per_crop
+    return stats
+
+def print_report(stats):
+    """조각 캐시 통계 출력"""
+    print("\n=== 조각 캐시 ===")
+    print(f"조각: {stats['lookups']}개 중 {stats['hits']}개 재사용 ({stats['hit_rate'] * 100:.1f}%, "
+          f"저장소 {stats['store_hits']}개), 인식 {stats['recognized']}개")
+    print(f"인식 시간: {stats['recognize_seconds']:.2f}초 (조각당 {stats['seconds_per_crop'] * 1000:.1f}ms), "
+          f"절약 추정 {stats['estimated_saved_seconds']:.2f}초")
+
+class CropCache:
+    def __init__(self, max_memory_mb=64, store_path=None, store_max_entries=1000000,
+                 hash_rows=16, tolerance=0.3, min_confidence=0.9):
+        """
+        조각 지각 서명 -> (텍스트, 신뢰도) 캐시 (스레드 안전)
+
+        Args:
+            max_memory_mb (float): 메모리 LRU 한도 (MB, 항목당 썸네일 hash_rows x 가로 칸 수 바이트 + 약 0.5KB)
+            store_path (str): SQLite 저장소 경로 (None이면 메모리에만 보관)
+            store_max_entries (int): 저장소 최대 항목 수 (초과 시 오래 쓰지 않은 항목부터 삭제)
+            hash_rows (int): 썸네일 행 수 (클수록 엄격 - 적중은 줄고 작은 글자 차이도 구분)
+            tolerance (float): 같은 조각으로 볼 2x2 블록 평균 차이 (대비에 대한 비율)
+            min_confidence (float): 이 값 이상의 신뢰도를 가진 결과만 저장
+        """
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self.store_path = store_path
+        self.store_max_entries = store_max_entries
+        self.hash_rows = hash_rows
+        self.tolerance = tolerance
+        self.min_confidence = min_confidence
+        self._entries = OrderedDict()
+        self._index = _NearIndex()
+        self._memory_bytes = 0
+        self._counters = [0, 0, 0, 0, 0.0]
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        if store_path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+            self._connect()
+
+    def _connect(self):
+        """현재 프로세스용 저장소 연결 (fork 후에는 새로 연결)"""
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+        conn = sqlite3.connect(self.store_path, timeout=30, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS crops ("
+            "key TEXT PRIMARY KEY, rows INTEGER NOT NULL, cols INTEGER NOT NULL, thumb BLOB NOT NULL, "
+            "chunks TEXT NOT NULL, text TEXT NOT NULL, score REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_crops_access ON crops(last_access)")
+        conn.execute("CREATE TABLE IF NOT EXISTS crop_chunks (chunk TEXT NOT NULL, key TEXT NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_crop_chunks ON crop_chunks(chunk)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_crop_chunks_key ON crop_chunks(key)")
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def signature(self, crop):
+        """이 캐시 설정의 조각 서명"""
+        return crop_signature(crop, self.hash_rows)
+
+    def _remember(self, signature, text, score):
+        """메모리 LRU에 추가 (잠금을 잡은 상태에서 호출)"""
+        if signature.key in self._entries:
+            self._entries.move_to_end(signature.key)
+            return
+        self._entries[signature.key] = (signature, text, score)
+        self._index.add(signature.key, signature.chunks)
+        self._memory_bytes += signature.nbytes
+        while self._memory_bytes > self.max_memory_bytes and self._entries:
+            key, (old, _, _) = self._entries.popitem(last=False)
+            self._index.remove(key, old.chunks)
+            self._memory_bytes -= old.nbytes
+
+    def _find(self, signature):
+        """메모리에서 같은 조각 찾기 (잠금을 잡은 상태에서 호출)"""
+        entry = self._entries.get(signature.key)
+        if entry is None:
+            for key in self._index.candidates(signature.chunks):
+                candidate = self._entries.get(key)
+                if candidate is not None and thumbs_match(signature.thumb, candidate[0].thumb, self.tolerance):
+                    entry = candidate
+                    break
+        if entry is None:
+            return None
+        self._entries.move_to_end(entry[0].key)
+        return entry[1], entry[2]
+
+    def _find_stored(self, conn, signatures):
+        """
+        저장소에서 같은 조각 찾기 (잠금을 잡은 상태에서 호출, 찾은 항목은 메모리에도 올림)
+
+        Args:
+            signatures (dict): 목록 위치 -> 메모리에서 찾지 못한 서명
+
+        Returns:
+            dict: 목록 위치 -> (텍스트, 신뢰도)
+        """
+        keys = sorted({signature.key for signature in signatures.values()})
+        chunks = sorted({chunk for signature in signatures.values() for chunk in signature.chunks})
+        rows = {}
+        for values, query in ((keys, "SELECT * FROM crops WHERE key IN ({})"),
+                              (chunks, "SELECT * FROM crops WHERE key IN "
+                                       "(SELECT key FROM crop_chunks WHERE chunk IN ({}))")):
+            for start in range(0, len(values), 500):
+                part = values[start:start + 500]
+                for row in conn.execute(query.format(','.join('?' * len(part))), part):
+                    rows[row[0]] = row
+        if not rows:
+            return {}
+
+        index, stored = _NearIndex(), {}
+        for key, row_count, col_count, thumb, chunk_json, text, score, _ in rows.values():
+            signature = CropSignature(np.frombuffer(thumb, dtype=np.uint8).reshape(row_count, col_count),
+                                      tuple(json.loads(chunk_json)), key)
+            stored[key] = (signature, text, score)
+            index.add(key, signature.chunks)
+        found, used = {}, set()
+        for position, signature in signatures.items():
+            keys = [signature.key] if signature.key in stored else []
+            for key in keys + index.candidates(signature.chunks):
+                candidate, text, score = stored[key]
+                if thumbs_match(signature.thumb, candidate.thumb, self.tolerance):
+                    found[position] = (text, score)
+                    used.add(key)
+                    self._remember(candidate, text, score)
+                    break
+        if used:
+            now = time.time()
+            conn.executemany("UPDATE crops SET last_access = ? WHERE key = ?", [(now, key) for key in used])
+        return found
+
+    def lookup(self, signatures):
+        """
+        서명 목록 조회 (None 서명은 항상 미스)
+
+        Returns:
+            list: 서명별 (텍스트, 신뢰도) - 없으면 None
+        """
+        results = [None] * len(signatures)
+        with self._lock:
+            missing = {}
+            for i, signature in enumerate(signatures):
+                if signature is None:
+                    continue
+                results[i] = self._find(signature)
+                if results[i] is None:
+                    missing[i] = signature
+            store_hits = 0
+            if missing and self.store_path is not None:
+                for i, value in self._find_stored(self._connect(), missing).items():
+                    results[i] = value
+                    store_hits += 1
+            hits = sum(result is not None for result in results)
+            self._counters[0] += len(signatures)
+            self._counters[1] += hits
+            self._counters[2] += store_hits
+        metrics.inc('crop_cache_lookups', len(signatures))
+        metrics.inc('crop_cache_hits', hits)
+        return results
+
+    def store(self, items):
+        """
+        인식 결과 저장 (신뢰도가 min_confidence 미만인 결과는 건너뜀)
+
+        Args:
+            items (list): (서명, 텍스트, 신뢰도) 목록
+        """
+        items = [(signature, text, float(score)) for signature, text, score in items
+                 if signature is not None and score >= self.min_confidence]
+        if not items:
+            return
+        with self._lock:
+            for signature, text, score in items:
+                self._remember(signature, text, score)
+            if self.store_path is None:
+                return
+            conn = self._connect()
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for signature, text, score in items:
+                    inserted = conn.execute(
+                        "INSERT OR IGNORE INTO crops VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (signature.key, *signature.thumb.shape, signature.thumb.tobytes(),
+                         json.dumps(signature.chunks), text, score, now)).rowcount
+                    if inserted:
+                        conn.executemany("INSERT INTO crop_chunks VALUES (?, ?)",
+                                         [(chunk, signature.key) for chunk in signature.chunks])
+                excess = conn.execute("SELECT COUNT(*) FROM crops").fetchone()[0] - self.store_max_entries
+                if excess > 0:
+                    old = [(row[0],) for row in conn.execute(
+                        "SELECT key FROM crops ORDER BY last_access LIMIT ?", (excess,))]
+                    conn.executemany("DELETE FROM crops WHERE key = ?", old)
+                    conn.executemany("DELETE FROM crop_chunks WHERE key = ?", old)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def record_hits(self, count):
+        """저장된 항목 없이 재사용한 조각 수 (한 호출 안의 중복 조각)"""
+        with self._lock:
+            self._counters[1] += count
+        metrics.inc('crop_cache_hits', count)
+
+    def record_recognition(self, count, seconds):
+        """캐시에서 찾지 못해 실제로 인식한 조각 수와 시간 (절약 시간 추정용)"""
+        with self._lock:
+            self._counters[3] += count
+            self._counters[4] += seconds
+
+    def counters(self):
+        """COUNTER_NAMES 순서의 누적 카운터"""
+        with self._lock:
+            return tuple(self._counters)
+
+    def stats(self):
+        """
+        캐시 통계
+
+        Returns:
+            dict: summarize() 항목 + 메모리 항목 수와 사용량
+        """
+        stats = summarize(self.counters())
+        with self._lock:
+            stats['entries'] = len(self._entries)
+            stats['memory_bytes'] = self._memory_bytes
+        stats['max_memory_bytes'] = self.max_memory_bytes
+        return stats
+
+    def print_report(self):
+        """조각 캐시 통계 출력"""
+        print_report(self.stats())
+
+    def clear(self):
+        """메모리와 저장소의 항목 모두 삭제"""
+        with self._lock:
+            self._entries.clear()
+            self._index = _NearIndex()
+            self._memory_bytes = 0
+            if self.store_path is not None:
+                conn = self._connect()
+                conn.execute("DELETE FROM crops")
+                conn.execute("DELETE FROM crop_chunks")
+
+    def close(self):
+        """저장소 연결 종료"""
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+class _CachedRecognizer:
+    """엔진의 text_recognizer 자리에 들어가는 캐시 인식기"""
+
+    def __init__(self, owner):
+        self._owner = owner
+        # 안쪽 인식기(캐스케이드 등)가 페이지 번호를 받으면 그대로 전달
+        self.accepts_groups = getattr(owner.engine.text_recognizer, 'accepts_groups', False)
+
+    @property
+    def rec_batch_num(self):
+        return getattr(self._owner.engine.text_recognizer, 'rec_batch_num', None)
+
+    @rec_batch_num.setter
+    def rec_batch_num(self, value):
+        if hasattr(self._owner.engine.text_recognizer, 'rec_batch_num'):
+            self._owner.engine.text_recognizer.rec_batch_num = value
+
+    def __call__(self, crops, groups=None):
+        return self._owner.recognize(crops, groups), 0.0
+
+class CropCacheEngine:
+    # warmup_engine()이 안쪽 엔진을 직접 워밍업하도록 알림 (더미 조각이 캐시에 들어가지 않음)
+    owns_warmup = True
+
+    def __init__(self, engine, cache, settings=None):
+        """
+        검출과 인식 사이에 조각 캐시를 넣은 엔진
+
+        ocr()과 단계별 속성(text_detector, text_recognizer)을 제공하므로 단일 추론,
+        배치 추론(run_batch), 타일 모드, 캐스케이드 엔진과 함께 그대로 사용할 수 있습니다.
+
+        Args:
+            engine: 단계별 호출을 지원하는 엔진 (PaddleOCR 2.x, CascadeEngine 등)
+            cache (CropCache): 조각 캐시 (여러 엔진/복제본이 공유 가능)
+            settings (dict): 언어/모델 설정 - 설정이 다른 엔진끼리는 같은 캐시에서도 항목이 나뉨
+
+        Raises:
+            ValueError: 엔진이 단계별 호출을 지원하지 않는 경우
+        """
+        if not has_stage_api(engine):
+            raise ValueError("조각 캐시는 단계별 호출(text_detector/text_recognizer)을 지원하는 엔진이 필요합니다")
+        from ocr_cache import get_model_version
+
+        self.engine = engine
+        self.cache = cache
+        # 타일 설정은 이미지 단위 결과에만 영향을 주므로 조각 항목은 나누지 않음
+        settings = {key: value for key, value in (settings or {}).items() if key != 'tiling'}
+        settings_json = json.dumps(settings, sort_keys=True, default=str)
+        self.namespace = hashlib.sha256(f"{get_model_version()}:{settings_json}".encode()).hexdigest()[:16]
+        self.text_detector = engine.text_detector
+        self.text_classifier = getattr(engine, 'text_classifier', None)
+        self.use_angle_cls = getattr(engine, 'use_angle_cls', False)
+        self.drop_score = getattr(engine, 'drop_score', 0.0)
+        self.text_recognizer = _CachedRecognizer(self)
+
+    def _signature(self, crop):
+        """엔진 설정별로 나뉜 조각 서명 (설정이 다르면 키와 색인 구간이 겹치지 않음)"""
+        signature = self.cache.signature(crop)
+        if signature is None:
+            return None
+        return CropSignature(signature.thumb, tuple(f"{self.namespace}:{chunk}" for chunk in signature.chunks),
+                             f"{self.namespace}:{signature.key}")
+
+    def recognize(self, crops, groups=None):
+        """
+        캐시에 없는 조각만 인식 (한 호출 안에서 거의 같은 조각은 한 번만 인식)
+
+        Args:
+            crops (list): 텍스트 라인 조각
+            groups (list): 조각별 페이지 번호 (안쪽 인식기가 받을 때만 전달)
+
+        Returns:
+            list: (텍스트, 신뢰도) 목록
+        """
+        if not crops:
+            return []
+        with metrics.stage('crop_signature'):
+            signatures = [self._signature(crop) for crop in crops]
+        results = self.cache.lookup(signatures)
+
+        # 미스 중 거의 같은 조각은 첫 조각만 인식하고 나머지는 그 결과를 나눠 씀
+        local, todo, alias = _NearIndex(), [], {}
+        for i, result in enumerate(results):
+            if result is not None:
+                continue
+            signature = signatures[i]
+            if signature is not None:
+                same = next((j for j in local.candidates(signature.chunks)
+                             if thumbs_match(signature.thumb, signatures[j].thumb, self.cache.tolerance)), None)
+                if same is not None:
+                    alias[i] = same
+                    continue
+                local.add(i, signature.chunks)
+            todo.append(i)
+        if todo:
+            start = time.perf_counter()
+            rec_res = recognize(self.engine, [crops[i] for i in todo],
+                                [groups[i] for i in todo] if groups is not None else None)
+            self.cache.record_recognition(len(todo), time.perf_counter() - start)
+            for i, (text, score) in zip(todo, rec_res):
+                results[i] = (text, score)
+            self.cache.store([(signatures[i], *results[i]) for i in todo])
+        for i, j in alias.items():
+            results[i] = results[j]
+        if alias:
+            # 같은 호출 안의 중복도 인식을 건너뛴 조각이므로 적중으로 기록
+            self.cache.record_hits(len(alias))
+        return results
+
+    def ocr(self, image, **kwargs):
+        """PaddleOCR 2.x ocr()와 같은 형식의 결과 반환 (반복되는 조각은 인식 생략)"""
+        if not hasattr(image, 'shape'):
+            from ocr_stream import read_and_decode
+            _, image = read_and_decode(image)
+        boxes = detect(self, image)
+        if not boxes:
+            return [None]
+        crops = classify(self, [crop_region(image, box) for box in boxes])
+        rec_res = self.recognize(crops)
+        return [[[np.asarray(box).tolist(), (text, float(score))]
+                 for box, (text, score) in zip(boxes, rec_res) if score >= self.drop_score]]
+
+    def warmup(self, runs=2):
+        """안쪽 엔진을 더미 추론으로 워밍업 (warmup_engine() 참조)"""
+        from ocr_engine import warmup_engine
+
+        return warmup_engine(self.engine, runs)
@@ -0,0 +1,231 @@
+# 로컬 OCR 데몬 (Unix 소켓) 클라이언트
+#
+# 모델을 로드하고 워밍업한 ocr_server를 Unix 소켓으로 상주시켜 두면, 짧은 CLI 작업은
+# Paddle import, 모델 로드, 첫 추론 비용 없이 요청 한 번의 시간만 씁니다.
+# 이 모듈은 표준 라이브러리만 import하므로 클라이언트 자체의 시작 비용도 거의 없습니다.
+#
+# 사용 예:
+#   python ocr_daemon.py start --lang korean        # 백그라운드 데몬 시작 (로드 + 워밍업)
+#   python ocr_daemon.py ocr image1.jpg image2.jpg  # 데몬에 요청 (--spawn이면 없을 때 시작)
+#   python ocr_daemon.py status                     # 콜드/워밍된 시작 시간, 큐 상태
+#   python ocr_daemon.py stop
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import tempfile
+import subprocess
+import http.client
+from urllib.parse import quote
+
+DEFAULT_SOCKET = os.environ.get('OCR_DAEMON_SOCKET') or os.path.join(
+    tempfile.gettempdir(), f"paddleocr-{os.getuid()}.sock")
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """Unix 소켓으로 접속하는 HTTP 연결"""
+
+    def __init__(self, socket_path, timeout=60):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+def request(socket_path, method, path, body=None, timeout=60):
+    """
+    데몬에 HTTP 요청 전송
+
+    Args:
+        socket_path (str): 데몬 소켓 경로
+        method (str): 'GET' 또는 'POST'
+        path (str): 요청 경로 (예: /health)
+        body (bytes): 요청 본문
+        timeout (float): 응답 대기 시간 (초)
+
+    Returns:
+        tuple: (HTTP 상태 코드, 응답 JSON)
+
+    Raises:
+        OSError: 데몬에 접속할 수 없는 경우
+    """
+    connection = UnixHTTPConnection(socket_path, timeout)
+    try:
+        headers = {'Content-Type': 'application/octet-stream'} if body is not None else {}
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        payload = response.read()
+        return response.status, json.loads(payload) if payload else {}
+    finally:
+        connection.close()
+
+def ocr_file(image_path, socket_path=DEFAULT_SOCKET, timeout=60):
+    """
+    이미지 파일 한 장을 데몬에서 인식
+
+    Returns:
+        tuple: (HTTP 상태 코드, 응답 JSON) - 응답은 save_results()와 같은 형식
+    """
+    with open(image_path, 'rb') as f:
+        data = f.read()
+    return request(socket_path, 'POST', f"/ocr?name={quote(os.path.basename(image_path))}",
+                   body=data, timeout=timeout)
+
+def health(socket_path=DEFAULT_SOCKET, timeout=5):
+    """데몬 상태 (실행 중이 아니면 None)"""
+    try:
+        status, payload = request(socket_path, 'GET', '/health', timeout=timeout)
+    except OSError:
+        return None
+    return payload if status == 200 else None
+
+def _pid_path(socket_path):
+    return socket_path + '.pid'
+
+def start(socket_path=DEFAULT_SOCKET, server_args=(), wait=300):
+    """
+    데몬을 백그라운드 프로세스로 시작하고 준비될 때까지 대기
+
+    Args:
+        socket_path (str): 데몬 소켓 경로
+        server_args (list): ocr_server.py serve에 넘길 추가 인자 (--lang, --device 등)
+        wait (float): 모델 로드/워밍업을 기다릴 최대 시간 (초)
+
+    Returns:
+        dict: 데몬 상태 (이미 실행 중이면 그 상태)
+
+    Raises:
+        RuntimeError: 시간 안에 준비되지 않았거나 프로세스가 종료된 경우
+    """
+    state = health(socket_path)
+    if state is not None:
+        return state
+
+    server = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ocr_server.py')
+    log_path = socket_path + '.log'
+    with open(log_path, 'ab') as log:
+        process = subprocess.Popen(
+            [sys.executable, server, 'serve', '--unix', socket_path, *server_args],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+    with open(_pid_path(socket_path), 'w') as f:
+        f.write(str(process.pid))
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"데몬이 시작 중 종료되었습니다 (로그: {log_path})")
+        state = health(socket_path)
+        if state is not None:
+            return state
+        time.sleep(0.2)
+    raise RuntimeError(f"데몬이 {wait:.0f}초 안에 준비되지 않았습니다 (로그: {log_path})")
+
+def stop(socket_path=DEFAULT_SOCKET):
+    """
+    데몬 종료 (SIGINT로 소켓 파일까지 정리)
+
+    Returns:
+        bool: 종료 신호를 보냈는지 여부
+    """
+    try:
+        with open(_pid_path(socket_path)) as f:
+            pid = int(f.read().strip())
+    except (OSError, ValueError):
+        return False
+    try:
+        os.kill(pid, signal.SIGINT)
+    except ProcessLookupError:
+        pass
+    os.unlink(_pid_path(socket_path))
+    return True
+
+def print_startup(state):
+    """데몬의 콜드 스타트와 워밍된 추론 시간 출력"""
+    startup = state.get('startup') or {}
+    if 'cold_start_seconds' in startup:
+        print(f"콜드 스타트: {startup['cold_start_seconds']:.2f}초 "
+              f"(엔진 로드 {startup['load_seconds']:.2f}초 + 첫 추론 {startup['first_inference_seconds']:.2f}초), "
+              f"워밍된 추론: {startup['warm_inference_seconds']:.3f}초")
+    elif 'load_seconds' in startup:
+        print(f"엔진 로드: {startup['load_seconds']:.2f}초 (워밍업 생략)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 OCR 데몬 (Unix 소켓)")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help=f"소켓 경로 (기본: {DEFAULT_SOCKET})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    start_parser = commands.add_parser('start', help="데몬 시작 (나머지 인자는 ocr_server.py serve로 전달)")
+    start_parser.add_argument('--wait', type=float, default=300)
+
+    ocr_parser = commands.add_parser('ocr', help="이미지 인식 요청")
+    ocr_parser.add_argument('images', nargs='+')
+    ocr_parser.add_argument('--json', action='store_true', help="응답 JSON 전체 출력")
+    ocr_parser.add_argument('--spawn', action='store_true', help="데몬이 없으면 시작")
+
+    commands.add_parser('status', help="데몬 상태와 시작 시간")
+    commands.add_parser('stop', help="데몬 종료")
+
+    args, server_args = parser.parse_known_args(argv)
+    if server_args and args.command != 'start':
+        parser.error(f"알 수 없는 인자: {' '.join(server_args)}")
+
+    if args.command == 'start':
+        try:
+            state = start(args.socket, server_args, args.wait)
+        except RuntimeError as e:
+            print(e)
+            return 1
+        print(f"데몬 실행 중: {args.socket}")
+        print_startup(state)
+        return 0
+
+    if args.command == 'stop':
+        print("데몬 종료" if stop(args.socket) else "실행 중인 데몬이 없습니다")
+        return 0
+
+    if args.command == 'status':
+        state = health(args.socket)
+        if state is None:
+            print("실행 중인 데몬이 없습니다")
+            return 1
+        print(f"데몬 실행 중: {args.socket} (요청 {state['requests']}건, 대기 {state['queue_depth']}건)")
+        print_startup(state)
+        return 0
+
+    if health(args.socket) is None:
+        if not args.spawn:
+            print(f"실행 중인 데몬이 없습니다: {args.socket} (python ocr_daemon.py start 또는 --spawn)")
+            return 1
+        try:
+            print_startup(start(args.socket))
+        except RuntimeError as e:
+            print(e)
+            return 1
+
+    exit_code = 0
+    for image_path in args.images:
+        start_time = time.perf_counter()
+        status, payload = ocr_file(image_path, args.socket)
+        elapsed = time.perf_counter() - start_time
+        if args.json:
+            print(json.dumps(payload, ensure_ascii=False, indent=2))
+        elif status == 200:
+            print(f"=== {image_path} ({payload['total_blocks']}개 블록, {elapsed:.3f}초) ===")
+            for item in payload['results']:
+                print(item['text'])
+        else:
+            print(f"[{status}] {image_path}: {payload.get('error')}")
+        exit_code = exit_code or (0 if status == 200 else 1)
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
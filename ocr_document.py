@@ -0,0 +1,211 @@
+# 입력 정규화와 문서 단위 세션 (디코딩 한 번, 추론 한 번)
+#
+# 경로, 바이트, NumPy 배열, PIL 이미지를 모두 같은 BGR 배열로 바꾸고,
+# OCRDocument가 디코딩된 픽셀과 OCR 결과를 보관하여 텍스트/JSON/시각화
+# 출력이 같은 결과를 재사용하도록 합니다.
+import os
+import json
+import numpy as np
+from PIL import Image
+from ocr_stream import decode_image_bytes, read_and_decode
+from ocr_result import OCRResult
+from ocr_visualize import visualize
+from ocr_layout import analyze_layout
+from ocr_metrics import metrics
+
+def is_path(source):
+    """파일 경로 입력인지 확인"""
+    return isinstance(source, (str, os.PathLike))
+
+def source_label(source, name=None):
+    """로그/결과에 표시할 입력 이름"""
+    if name:
+        return name
+    if isinstance(source, OCRDocument):
+        return source.name
+    if is_path(source):
+        return os.fspath(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return '<bytes>'
+    if isinstance(source, Image.Image):
+        return getattr(source, 'filename', None) or '<PIL.Image>'
+    return '<ndarray>'
+
+def to_bgr_array(image):
+    """
+    NumPy 배열을 PaddleOCR 입력용 HxWx3 uint8 BGR 배열로 변환
+
+    배열은 OpenCV와 같은 BGR 순서로 간주합니다. 그레이스케일은 3채널로,
+    BGRA는 알파 채널을 버려서 맞춥니다.
+    """
+    array = np.asarray(image)
+    if array.dtype != np.uint8:
+        array = np.clip(array, 0, 255).astype(np.uint8)
+    if array.ndim == 2:
+        array = np.repeat(array[:, :, None], 3, axis=2)
+    elif array.ndim == 3 and array.shape[2] == 4:
+        array = array[:, :, :3]
+    elif array.ndim != 3 or array.shape[2] != 3:
+        raise ValueError(f"지원하지 않는 배열 형태: {array.shape}")
+    return np.ascontiguousarray(array)
+
+def load_image(source):
+    """
+    어떤 형식의 입력이든 (캐시 키 원본, BGR 배열)로 변환
+
+    Args:
+        source: 이미지 경로, 인코딩된 바이트, NumPy 배열(BGR), PIL 이미지 또는 OCRDocument
+
+    Returns:
+        tuple: (캐시 키 계산용 원본, HxWx3 uint8 BGR 배열)
+               경로와 바이트는 원본 바이트를, 배열/PIL 이미지는 변환된 배열을 키 원본으로 사용
+               (OCRDocument는 이미 디코딩한 픽셀과 키 원본을 그대로 사용)
+    """
+    if isinstance(source, OCRDocument):
+        return source.cache_source, source.image
+    if is_path(source):
+        return read_and_decode(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        with metrics.stage('image_load'):
+            return bytes(source), decode_image_bytes(bytes(source))
+    if isinstance(source, Image.Image):
+        rgb = np.asarray(source.convert('RGB'))
+        array = np.ascontiguousarray(rgb[:, :, ::-1])
+        return array, array
+    if hasattr(source, 'shape'):
+        array = to_bgr_array(source)
+        return array, array
+    raise TypeError(f"지원하지 않는 이미지 입력 형식: {type(source)}")
+
+def draw_results(image, texts, output_path, config=None):
+    """
+    OCR 결과를 시각화하여 저장
+
+    Args:
+        image: 원본 이미지 (경로, 바이트, BGR 배열 또는 PIL 이미지)
+        texts (OCRResult or list): 추출된 텍스트 리스트
+        output_path (str): 출력 경로
+        config (VisualizeConfig): 시각화 설정 (None이면 원본 크기 JPEG)
+
+    Returns:
+        str: 저장한 경로 (표본 추출로 건너뛰었거나 실패하면 None)
+    """
+    try:
+        if not isinstance(texts, OCRResult):
+            texts = OCRResult.from_dicts(texts)
+        return visualize(image, texts, output_path, config)
+    except Exception as e:
+        print(f"시각화 중 오류: {e}")
+        return None
+
+class OCRDocument:
+    def __init__(self, source, extractor, name=None, layout=None):
+        """
+        이미지 한 장의 처리 세션 - 디코딩된 픽셀과 OCR 결과를 한 번만 만들고 재사용
+
+        Args:
+            source: 이미지 경로, 바이트, NumPy 배열(BGR) 또는 PIL 이미지
+            extractor (callable): (BGR 배열, 캐시 키 원본, 이름) -> (OCRResult, 원시 결과, 처리 시간)
+            name (str): 결과에 기록할 이름 (None이면 경로 또는 입력 형식)
+            layout (LayoutConfig): 레이아웃 분석 설정 - 텍스트/JSON을 읽기 순서로 출력
+                                   (None이면 검출 순서)
+        """
+        self.source = source
+        self.name = source_label(source, name)
+        self._extractor = extractor
+        self._cache_source = None
+        self._image = None
+        self._texts = None
+        self.layout_config = layout
+        self._layout = None
+        self.raw = None
+        self.processing_time = None
+
+    @property
+    def image(self):
+        """디코딩된 BGR 배열 (처음 접근할 때 한 번만 디코딩)"""
+        if self._image is None:
+            self._cache_source, self._image = load_image(self.source)
+        return self._image
+
+    @property
+    def cache_source(self):
+        """캐시 키 계산에 사용할 원본"""
+        if self._image is None:
+            self.image
+        return self._cache_source
+
+    @property
+    def texts(self):
+        """OCR 결과 (처음 접근할 때 한 번만 추론)"""
+        if self._texts is None:
+            self._texts, self.raw, self.processing_time = self._extractor(
+                self.image, self.cache_source, self.name)
+        return self._texts
+
+    def set_result(self, texts, raw=None, processing_time=None):
+        """다른 경로(배치 추론 등)에서 얻은 결과를 세션에 채움 (이후 texts는 추론하지 않음)"""
+        self._texts = texts
+        self.raw = raw
+        self.processing_time = processing_time
+        self._layout = None
+
+    @property
+    def layout(self):
+        """레이아웃 분석 결과 (설정이 없으면 None, 처음 접근할 때 한 번만 분석)"""
+        if self.layout_config is not None and self._layout is None:
+            with metrics.stage('layout'):
+                self._layout = analyze_layout(self.texts, self.layout_config)
+        return self._layout
+
+    def plain_text(self, separator='\n'):
+        """텍스트만 줄바꿈으로 연결 (레이아웃 설정이 있으면 읽기 순서, 문단은 빈 줄로 구분)"""
+        if self.layout is not None:
+            return self.layout.text(self.texts)
+        return self.texts.plain_text(separator)
+
+    def to_dict(self, **metadata):
+        """
+        save_results()와 같은 형식의 JSON 딕셔너리
+
+        레이아웃 설정이 있으면 results를 읽기 순서로 정렬하고 줄/문단/단 구조를
+        'layout' 항목에 추가합니다 (blocks는 results의 인덱스).
+
+        Args:
+            **metadata: image_path 다음에 넣을 추가 항목 (처리 모드, 시간 등)
+        """
+        texts = self.texts
+        layout = self.layout
+        data = {
+            'image_path': self.name,
+            **metadata,
+            'total_blocks': len(texts),
+            'results': (layout.reorder(texts) if layout is not None else texts).to_dicts()
+        }
+        if layout is not None:
+            data['layout'] = layout.to_dict(texts)
+        return data
+
+    def save_text(self, path, header_lines=()):
+        """텍스트 파일 저장 (header_lines는 '# ' 주석 줄로 앞에 기록)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for line in header_lines:
+                f.write(f"# {line}\n")
+            if header_lines:
+                f.write("\n")
+            if self.layout is not None:
+                f.write(f"{self.plain_text()}\n")
+            else:
+                for text in self.texts.texts:
+                    f.write(f"{text}\n")
+        print(f"텍스트 파일 저장: {path}")
+
+    def save_json(self, path, **metadata):
+        """JSON 파일 저장 (상세 정보 포함)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(**metadata), f, ensure_ascii=False, indent=2)
+        print(f"JSON 파일 저장: {path}")
+
+    def visualize(self, output_path, config=None):
+        """디코딩해 둔 픽셀 위에 결과를 그려 저장 (다시 디코딩하지 않음)"""
+        return draw_results(self.image, self.texts, output_path, config)
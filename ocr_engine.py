@@ -0,0 +1,292 @@
+# 프로세스 전역 PaddleOCR 엔진 레지스트리
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from ocr_metrics import instrument_engine
+
+def get_rss_mb():
+    """현재 프로세스의 상주 메모리(RSS) 크기 (MB)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        # /proc이 없는 환경: 최대 RSS로 대체 (macOS는 바이트, Linux는 KB 단위)
+        try:
+            import resource
+            import sys
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+        except ImportError:
+            return 0.0
+
+class _StubDetector:
+    """이미지 크기에 따라 격자 형태의 텍스트 라인 박스를 만드는 가짜 검출기"""
+
+    def __init__(self, line_height=32, line_gap=16, column_width=480):
+        self.line_height = line_height
+        self.line_gap = line_gap
+        self.column_width = column_width
+
+    def __call__(self, image):
+        import numpy as np
+
+        height, width = image.shape[:2]
+        boxes = []
+        pitch = self.line_height + self.line_gap
+        for top in range(self.line_gap, height - self.line_height, pitch):
+            for left in range(self.line_gap, width - 64, self.column_width):
+                right = min(left + self.column_width - self.line_gap, width - 1)
+                bottom = top + self.line_height
+                boxes.append([[left, top], [right, top], [right, bottom], [left, bottom]])
+        return np.asarray(boxes, dtype=np.float32).reshape(-1, 4, 2), 0.0
+
+class _StubRecognizer:
+    """잘라낸 라인 크기로부터 결정적인 텍스트/신뢰도를 만드는 가짜 인식기"""
+
+    def __init__(self, seconds_per_line=0.0):
+        self.seconds_per_line = seconds_per_line
+        self.rec_batch_num = 6
+
+    def __call__(self, crops):
+        if self.seconds_per_line:
+            time.sleep(self.seconds_per_line * len(crops))
+        results = []
+        for index, crop in enumerate(crops):
+            height, width = crop.shape[:2]
+            score = 0.80 + ((width * 31 + height * 17 + index) % 20) / 100
+            results.append((f"line {index} {width}x{height}", score))
+        return results, 0.0
+
+class StubOCREngine:
+    def __init__(self, seconds_per_line=0.0, drop_score=0.5, **options):
+        """
+        PaddleOCR 없이 결과 파싱, 입출력, 배치/서비스 경로를 측정하기 위한 가짜 엔진
+
+        PaddleOCR 2.x와 같은 ocr() 결과 형식과 단계별 속성(text_detector,
+        text_recognizer)을 제공하며, 같은 이미지에는 항상 같은 결과를 돌려줍니다.
+
+        Args:
+            seconds_per_line (float): 라인당 인식 지연 시간 (추론 비용 모사용)
+            drop_score (float): 이 값 미만의 신뢰도는 결과에서 제외
+            **options: 실제 엔진 옵션 (무시됨)
+        """
+        self.text_detector = _StubDetector()
+        self.text_recognizer = _StubRecognizer(seconds_per_line)
+        self.use_angle_cls = False
+        self.drop_score = drop_score
+
+    def ocr(self, image, **kwargs):
+        """PaddleOCR 2.x ocr()와 같은 형식의 결과 반환"""
+        from ocr_stages import crop_region, detect
+
+        if not hasattr(image, 'shape'):
+            from ocr_stream import read_and_decode
+            _, image = read_and_decode(image)
+        boxes = detect(self, image)
+        if not boxes:
+            return [None]
+        rec_res, _ = self.text_recognizer([crop_region(image, box) for box in boxes])
+        return [[[box.tolist(), (text, score)]
+                 for box, (text, score) in zip(boxes, rec_res) if score >= self.drop_score]]
+
+def _make_key(lang, device, options, replica=0):
+    """레지스트리 키 생성 (옵션 순서와 무관)"""
+    return (lang, device, json.dumps(options, sort_keys=True, default=str), replica)
+
+class EngineRegistry:
+    def __init__(self, memory_budget_mb=None, max_engines=None):
+        """
+        PaddleOCR 엔진을 (언어, 장치, 옵션) 조합별로 한 번만 로드하여 공유하는 레지스트리
+
+        Args:
+            memory_budget_mb (float): 로드된 엔진들의 추정 메모리 합계 한도 (MB, None이면 무제한)
+            max_engines (int): 동시에 유지할 최대 엔진 수 (None이면 무제한)
+        """
+        self.memory_budget_mb = memory_budget_mb
+        self.max_engines = max_engines
+        self._engines = OrderedDict()  # key -> 엔진 정보 (최근 사용 순)
+        self._lock = threading.Lock()
+        self._loading_locks = {}
+        self.load_history = []
+
+    def _create_engine(self, lang, device, options):
+        """실제 PaddleOCR 인스턴스 생성 (device='stub'이면 가짜 엔진)"""
+        if device == 'stub':
+            return instrument_engine(StubOCREngine(**options))
+
+        from paddleocr import PaddleOCR
+
+        kwargs = dict(options)
+        if lang is not None:
+            kwargs['lang'] = lang
+        if device is not None:
+            kwargs['use_gpu'] = (device == 'gpu')
+        # 단계별 계측 프록시 설치 (계측이 꺼져 있으면 오버헤드 거의 없음)
+        return instrument_engine(PaddleOCR(**kwargs))
+
+    def get(self, lang=None, device=None, replica=0, **options):
+        """
+        엔진 조회 (없으면 로드)
+
+        Args:
+            lang (str): 언어 설정 (None이면 PaddleOCR 기본값)
+            device (str): 'cpu', 'gpu', 'stub'(가짜 엔진) 또는 None (PaddleOCR 기본값)
+            replica (int): 복제본 번호 - 같은 설정의 엔진을 여러 스레드에서 동시에
+                           사용해야 할 때 0이 아닌 번호로 별도 인스턴스를 얻음
+            **options: PaddleOCR 생성자 옵션 (cpu_threads, enable_mkldnn 등)
+
+        Returns:
+            PaddleOCR: 공유 엔진 인스턴스
+        """
+        key = _make_key(lang, device, options, replica)
+
+        with self._lock:
+            entry = self._engines.get(key)
+            if entry is not None:
+                self._engines.move_to_end(key)
+                entry['uses'] += 1
+                entry['last_used'] = time.time()
+                return entry['engine']
+            loading_lock = self._loading_locks.setdefault(key, threading.Lock())
+
+        # 같은 모델을 여러 스레드가 동시에 로드하지 않도록 키별 잠금
+        with loading_lock:
+            with self._lock:
+                entry = self._engines.get(key)
+                if entry is not None:
+                    entry['uses'] += 1
+                    return entry['engine']
+
+            print(f"엔진 로드 중... 언어: {lang}, 장치: {device or '기본'}, 옵션: {options}")
+            rss_before = get_rss_mb()
+            start_time = time.time()
+            engine = self._create_engine(lang, device, options)
+            load_time = time.time() - start_time
+            memory_mb = max(0.0, get_rss_mb() - rss_before)
+            print(f"엔진 로드 완료: {load_time:.2f}초, 추정 메모리 {memory_mb:.0f}MB")
+
+            with self._lock:
+                self._engines[key] = {
+                    'engine': engine,
+                    'lang': lang,
+                    'device': device,
+                    'options': options,
+                    'replica': replica,
+                    'load_time': load_time,
+                    'memory_mb': memory_mb,
+                    'uses': 1,
+                    'last_used': time.time()
+                }
+                self.load_history.append({
+                    'lang': lang,
+                    'device': device,
+                    'options': options,
+                    'load_time': load_time,
+                    'memory_mb': memory_mb
+                })
+                self._evict(keep=key)
+                self._loading_locks.pop(key, None)
+        return engine
+
+    def _evict(self, keep=None):
+        """
+        메모리 예산/최대 개수를 넘으면 가장 오래 사용되지 않은 엔진부터 제거
+        (잠금을 잡은 상태에서 호출)
+
+        제거된 엔진은 이를 참조하는 OCR 객체가 모두 사라진 뒤에 메모리가 해제됩니다.
+        """
+        def over_budget():
+            if self.max_engines is not None and len(self._engines) > self.max_engines:
+                return True
+            if self.memory_budget_mb is not None:
+                total = sum(e['memory_mb'] for e in self._engines.values())
+                return total > self.memory_budget_mb
+            return False
+
+        while over_budget():
+            victim = next((k for k in self._engines if k != keep), None)
+            if victim is None:
+                break
+            entry = self._engines.pop(victim)
+            print(f"엔진 제거 (LRU): 언어 {entry['lang']}, 추정 메모리 {entry['memory_mb']:.0f}MB")
+
+    def evict_all(self):
+        """모든 엔진 제거"""
+        with self._lock:
+            self._engines.clear()
+
+    def report(self):
+        """
+        로드된 엔진과 로드 시간 정보
+
+        Returns:
+            dict: 엔진별 정보, 총 로드 횟수/시간, 추정 메모리 합계
+        """
+        with self._lock:
+            engines = [
+                {k: v for k, v in entry.items() if k != 'engine'}
+                for entry in self._engines.values()
+            ]
+            history = list(self.load_history)
+        return {
+            'engines': engines,
+            'total_loads': len(history),
+            'total_load_time': sum(h['load_time'] for h in history),
+            'memory_mb': sum(e['memory_mb'] for e in engines)
+        }
+
+    def print_report(self):
+        """엔진 로드 현황 출력"""
+        report = self.report()
+        print(f"\n=== 엔진 레지스트리: 로드 {report['total_loads']}회, "
+              f"총 {report['total_load_time']:.2f}초, 추정 메모리 {report['memory_mb']:.0f}MB ===")
+        for entry in report['engines']:
+            print(f"- 언어 {entry['lang']}, 장치 {entry['device'] or '기본'}: "
+                  f"로드 {entry['load_time']:.2f}초, 사용 {entry['uses']}회")
+
+# 프로세스 전역 레지스트리
+registry = EngineRegistry()
+
+def get_engine(lang=None, device=None, replica=0, **options):
+    """전역 레지스트리에서 엔진 조회 (EngineRegistry.get 참조)"""
+    return registry.get(lang=lang, device=device, replica=replica, **options)
+
+def warmup_image(width=320, height=48):
+    """워밍업용 합성 이미지 (검출과 인식이 모두 실행되도록 글자를 그린 BGR 배열)"""
+    import numpy as np
+    from PIL import Image, ImageDraw
+    from ocr_visualize import get_font
+
+    image = Image.new('RGB', (width, height), 'white')
+    ImageDraw.Draw(image).text((8, 8), "OCR warmup 2024", fill='black', font=get_font(None, 28))
+    return np.ascontiguousarray(np.asarray(image)[:, :, ::-1])
+
+def warmup_engine(engine, runs=2):
+    """
+    더미 추론으로 예측기 메모리 할당과 커널 준비를 미리 수행
+
+    첫 추론은 이후 추론보다 훨씬 느리므로(메모리 풀 할당, GPU 커널 선택 등)
+    실제 요청 전에 한 번 실행해 두면 첫 요청의 지연이 사라집니다.
+    여러 엔진을 묶은 엔진(캐스케이드 등)은 owns_warmup=True와 warmup()으로 직접 처리합니다.
+
+    Args:
+        engine: PaddleOCR 엔진
+        runs (int): 더미 추론 횟수 (2회 이상이면 마지막 값이 워밍된 추론 시간)
+
+    Returns:
+        list: 실행별 소요 시간 (초) - 첫 값이 콜드 추론 시간
+    """
+    if getattr(engine, 'owns_warmup', False):
+        return engine.warmup(runs)
+    from ocr_stages import predict_batch
+
+    image = warmup_image()
+    timings = []
+    for _ in range(max(1, runs)):
+        start = time.perf_counter()
+        predict_batch(engine, [image])
+        timings.append(time.perf_counter() - start)
+    return timings
@@ -0,0 +1,153 @@
+# 대용량 폴더 트리용 입력 파일 탐색 (재귀, 지연 반환, 내용 기반 형식 판별, 샤드 분할)
+#
+# os.scandir로 폴더를 하나씩 읽으며 경로를 바로 반환하므로 파일이 수백만 개여도
+# 전체 목록을 메모리에 만들지 않습니다. --shard i/N은 루트 기준 상대 경로의
+# 해시로 나누므로 여러 장비가 같은 트리를 조율 없이 겹치지 않게 나눠 처리합니다.
+import os
+import zlib
+from fnmatch import fnmatchcase
+from ocr_multipage import DOCUMENT_EXTENSIONS
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.webp')
+
+# 파일 앞부분 시그니처 -> 형식
+_SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'BM', 'bmp'),
+    (b'II*\x00', 'tiff'),
+    (b'MM\x00*', 'tiff'),
+    (b'%PDF-', 'pdf'),
+)
+IMAGE_TYPES = ('jpeg', 'png', 'bmp', 'tiff', 'webp')
+SNIFF_MODES = ('auto', 'extension', 'magic')
+
+def sniff_type(path):
+    """
+    파일 앞 12바이트로 형식 판별 (확장자와 무관)
+
+    Returns:
+        str: 'jpeg', 'png', 'bmp', 'tiff', 'webp', 'pdf' 중 하나 (알 수 없거나 읽기 실패 시 None)
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(12)
+    except OSError:
+        return None
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    for signature, kind in _SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    return None
+
+def parse_shard(text):
+    """
+    'i/N' 형식의 샤드 지정 해석 (i는 0부터 N-1)
+
+    Returns:
+        tuple: (i, N)
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 범위를 벗어난 경우
+    """
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise ValueError(f"샤드 지정은 'i/N' 형식이어야 합니다: {text}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"샤드 번호는 0 이상 {count - 1} 이하여야 합니다: {text}")
+    return index, count
+
+def in_shard(relative_path, shard):
+    """
+    상대 경로가 지정한 샤드에 속하는지 확인 (장비/실행과 무관하게 항상 같은 결과)
+
+    Args:
+        relative_path (str): 루트 기준 상대 경로 ('/' 구분)
+        shard (tuple): (i, N) 또는 None (None이면 항상 True)
+    """
+    if shard is None:
+        return True
+    index, count = shard
+    return zlib.crc32(relative_path.encode('utf-8', 'surrogateescape')) % count == index
+
+def _matches(relative_path, patterns):
+    return any(fnmatchcase(relative_path, pattern) for pattern in patterns)
+
+def iter_files(root, include=None, exclude=None, recursive=True, sniff='auto',
+               include_documents=False, shard=None, follow_symlinks=False, ordered=False):
+    """
+    입력 파일 경로를 찾는 즉시 하나씩 반환 (기본은 os.scandir 순서)
+
+    Args:
+        root (str): 검색할 루트 폴더
+        include (list): 포함할 glob 패턴 (루트 기준 상대 경로에 적용, 예: '*.png', 'scans/*')
+                        '*'는 '/'도 포함하므로 '*.png'는 모든 하위 폴더의 PNG와 일치
+                        None이면 모든 파일
+        exclude (list): 제외할 glob 패턴 (폴더가 일치하면 하위 폴더 전체를 건너뜀)
+        recursive (bool): 하위 폴더까지 검색할지 여부
+        sniff (str): 형식 판별 방식
+                     'auto' - 알려진 확장자는 그대로 인정, 확장자가 없거나 모르는 파일만 내용 확인
+                     'extension' - 확장자만 확인 (대소문자 무시)
+                     'magic' - 모든 파일의 앞부분을 읽어 확인 (확장자가 잘못된 파일도 판별)
+        include_documents (bool): PDF와 다중 페이지 TIFF도 포함할지 여부
+        shard (tuple or str): (i, N) 또는 'i/N' - 이 샤드에 속하는 파일만 반환
+        follow_symlinks (bool): 심볼릭 링크 폴더도 따라갈지 여부
+        ordered (bool): 폴더별 이름순으로 반환 (실행마다 같은 순서가 필요할 때)
+                        폴더 목록 전체를 메모리에 올려 정렬하므로, 항목이 아주 많은 폴더에서는
+                        False(기본)로 두어 읽는 즉시 반환 (샤드 분할은 순서와 무관)
+
+    Yields:
+        str: 파일 경로 (root와 결합된 경로)
+    """
+    if sniff not in SNIFF_MODES:
+        raise ValueError(f"지원하지 않는 형식 판별 방식: {sniff} (지원: {', '.join(SNIFF_MODES)})")
+    if isinstance(shard, str):
+        shard = parse_shard(shard)
+    include = [include] if isinstance(include, str) else list(include or ())
+    exclude = [exclude] if isinstance(exclude, str) else list(exclude or ())
+    extensions = IMAGE_EXTENSIONS + (DOCUMENT_EXTENSIONS if include_documents else ())
+    kinds = IMAGE_TYPES + (('pdf',) if include_documents else ())
+
+    # 깊이 우선 탐색 - 스택에는 아직 읽지 않은 폴더의 (경로, 상대 경로)만 보관
+    stack = [(root, '')]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            iterator = os.scandir(directory)
+        except OSError as e:
+            print(f"폴더 읽기 실패: {directory} - {e}")
+            continue
+
+        subdirectories = []
+        with iterator:
+            # 기본은 읽는 즉시 처리 (큰 폴더도 목록 전체를 메모리에 만들지 않음)
+            entries = sorted(iterator, key=lambda entry: entry.name) if ordered else iterator
+            for entry in entries:
+                relative = f"{prefix}{entry.name}"
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        if recursive and not _matches(relative, exclude):
+                            subdirectories.append((entry.path, f"{relative}/"))
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if exclude and _matches(relative, exclude):
+                    continue
+                if include and not _matches(relative, include):
+                    continue
+                # 샤드 판정은 파일을 열지 않으므로 내용 확인보다 먼저 수행
+                if not in_shard(relative, shard):
+                    continue
+                if sniff == 'magic':
+                    if sniff_type(entry.path) not in kinds:
+                        continue
+                elif not entry.name.lower().endswith(extensions):
+                    if sniff == 'extension' or sniff_type(entry.path) not in kinds:
+                        continue
+                yield entry.path
+        # 먼저 찾은 폴더부터 방문하도록 역순으로 쌓음 (ordered면 이름순)
+        stack.extend(reversed(subdirectories))
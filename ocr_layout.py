@@ -0,0 +1,362 @@
+# 박스 배열 기반 레이아웃 분석 (읽기 순서, 줄/문단/단, 표 셀)
+#
+# 검출기가 돌려준 순서 그대로 텍스트를 이으면 다단 페이지와 표가 뒤섞입니다.
+# 박스 좌표 배열의 정렬/누적 연산만으로(O(n log n)) 단 → 줄 → 문단 구조와 읽기 순서를
+# 만들며, 파이썬 반복은 단 경계와 최종 텍스트 조립에만 씁니다.
+#
+# 1. 텍스트 폭의 span_ratio 이상인 넓은 박스(제목, 1단 본문 줄)는 페이지를 위아래 구간으로
+#    나눕니다. 같은 높이에 있는 작은 박스는 그 줄에 붙습니다.
+# 2. 구간마다 박스의 x 범위를 누적 최대로 병합해 세로 공백이 column_gap 이상인 곳을 단
+#    경계로 봅니다. 이웃한 두 단의 줄 높이가 row_align 비율 이상 맞으면(표, "품목 ... 금액"
+#    형식의 영수증) 한 영역으로 합쳐 행 단위로 읽습니다. 두 단 모두 폭을 채운 본문처럼 보여도
+#    줄 높이가 맞으면 표(같은 폭 셀의 격자)로 합치고, 두 단의 폭이 다르거나 단 사이 공백이
+#    단 폭에 비해 좁을 때만(양쪽 정렬된 다단 기사) 합치지 않습니다.
+# 3. 영역 안에서 y 중심 차이가 line_tolerance를 넘으면 새 줄, 줄 사이 공백이
+#    paragraph_gap을 넘으면 새 문단입니다.
+# 4. tables=True면 줄 안에서 가로 공백이 cell_gap 이상인 곳을 셀 경계로 나눕니다.
+#
+# 거리 기준은 모두 박스 높이의 중앙값(대략 글자 크기)에 대한 배수입니다.
+import numpy as np
+
+class LayoutConfig:
+    def __init__(self, tables=False, span_ratio=0.6, column_gap=1.5, line_tolerance=0.5,
+                 paragraph_gap=0.8, row_align=0.8, text_fill=0.8, gutter_ratio=0.5, cell_gap=1.5):
+        """
+        레이아웃 분석 설정
+
+        Args:
+            tables (bool): 줄을 표 셀로 나눔 (텍스트는 탭으로, JSON은 cells로 구분)
+            span_ratio (float): 텍스트 폭 대비 이 비율 이상인 박스는 단을 가로지르는 줄로 처리
+                                (0이면 페이지 전체를 한 구간으로 봄)
+            column_gap (float): 단 경계로 볼 최소 세로 공백 (글자 높이 배수)
+            line_tolerance (float): 같은 줄로 볼 y 중심 차이 (글자 높이 배수)
+            paragraph_gap (float): 새 문단으로 볼 줄 사이 공백 (글자 높이 배수)
+            row_align (float): 이웃한 두 단을 표로 합칠 줄 높이 일치 비율 (None이면 합치지 않음)
+            text_fill (float): 박스가 단 폭을 평균 이 비율 이상 채우면 본문 단으로 봄 - 이웃한 두 본문 단은
+                               폭 비율이 이보다 작으면 합치지 않음
+            gutter_ratio (float): 두 본문 단 사이 공백이 좁은 단 폭의 이 비율 미만이면 다단 기사로 봄
+                                  (줄 높이가 맞아도 합치지 않음)
+            cell_gap (float): 셀 경계로 볼 최소 가로 공백 (글자 높이 배수)
+        """
+        self.tables = tables
+        self.span_ratio = span_ratio
+        self.column_gap = column_gap
+        self.line_tolerance = line_tolerance
+        self.paragraph_gap = paragraph_gap
+        self.row_align = row_align
+        self.text_fill = text_fill
+        self.gutter_ratio = gutter_ratio
+        self.cell_gap = cell_gap
+
+    def to_dict(self):
+        return {'tables': self.tables, 'span_ratio': self.span_ratio, 'column_gap': self.column_gap,
+                'line_tolerance': self.line_tolerance, 'paragraph_gap': self.paragraph_gap,
+                'row_align': self.row_align, 'text_fill': self.text_fill,
+                'gutter_ratio': self.gutter_ratio, 'cell_gap': self.cell_gap}
+
+def _boundaries(*ids):
+    """같은 값이 이어지는 구간의 경계 (시작 위치들 + 전체 길이)"""
+    length = len(ids[0])
+    if length == 0:
+        return np.zeros(1, dtype=np.int64)
+    change = np.zeros(length - 1, dtype=bool)
+    for values in ids:
+        change |= values[1:] != values[:-1]
+    return np.r_[0, np.flatnonzero(change) + 1, length]
+
+class Layout:
+    __slots__ = ('order', 'line', 'cell', 'line_bbox', 'line_paragraph', 'line_column',
+                 'line_table', 'columns', 'tables')
+
+    def __init__(self, order, line, cell, line_bbox, line_paragraph, line_column, line_table,
+                 columns, tables=False):
+        """
+        레이아웃 분석 결과 (박스별 배열은 읽기 순서, 줄별 배열은 줄 번호 순서)
+
+        Args:
+            order: 읽기 순서대로의 원래 결과 인덱스
+            line: 박스별 줄 번호
+            cell: 박스별 줄 안의 셀 번호
+            line_bbox: 줄별 [x0, y0, x1, y1]
+            line_paragraph: 줄별 문단 번호
+            line_column: 줄별 구간 안의 단 번호 (단을 가로지르는 줄은 -1)
+            line_table: 줄별 표 영역 여부
+            columns (int): 한 구간의 최대 단 수
+            tables (bool): 셀 구분 출력 여부
+        """
+        self.order = order
+        self.line = line
+        self.cell = cell
+        self.line_bbox = line_bbox
+        self.line_paragraph = line_paragraph
+        self.line_column = line_column
+        self.line_table = line_table
+        self.columns = columns
+        self.tables = tables
+
+    @classmethod
+    def empty(cls, tables=False):
+        """빈 결과"""
+        none = np.zeros(0, dtype=np.int64)
+        return cls(none, none, none, np.zeros((0, 4), dtype=np.int64), none, none,
+                   np.zeros(0, dtype=bool), 0, tables)
+
+    def __len__(self):
+        return len(self.order)
+
+    def __repr__(self):
+        paragraphs = int(self.line_paragraph[-1]) + 1 if len(self.line_paragraph) else 0
+        return (f"Layout({len(self)} blocks, {len(self.line_bbox)} lines, "
+                f"{paragraphs} paragraphs, {self.columns} columns)")
+
+    def reorder(self, result):
+        """결과를 읽기 순서로 정렬한 OCRResult"""
+        return result.select(self.order)
+
+    def _cells(self, result):
+        """셀 텍스트 목록과 셀별 줄 번호 (셀 안의 박스는 공백으로 연결)"""
+        words = [result.texts[i] for i in self.order.tolist()]
+        bounds = _boundaries(self.line, self.cell)
+        cells = [' '.join(words[a:b]) for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+        return cells, self.line[bounds[:-1]]
+
+    def line_texts(self, result):
+        """
+        줄별 텍스트 (박스는 공백으로, tables=True면 셀을 탭으로 연결)
+
+        Args:
+            result (OCRResult): 분석에 쓴 결과 (원래 순서)
+
+        Returns:
+            list: 줄 번호 순서의 텍스트
+        """
+        if not len(self):
+            return []
+        if not self.tables:
+            words = [result.texts[i] for i in self.order.tolist()]
+            bounds = _boundaries(self.line).tolist()
+            return [' '.join(words[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+        cells, cell_line = self._cells(result)
+        bounds = _boundaries(cell_line).tolist()
+        return ['\t'.join(cells[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def text(self, result):
+        """읽기 순서의 평문 (줄은 줄바꿈, 문단은 빈 줄로 구분)"""
+        lines = self.line_texts(result)
+        bounds = _boundaries(self.line_paragraph).tolist()
+        return '\n\n'.join('\n'.join(lines[a:b]) for a, b in zip(bounds[:-1], bounds[1:]))
+
+    def to_dict(self, result):
+        """
+        JSON 출력용 구조 (blocks는 읽기 순서로 정렬한 results의 인덱스)
+
+        Returns:
+            dict: {'columns', 'paragraphs': [{'type', 'column', 'bbox',
+                   'lines': [{'text', 'bbox', 'blocks', 'cells'(tables=True일 때)}]}]}
+        """
+        lines = self.line_texts(result)
+        line_bbox = self.line_bbox.tolist()
+        block_bounds = _boundaries(self.line).tolist()
+        if self.tables and len(self):
+            cells, cell_line = self._cells(result)
+            cell_bounds = _boundaries(cell_line).tolist()
+        paragraphs = []
+        bounds = _boundaries(self.line_paragraph).tolist()
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            entries = []
+            for i in range(a, b):
+                entry = {'text': lines[i], 'bbox': line_bbox[i],
+                         'blocks': list(range(block_bounds[i], block_bounds[i + 1]))}
+                if self.tables:
+                    entry['cells'] = cells[cell_bounds[i]:cell_bounds[i + 1]]
+                entries.append(entry)
+            box = self.line_bbox[a:b]
+            paragraphs.append({
+                # 한 줄짜리 "항목 ... 값"은 표가 아니라 본문으로 표시
+                'type': 'table' if b - a > 1 and self.line_table[a:b].all() else 'text',
+                'column': int(self.line_column[a]),
+                'bbox': [int(box[:, 0].min()), int(box[:, 1].min()), int(box[:, 2].max()), int(box[:, 3].max())],
+                'lines': entries
+            })
+        return {'columns': self.columns, 'paragraphs': paragraphs}
+
+def _bands(x0, x1, cy, tolerance, span_ratio):
+    """
+    넓은 박스로 페이지를 위아래 구간으로 나눔
+
+    Returns:
+        tuple: (박스별 구간 키 - 넓은 줄 k는 2k+1, 그 앞 구간은 2k, 넓은 줄에 속하는지 여부)
+    """
+    count = len(x0)
+    band = np.zeros(count, dtype=np.int64)
+    spanning = np.zeros(count, dtype=bool)
+    width = max(float(x1.max() - x0.min()), 1.0)
+    wide = np.flatnonzero(x1 - x0 >= span_ratio * width) if span_ratio else np.zeros(0, dtype=np.int64)
+    if not len(wide):
+        return band, spanning
+    wide = wide[np.argsort(cy[wide], kind='stable')]
+    wide_cy = cy[wide]
+    band[wide] = 2 * np.arange(len(wide)) + 1
+    spanning[wide] = True
+
+    # 나머지 박스: 가장 가까운 넓은 줄과 높이가 같으면 그 줄에, 아니면 사이 구간에
+    rest = np.flatnonzero(~spanning)
+    position = np.searchsorted(wide_cy, cy[rest])
+    before = np.maximum(position - 1, 0)
+    after = np.minimum(position, len(wide) - 1)
+    distance_before = np.abs(cy[rest] - wide_cy[before])
+    distance_after = np.abs(wide_cy[after] - cy[rest])
+    nearest = np.where(distance_before <= distance_after, before, after)
+    attached = np.minimum(distance_before, distance_after) <= tolerance
+    band[rest] = np.where(attached, 2 * nearest + 1, 2 * position)
+    spanning[rest[attached]] = True
+    return band, spanning
+
+def _row_alignment(rows_a, rows_b, tolerance):
+    """두 단의 (정렬된) y 중심 중 작은 쪽이 다른 쪽 줄과 맞는 비율"""
+    small, large = (rows_a, rows_b) if len(rows_a) <= len(rows_b) else (rows_b, rows_a)
+    position = np.searchsorted(large, small)
+    before = large[np.maximum(position - 1, 0)]
+    after = large[np.minimum(position, len(large) - 1)]
+    return float(np.mean(np.minimum(np.abs(small - before), np.abs(after - small)) <= tolerance))
+
+def _merge_aligned(members, starts, x0, x1, cy, band, tolerance, config):
+    """
+    줄 높이가 맞는 이웃 단을 한 영역으로 합침
+
+    Args:
+        members: (구간, x) 순서로 정렬한 박스 인덱스
+        starts: 단별 시작 위치
+
+    Returns:
+        numpy.ndarray: 단 번호 -> 영역 번호
+    """
+    count = len(starts)
+    merge = np.zeros(max(count - 1, 0), dtype=bool)
+    if count > 1 and config.row_align:
+        sizes = np.diff(np.r_[starts, len(members)])
+        left = np.minimum.reduceat(x0[members], starts)
+        right = np.maximum.reduceat(x1[members], starts)
+        width = np.maximum(right - left, 1.0)
+        fill = np.add.reduceat(x1[members] - x0[members], starts) / sizes / width
+        prose = (fill >= config.text_fill) & (sizes >= 3)
+        # 둘 다 본문처럼 보이는 이웃 단: 폭이 같고 사이 공백이 넓으면 표 격자, 아니면 다단 기사
+        narrow = np.minimum(width[1:], width[:-1])
+        article = (prose[1:] & prose[:-1]
+                   & ((narrow < config.text_fill * np.maximum(width[1:], width[:-1]))
+                      | (left[1:] - right[:-1] < config.gutter_ratio * narrow)))
+        column_band = band[members[starts]]
+        group = np.repeat(np.arange(count), sizes)
+        rows = cy[members]
+        rows = np.split(rows[np.lexsort((rows, group))], starts[1:])
+        candidates = np.flatnonzero((column_band[1:] == column_band[:-1]) & ~article)
+        for g in candidates.tolist():
+            merge[g] = _row_alignment(rows[g], rows[g + 1], tolerance) >= config.row_align
+    return np.r_[0, np.cumsum(~merge)]
+
+def _regions(x0, x1, cy, band, spanning, unit, tolerance, config):
+    """
+    구간마다 세로 공백으로 단을 나누고 표 형태의 단을 합침
+
+    Returns:
+        tuple: (박스별 영역 번호 - 넓은 줄은 -1, 영역별 표 여부, 영역별 구간 안의 단 번호,
+                영역별 같은 구간의 영역 수)
+    """
+    region = np.full(len(x0), -1, dtype=np.int64)
+    members = np.flatnonzero(~spanning)
+    if not len(members):
+        none = np.zeros(0, dtype=np.int64)
+        return region, np.zeros(0, dtype=bool), none, none
+    gap = config.column_gap * unit
+    left = float(x0.min())
+    # 구간마다 x를 페이지 폭 + 공백 이상 밀어서 한 번의 누적 최대로 모든 구간을 처리
+    stride = float(x1.max()) - left + gap + 1.0
+    members = members[np.lexsort((x0[members], band[members]))]
+    offset = band[members] * stride - left
+    start = x0[members] + offset
+    reach = np.maximum.accumulate(x1[members] + offset)
+    new_column = np.ones(len(members), dtype=bool)
+    new_column[1:] = start[1:] > reach[:-1] + gap
+    starts = np.flatnonzero(new_column)
+    column = np.cumsum(new_column) - 1
+
+    merged = _merge_aligned(members, starts, x0, x1, cy, band, tolerance, config)
+    region[members] = merged[column]
+    sizes = np.bincount(merged)
+    table = sizes > 1
+    # 영역별 구간과 구간 안의 단 번호 (왼쪽부터 0)
+    first = np.r_[0, np.cumsum(sizes)[:-1]]
+    region_band = band[members[starts[first]]]
+    band_start = np.r_[True, region_band[1:] != region_band[:-1]]
+    index = np.arange(len(sizes))
+    local = index - np.maximum.accumulate(np.where(band_start, index, 0))
+    _, inverse, band_sizes = np.unique(region_band, return_inverse=True, return_counts=True)
+    return region, table, local, band_sizes[inverse]
+
+def analyze_layout(result, config=None):
+    """
+    박스 배열로 읽기 순서와 줄/문단/단 구조 계산
+
+    Args:
+        result: OCRResult 또는 Nx4x2 박스 배열
+        config (LayoutConfig): 레이아웃 설정 (None이면 기본값)
+
+    Returns:
+        Layout: 레이아웃 분석 결과
+    """
+    config = config or LayoutConfig()
+    boxes = np.asarray(getattr(result, 'boxes', result), dtype=np.float64).reshape(-1, 4, 2)
+    count = len(boxes)
+    if count == 0:
+        return Layout.empty(config.tables)
+    x0, x1 = boxes[:, :, 0].min(axis=1), boxes[:, :, 0].max(axis=1)
+    y0, y1 = boxes[:, :, 1].min(axis=1), boxes[:, :, 1].max(axis=1)
+    cy = (y0 + y1) / 2
+    unit = max(float(np.median(y1 - y0)), 1.0)
+    tolerance = config.line_tolerance * unit
+
+    band, spanning = _bands(x0, x1, cy, tolerance, config.span_ratio)
+    region, table, local, band_regions = _regions(x0, x1, cy, band, spanning, unit, tolerance, config)
+
+    # 줄: (구간, 영역, y 중심)으로 정렬해 y 중심이 tolerance 넘게 벌어지는 곳에서 나눔
+    order = np.lexsort((cy, region, band))
+    new_line = np.ones(count, dtype=bool)
+    new_line[1:] = ((band[order][1:] != band[order][:-1]) | (region[order][1:] != region[order][:-1])
+                    | (np.diff(cy[order]) > tolerance))
+    line = np.empty(count, dtype=np.int64)
+    line[order] = np.cumsum(new_line) - 1
+
+    # 읽기 순서: 줄 번호 → 왼쪽부터
+    order = np.lexsort((x0, line))
+    line = line[order]
+    starts = np.flatnonzero(np.r_[True, line[1:] != line[:-1]])
+    line_bbox = np.stack([np.minimum.reduceat(x0[order], starts), np.minimum.reduceat(y0[order], starts),
+                          np.maximum.reduceat(x1[order], starts), np.maximum.reduceat(y1[order], starts)],
+                         axis=1).round().astype(np.int64)
+    line_region = region[order][starts]
+    regular = line_region >= 0
+    line_table = np.zeros(len(starts), dtype=bool)
+    line_table[regular] = table[line_region[regular]]
+    line_column = np.full(len(starts), -1, dtype=np.int64)
+    line_column[regular] = local[line_region[regular]]
+    # 넓은 줄과 같은 구간에 단이 하나뿐이면 1단 본문의 짧은 줄이므로 영역이 바뀌어도 이어서 읽음
+    boundary = np.zeros(len(starts), dtype=bool)
+    boundary[regular] = (band_regions[line_region[regular]] > 1) | line_table[regular]
+
+    # 문단: 영역이 바뀌거나(다단/표 경계) 표가 아닌 줄 사이 공백이 paragraph_gap을 넘으면 새 문단
+    new_paragraph = np.ones(len(starts), dtype=bool)
+    gap = line_bbox[1:, 1] - line_bbox[:-1, 3]
+    new_paragraph[1:] = (((line_region[1:] != line_region[:-1]) & (boundary[1:] | boundary[:-1]))
+                         | (~line_table[1:] & (gap > config.paragraph_gap * unit)))
+    line_paragraph = np.cumsum(new_paragraph) - 1
+
+    # 셀: 줄 안에서 가로 공백이 cell_gap 이상인 곳
+    new_cell = np.ones(count, dtype=bool)
+    new_cell[1:] = x0[order][1:] - x1[order][:-1] > config.cell_gap * unit
+    new_cell[starts] = True
+    cell = np.cumsum(new_cell) - 1
+    cell -= cell[starts][line]
+
+    columns = int(local.max()) + 1 if len(local) else 1
+    return Layout(order, line, cell, line_bbox, line_paragraph, line_column, line_table,
+                  columns, config.tables)
@@ -0,0 +1,203 @@
+# 배치 실행 진행 기록 (중단 후 재시작, 증분 실행)
+#
+# 입력 파일마다 경로, 크기, 수정 시각(선택적으로 내용 해시)과 처리 상태를 SQLite에
+# 기록합니다. 다시 실행하면 이미 끝난 파일은 건너뛰고, 실패한 파일은 최대 시도
+# 횟수까지 재시도하며, 새로 추가되었거나 변경된 파일만 처리합니다.
+import os
+import time
+import sqlite3
+import threading
+from ocr_cache import hash_image_source
+
+FINISHED_STATUSES = ('saved', 'empty')
+
+class RunManifest:
+    def __init__(self, manifest_path="ocr_manifest.sqlite", max_attempts=3, use_hash=False,
+                 commit_every=256):
+        """
+        배치 처리 진행 기록
+
+        Args:
+            manifest_path (str): 기록 데이터베이스 파일 경로
+            max_attempts (int): 실패한 파일의 최대 시도 횟수 (도달하면 파일이 바뀔 때까지 건너뜀)
+            use_hash (bool): 크기는 같고 수정 시각만 바뀐 파일을 내용 해시로 다시 확인할지 여부
+                             (복사/touch로 시각만 바뀐 파일을 다시 처리하지 않음, 파일을 한 번 더 읽음)
+            commit_every (int): 이 건수마다 기록을 한 트랜잭션으로 커밋
+        """
+        self.manifest_path = manifest_path
+        self.max_attempts = max(1, max_attempts)
+        self.use_hash = use_hash
+        self.commit_every = max(1, commit_every)
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self._fingerprints = {}
+        self._rows = []
+        self._touched = []
+
+        parent = os.path.dirname(os.path.abspath(manifest_path))
+        os.makedirs(parent, exist_ok=True)
+        self._connect()
+
+    def _connect(self):
+        """현재 프로세스용 연결 반환 (fork 후에는 새로 연결)"""
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        conn = sqlite3.connect(self.manifest_path, timeout=30, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT, "
+            "status TEXT NOT NULL, attempts INTEGER NOT NULL, error TEXT, updated REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _stat(path):
+        """(크기, 수정 시각 ns) - 파일을 읽을 수 없으면 None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _is_finished(self, path, fingerprint, row):
+        """기록된 상태로 이번 실행에서 건너뛸 수 있는지 판단"""
+        if row is None or fingerprint is None:
+            return False
+        size, mtime_ns, digest, status, attempts = row
+        if (size, mtime_ns) != fingerprint:
+            if not (self.use_hash and digest and size == fingerprint[0]):
+                return False
+            try:
+                if hash_image_source(path) != digest:
+                    return False
+            except OSError:
+                return False
+            # 내용은 같고 시각만 바뀜 - 다음 실행에서 다시 해시하지 않도록 시각 갱신
+            self._touched.append((fingerprint[1], path))
+        return status in FINISHED_STATUSES or attempts >= self.max_attempts
+
+    def filter(self, paths, lookup_batch=500, remember=True):
+        """
+        이번 실행에서 처리할 경로만 반환 (지연 이터레이터)
+
+        경로를 lookup_batch개씩 묶어 한 번의 쿼리로 조회하므로 기록이 수백만 건이어도 빠릅니다.
+
+        Args:
+            paths (iterable): 입력 경로 (iter_files() 결과 등)
+            lookup_batch (int): 한 번에 조회할 경로 수 (SQLite 변수 한도 999 이하)
+            remember (bool): 조회한 파일 정보를 record() 때까지 보관할지 여부
+                             (False면 record()에서 다시 stat)
+
+        Yields:
+            입력 경로 (끝났거나 재시도 한도에 도달했고 변경되지 않은 파일은 제외)
+        """
+        iterator = iter(paths)
+        while True:
+            chunk = [path for _, path in zip(range(lookup_batch), iterator)]
+            if not chunk:
+                return
+            keys = [os.fspath(path) for path in chunk]
+            with self._lock:
+                conn = self._connect()
+                rows = {row[0]: row[1:] for row in conn.execute(
+                    f"SELECT path, size, mtime_ns, digest, status, attempts FROM items "
+                    f"WHERE path IN ({','.join('?' * len(keys))})", keys)}
+            for path, key in zip(chunk, keys):
+                fingerprint = self._stat(key)
+                if self._is_finished(key, fingerprint, rows.get(key)):
+                    self.skipped += 1
+                    continue
+                if remember:
+                    self._fingerprints[key] = fingerprint
+                yield path
+
+    def record(self, path, status, error=None, defer=False):
+        """
+        처리 결과 기록
+
+        Args:
+            path (str): 입력 경로
+            status (str): 'saved', 'empty' 또는 'error'
+            error (str): 오류 메시지
+            defer (bool): True면 commit_every에 도달해도 커밋하지 않음
+                          (샤드 출력처럼 결과가 디스크에 확정된 뒤 commit()을 호출하는 경우)
+        """
+        key = os.fspath(path)
+        fingerprint = self._fingerprints.pop(key, None) or self._stat(key)
+        size, mtime_ns = fingerprint or (None, None)
+        digest = None
+        if self.use_hash and fingerprint is not None:
+            try:
+                digest = hash_image_source(key)
+            except OSError:
+                pass
+        with self._lock:
+            self._rows.append((key, size, mtime_ns, digest, status, error, time.time()))
+            ready = not defer and len(self._rows) >= self.commit_every
+        if ready:
+            self.commit()
+
+    def commit(self):
+        """쌓인 기록을 한 트랜잭션으로 저장"""
+        with self._lock:
+            rows, self._rows = self._rows, []
+            touched, self._touched = self._touched, []
+            if not rows and not touched:
+                return
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 같은 파일(크기/시각 동일)의 재시도면 시도 횟수 누적, 바뀐 파일이면 1부터
+                conn.executemany(
+                    "INSERT INTO items (path, size, mtime_ns, digest, status, error, updated, attempts) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, 1) "
+                    "ON CONFLICT(path) DO UPDATE SET "
+                    "attempts = CASE WHEN items.size IS excluded.size AND items.mtime_ns IS excluded.mtime_ns "
+                    "THEN items.attempts + 1 ELSE 1 END, "
+                    "size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                    "digest = COALESCE(excluded.digest, items.digest), status = excluded.status, "
+                    "error = excluded.error, updated = excluded.updated", rows)
+                conn.executemany("UPDATE items SET mtime_ns = ? WHERE path = ?", touched)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def stats(self):
+        """
+        상태별 항목 수
+
+        Returns:
+            dict: {'saved': n, 'empty': n, 'error': n, 'exhausted': 재시도 한도 도달 수, 'skipped': 이번 실행에서 건너뛴 수}
+        """
+        with self._lock:
+            conn = self._connect()
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall())
+            exhausted = conn.execute("SELECT COUNT(*) FROM items WHERE status = 'error' AND attempts >= ?",
+                                     (self.max_attempts,)).fetchone()[0]
+        return {'saved': counts.get('saved', 0), 'empty': counts.get('empty', 0),
+                'error': counts.get('error', 0), 'exhausted': exhausted, 'skipped': self.skipped}
+
+    def close(self):
+        """남은 기록을 커밋하고 연결 종료"""
+        self.commit()
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,247 @@
+# 단계별 처리 시간 계측 및 메트릭 내보내기
+#
+# 기본값은 꺼짐이며, 꺼져 있을 때 stage()는 공유 no-op 컨텍스트를 반환하므로
+# 핫 패스 오버헤드는 함수 호출 한 번 수준입니다.
+import os
+import json
+import time
+import bisect
+import threading
+
+# 처리 시간 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class _NullStage:
+    """계측이 꺼져 있을 때 사용하는 아무 일도 하지 않는 컨텍스트"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _StageTimer:
+    """with 블록의 소요 시간을 히스토그램에 기록"""
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        누적 구간 히스토그램 (Prometheus 형식과 동일)
+
+        Args:
+            buckets (tuple): 구간 상한값 목록 (초)
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막은 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """구간 경계 기준 근사 분위수"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float('inf')
+
+    def snapshot(self):
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets['+Inf'] = self.count
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': buckets
+        }
+
+class Metrics:
+    def __init__(self, enabled=False):
+        """
+        단계별 처리 시간 히스토그램과 카운터 모음
+
+        Args:
+            enabled (bool): 계측 활성화 여부
+        """
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """
+        단계 소요 시간 측정 컨텍스트
+
+        Args:
+            name (str): 단계 이름 (예: 'det', 'rec', 'parse', 'write')
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _StageTimer(self, name)
+
+    def observe(self, name, seconds):
+        """단계 소요 시간 기록"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, amount=1):
+        """카운터 증가 (예: 'images', 'lines', 'errors')"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        """수집된 값 초기화"""
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self):
+        """
+        현재 메트릭 스냅샷
+
+        Returns:
+            dict: {'timestamp', 'stages': {단계: 통계}, 'counters': {이름: 값}}
+        """
+        with self._lock:
+            return {
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'stages': {name: h.snapshot() for name, h in sorted(self.histograms.items())},
+                'counters': dict(sorted(self.counters.items()))
+            }
+
+    def to_prometheus(self, prefix='ocr'):
+        """Prometheus 텍스트 노출 형식 문자열 생성"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds OCR 단계별 처리 시간",
+            f"# TYPE {prefix}_stage_seconds histogram"
+        ]
+        for stage, stats in snapshot['stages'].items():
+            for bound, count in stats['buckets'].items():
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        for name, value in snapshot['counters'].items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        return '\n'.join(lines) + '\n'
+
+    def export_prometheus(self, path, prefix='ocr'):
+        """
+        Prometheus 텍스트 파일로 저장 (node_exporter textfile 수집기용, 원자적 교체)
+
+        Args:
+            path (str): 출력 파일 경로 (.prom)
+            prefix (str): 메트릭 이름 접두사
+        """
+        _atomic_write(path, self.to_prometheus(prefix))
+        print(f"메트릭 저장 (Prometheus): {path}")
+
+    def export_json(self, path):
+        """
+        JSON 스냅샷으로 저장
+
+        Args:
+            path (str): 출력 파일 경로
+        """
+        _atomic_write(path, json.dumps(self.snapshot(), ensure_ascii=False, indent=2))
+        print(f"메트릭 저장 (JSON): {path}")
+
+    def print_summary(self):
+        """단계별 처리 시간 요약 출력"""
+        snapshot = self.snapshot()
+        print("\n=== 단계별 처리 시간 ===")
+        for stage, stats in snapshot['stages'].items():
+            print(f"{stage:>12}: {stats['count']:>6}회, 평균 {stats['mean'] * 1000:8.1f}ms, "
+                  f"합계 {stats['sum']:.2f}초")
+        for name, value in snapshot['counters'].items():
+            print(f"{name:>12}: {value}")
+
+def _atomic_write(path, content):
+    """임시 파일에 쓴 뒤 교체하여 읽는 쪽이 반쯤 쓰인 파일을 보지 않게 함"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+class _TimedCall:
+    """호출 시간을 지정한 단계로 기록하는 프록시 (속성 접근/설정은 원본으로 전달)"""
+
+    def __init__(self, func, stage_name):
+        object.__setattr__(self, '_func', func)
+        object.__setattr__(self, '_stage_name', stage_name)
+
+    def __call__(self, *args, **kwargs):
+        with metrics.stage(self._stage_name):
+            return self._func(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._func, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._func, name, value)
+
+def instrument_engine(engine):
+    """
+    엔진의 검출/방향 분류/인식 단계에 계측 프록시 설치 (한 번만)
+
+    PaddleOCR 2.x 엔진의 text_detector, text_classifier, text_recognizer를 감싸므로
+    기존 ocr() 호출 경로를 바꾸지 않고 단계별 시간을 기록합니다.
+    단계 속성이 없는 엔진은 그대로 반환합니다.
+
+    Args:
+        engine: PaddleOCR 엔진
+
+    Returns:
+        engine: 같은 엔진 객체
+    """
+    for attr, stage_name in (('text_detector', 'det'),
+                             ('text_classifier', 'cls'),
+                             ('text_recognizer', 'rec')):
+        component = getattr(engine, attr, None)
+        if component is not None and not isinstance(component, _TimedCall):
+            try:
+                setattr(engine, attr, _TimedCall(component, stage_name))
+            except AttributeError:
+                pass
+    return engine
+
+# 프로세스 전역 메트릭 (환경변수 OCR_METRICS=1로 시작 시 활성화 가능)
+metrics = Metrics(enabled=os.environ.get('OCR_METRICS') == '1')
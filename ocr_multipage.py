@@ -0,0 +1,177 @@
+# 다중 페이지 문서(PDF, TIFF) 입력
+#
+# 페이지를 한 장씩 렌더링/디코딩하여 BGR 배열로 넘기므로 메모리 사용량은
+# 문서 길이와 관계없이 (선행 로드 페이지 수 + 1) x 한 페이지 크기로 제한됩니다.
+# PDF 렌더링에는 pypdfium2 또는 PyMuPDF(fitz) 중 설치된 것을 사용합니다.
+import os
+import threading
+import numpy as np
+from PIL import Image
+from ocr_stream import prefetch
+from ocr_metrics import metrics
+
+# 기본 렌더링 해상도 (스캔 문서 OCR에 일반적으로 쓰이는 값)
+DEFAULT_DPI = 200
+
+DOCUMENT_EXTENSIONS = ('.pdf', '.tif', '.tiff')
+
+def _to_bgr(pil_image):
+    """PIL 이미지를 HxWx3 uint8 BGR 배열로 변환"""
+    rgb = np.asarray(pil_image.convert('RGB'))
+    return np.ascontiguousarray(rgb[:, :, ::-1])
+
+class _TiffPages:
+    """다중 페이지 TIFF (팩스 묶음 등) - 프레임을 하나씩 디코딩"""
+
+    def __init__(self, path, dpi):
+        self.image = Image.open(path)
+        self.dpi = dpi
+        self.page_count = getattr(self.image, 'n_frames', 1)
+
+    def render(self, index):
+        self.image.seek(index)
+        frame = self.image
+        source_dpi = frame.info.get('dpi')
+        if self.dpi and source_dpi and all(source_dpi):
+            # 팩스(204x98 등)처럼 가로/세로 해상도가 다른 경우도 같은 DPI로 맞춤
+            scale_x, scale_y = self.dpi / float(source_dpi[0]), self.dpi / float(source_dpi[1])
+            if abs(scale_x - 1) > 0.05 or abs(scale_y - 1) > 0.05:
+                size = (max(1, round(frame.width * scale_x)), max(1, round(frame.height * scale_y)))
+                return _to_bgr(frame.convert('L' if frame.mode in ('1', 'L') else 'RGB')
+                               .resize(size, Image.BILINEAR))
+        return _to_bgr(frame)
+
+    def close(self):
+        self.image.close()
+
+class _PdfiumPages:
+    """pypdfium2로 PDF 페이지 렌더링"""
+
+    def __init__(self, path, dpi):
+        import pypdfium2 as pdfium
+
+        self.pdf = pdfium.PdfDocument(path)
+        self.dpi = dpi or DEFAULT_DPI
+        self.page_count = len(self.pdf)
+
+    def render(self, index):
+        page = self.pdf[index]
+        try:
+            return _to_bgr(page.render(scale=self.dpi / 72).to_pil())
+        finally:
+            page.close()
+
+    def close(self):
+        self.pdf.close()
+
+class _FitzPages:
+    """PyMuPDF(fitz)로 PDF 페이지 렌더링"""
+
+    def __init__(self, path, dpi):
+        import fitz
+
+        self.doc = fitz.open(path)
+        self.dpi = dpi or DEFAULT_DPI
+        self.page_count = self.doc.page_count
+
+    def render(self, index):
+        pixmap = self.doc.load_page(index).get_pixmap(dpi=self.dpi, alpha=False)
+        array = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width, pixmap.n)
+        if pixmap.n == 1:
+            array = np.repeat(array, 3, axis=2)
+        return np.ascontiguousarray(array[:, :, 2::-1])
+
+    def close(self):
+        self.doc.close()
+
+def _is_pdf(path):
+    """PDF 여부 (확장자, 확장자가 없으면 파일 시그니처로 확인)"""
+    path = os.fspath(path)
+    if path.lower().endswith('.pdf'):
+        return True
+    if os.path.splitext(path)[1]:
+        return False
+    try:
+        with open(path, 'rb') as f:
+            return f.read(5) == b'%PDF-'
+    except OSError:
+        return False
+
+def open_pages(path, dpi=DEFAULT_DPI):
+    """
+    다중 페이지 문서 열기
+
+    Args:
+        path (str): PDF 또는 TIFF 파일 경로
+        dpi (int): 렌더링 해상도 (TIFF는 원본 DPI 정보가 있을 때만 재조정)
+
+    Returns:
+        페이지 리더 (page_count 속성, render(index), close())
+
+    Raises:
+        ImportError: PDF 렌더링 라이브러리가 없는 경우
+    """
+    if _is_pdf(path):
+        try:
+            return _PdfiumPages(path, dpi)
+        except ImportError:
+            pass
+        try:
+            return _FitzPages(path, dpi)
+        except ImportError:
+            raise ImportError("PDF 입력에는 pypdfium2 또는 PyMuPDF가 필요합니다: pip install pypdfium2")
+    return _TiffPages(path, dpi)
+
+def is_document(path):
+    """
+    페이지 단위로 처리할 문서인지 확인 (PDF, 또는 프레임이 2개 이상인 TIFF)
+    """
+    if not isinstance(path, (str, os.PathLike)):
+        return False
+    lower = os.fspath(path).lower()
+    if _is_pdf(path):
+        return True
+    if lower.endswith(('.tif', '.tiff')):
+        try:
+            with Image.open(path) as image:
+                return getattr(image, 'n_frames', 1) > 1
+        except Exception:
+            return False
+    return False
+
+def iter_pages(path, dpi=DEFAULT_DPI, lookahead=2, transform=None):
+    """
+    문서 페이지를 순서대로 하나씩 반환
+
+    페이지 렌더링은 백그라운드 스레드 하나에서 최대 lookahead 페이지까지
+    미리 진행되어 현재 페이지의 추론과 겹쳐 실행됩니다.
+
+    Args:
+        path (str): PDF 또는 TIFF 파일 경로
+        dpi (int): 렌더링 해상도
+        lookahead (int): 미리 렌더링해 둘 최대 페이지 수
+        transform (callable): 렌더링 스레드에서 페이지 배열에 적용할 함수 (예: 전처리)
+
+    Yields:
+        tuple: (페이지 번호(0부터), BGR 배열, 오류) - 렌더링 실패 시 배열은 None
+    """
+    reader = open_pages(path, dpi)
+    lock = threading.Lock()
+    state = {'closed': False}
+
+    def load(index):
+        # 문서 핸들은 스레드 안전하지 않으므로 렌더링 스레드는 하나만 사용
+        with lock:
+            if state['closed']:
+                raise RuntimeError("문서가 이미 닫혔습니다")
+            with metrics.stage('page_render'):
+                page = reader.render(index)
+        return transform(page) if transform is not None else page
+
+    try:
+        yield from prefetch(range(reader.page_count), load, max_workers=1, max_ahead=lookahead)
+    finally:
+        # 소비자가 중간에 멈춘 경우 진행 중인 렌더링이 끝난 뒤 닫기
+        with lock:
+            state['closed'] = True
+            reader.close()
@@ -0,0 +1,105 @@
+# 백그라운드 출력 단계 (직렬화, 파일 쓰기, 시각화를 추론과 겹쳐 실행)
+import time
+import queue
+import atexit
+import threading
+from ocr_metrics import metrics
+
+_STOP = object()
+
+class BackgroundOutput:
+    def __init__(self, max_pending=8, workers=1):
+        """
+        완료된 결과의 저장 작업을 별도 스레드에서 처리하는 출력 단계
+
+        대기 중인 작업이 max_pending개를 넘으면 submit()이 자리가 날 때까지 기다리므로
+        디스크가 느려도 메모리에 결과가 무한정 쌓이지 않고 추론 속도가 출력 속도에 맞춰집니다.
+
+        Args:
+            max_pending (int): 대기열 최대 길이
+            workers (int): 출력 스레드 수
+        """
+        self.max_pending = max(1, max_pending)
+        self._queue = queue.Queue(maxsize=self.max_pending)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {'submitted': 0, 'completed': 0, 'errors': 0, 'max_depth': 0, 'wait_seconds': 0.0}
+        self._threads = [
+            threading.Thread(target=self._run, name=f'ocr-output-{i}', daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+        # 프로그램 종료 시 남은 작업을 모두 기록
+        atexit.register(self.close)
+
+    def submit(self, func, *args, **kwargs):
+        """
+        출력 작업 추가 (대기열이 가득 차면 자리가 날 때까지 대기)
+
+        Args:
+            func (callable): 출력 스레드에서 실행할 함수
+            *args, **kwargs: 함수 인자
+        """
+        if self._closed:
+            raise RuntimeError("출력 단계가 이미 종료되었습니다")
+        start = time.perf_counter()
+        self._queue.put((func, args, kwargs))
+        waited = time.perf_counter() - start
+        depth = self._queue.qsize()
+        with self._lock:
+            self.stats['submitted'] += 1
+            self.stats['wait_seconds'] += waited
+            self.stats['max_depth'] = max(self.stats['max_depth'], depth)
+        metrics.observe('output_wait', waited)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                func, args, kwargs = item
+                try:
+                    func(*args, **kwargs)
+                    with self._lock:
+                        self.stats['completed'] += 1
+                except Exception as e:
+                    print(f"백그라운드 출력 중 오류: {e}")
+                    metrics.inc('output_errors')
+                    with self._lock:
+                        self.stats['errors'] += 1
+            finally:
+                self._queue.task_done()
+
+    def queue_depth(self):
+        """현재 대기 중인 출력 작업 수"""
+        return self._queue.qsize()
+
+    def flush(self):
+        """대기 중인 작업이 모두 끝날 때까지 대기"""
+        self._queue.join()
+
+    def close(self):
+        """남은 작업을 모두 기록한 뒤 출력 스레드 종료"""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        atexit.unregister(self.close)
+
+    def report(self):
+        """출력 단계 상태 (대기열 길이, 처리 건수, 생산자 대기 시간)"""
+        with self._lock:
+            return {'queue_depth': self.queue_depth(), 'max_pending': self.max_pending, **self.stats}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,254 @@
+# 열(column) 기반 OCR 결과 타입
+import json
+import numpy as np
+
+def _box_dtype(array):
+    """박스 배열의 저장 dtype (정수 좌표는 int32, 실수 좌표는 원래 정밀도 그대로)"""
+    if np.issubdtype(array.dtype, np.integer):
+        return np.int32
+    if np.issubdtype(array.dtype, np.floating):
+        return array.dtype
+    return np.float64
+
+def _to_quads(boxes, count):
+    """
+    다양한 형태의 박스 배열을 Nx4x2 배열로 변환 (PaddleOCR의 실수 좌표는 자르지 않음)
+
+    Args:
+        boxes: Nx4 ([x1, y1, x2, y2]) 또는 Nx4x2 (꼭짓점) 형태의 박스들
+        count (int): 텍스트 개수 (박스가 부족하면 0으로 채움)
+
+    Returns:
+        tuple: (Nx4x2 배열, 박스 유무 마스크 - 0으로 채운 행은 False)
+    """
+    if boxes is None or len(boxes) == 0:
+        return np.zeros((count, 4, 2), dtype=np.int32), np.zeros(count, dtype=bool)
+    try:
+        array = np.asarray(boxes)
+    except ValueError:
+        # 꼭짓점 개수가 제각각인 경우
+        array = np.asarray([np.asarray(b)[:4] for b in boxes])
+    if array.ndim == 2 and array.shape[1] == 4:
+        # [x1, y1, x2, y2] -> 좌상, 우상, 우하, 좌하 꼭짓점
+        array = np.stack([array[:, [0, 2, 2, 0]], array[:, [1, 1, 3, 3]]], axis=-1)
+    array = array.reshape(-1, 4, 2)
+    # dtype이 이미 저장 dtype이면 복사 없이 그대로 사용
+    array = array.astype(_box_dtype(array), copy=False)
+    has_box = np.arange(count) < len(array)
+    if len(array) < count:
+        array = np.concatenate([array, np.zeros((count - len(array), 4, 2), dtype=array.dtype)])
+    return array[:count], has_box
+
+class OCRResult:
+    __slots__ = ('texts', 'scores', 'boxes', 'has_box', 'source_format', '_dicts')
+
+    def __init__(self, texts, scores, boxes, source_format=None, has_box=None):
+        """
+        이미지 한 장의 OCR 결과 (텍스트 목록 + 신뢰도/박스 배열)
+
+        기존 [{'text', 'confidence', 'bbox'}, ...] 리스트처럼 반복, 인덱싱, len()을
+        지원하며 딕셔너리는 처음 필요할 때 한 번만 만들어집니다.
+
+        Args:
+            texts (list): 텍스트 목록
+            scores: 신뢰도 배열 (float64로 저장 - JSON에 원래 값 그대로 기록)
+            boxes: Nx4x2 박스 배열 (정수 좌표는 int32, 실수 좌표는 원래 dtype으로 저장)
+            source_format (str): 원시 결과 형식 ('predict', 'dict', 'list', 'dicts')
+            has_box: 박스 유무 불리언 배열 (None이면 모두 있음) - 박스가 없는 행은
+                     boxes에 0이 채워져 있고 to_dicts()의 'bbox'는 []
+        """
+        self.texts = list(texts)
+        self.scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        boxes = np.asarray(boxes)
+        self.boxes = boxes.astype(_box_dtype(boxes), copy=False).reshape(-1, 4, 2)
+        self.has_box = (np.ones(len(self.texts), dtype=bool) if has_box is None
+                        else np.asarray(has_box, dtype=bool).reshape(-1))
+        self.source_format = source_format
+        self._dicts = None
+
+    @classmethod
+    def empty(cls, source_format=None):
+        """빈 결과"""
+        return cls([], np.zeros(0, dtype=np.float64), np.zeros((0, 4, 2), dtype=np.int32),
+                   source_format)
+
+    @classmethod
+    def from_columns(cls, texts, scores, boxes, source_format=None, has_box=None):
+        """
+        열 데이터에서 결과 생성 (빈 텍스트는 제외)
+
+        Args:
+            texts (list): 텍스트 목록
+            scores: 신뢰도 목록/배열
+            boxes: 박스 목록/배열 (Nx4 또는 Nx4x2)
+            source_format (str): 원시 결과 형식
+            has_box: 박스 유무 불리언 배열 (None이면 boxes에 있는 만큼)
+        """
+        count = len(texts)
+        if count == 0:
+            return cls.empty(source_format)
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        if len(scores) < count:
+            scores = np.concatenate([scores, np.zeros(count - len(scores), dtype=np.float64)])
+        quads, present = _to_quads(boxes, count)
+        if has_box is not None:
+            present &= np.asarray(has_box, dtype=bool)
+
+        keep = np.fromiter((bool(t) and bool(str(t).strip()) for t in texts), dtype=bool, count=count)
+        if keep.all():
+            return cls([str(t) for t in texts], scores[:count], quads, source_format, present)
+        index = np.flatnonzero(keep)
+        return cls([str(texts[i]) for i in index], scores[index], quads[index], source_format, present[index])
+
+    @classmethod
+    def from_raw(cls, result):
+        """
+        PaddleOCR 원시 결과를 정규화 (세 가지 형식 모두 처리)
+
+        - predict() 결과 객체: rec_texts / rec_scores / rec_boxes 속성
+        - 딕셔너리 결과: result[0]['rec_texts'] 등
+        - 구버전 리스트 결과: result[0] = [[박스, (텍스트, 신뢰도)], ...]
+
+        Args:
+            result: ocr() 또는 predict()의 원시 결과
+
+        Returns:
+            OCRResult: 정규화된 결과
+        """
+        if result is None:
+            return cls.empty()
+
+        # 1. predict() 결과 객체 (속성 접근)
+        if hasattr(result, 'rec_texts') and hasattr(result, 'rec_scores'):
+            boxes = getattr(result, 'rec_boxes', None)
+            if boxes is None or len(boxes) == 0:
+                boxes = getattr(result, 'rec_polys', None)
+            return cls.from_columns(result.rec_texts, result.rec_scores, boxes, 'predict')
+
+        if not hasattr(result, '__len__') or len(result) == 0:
+            return cls.empty()
+        page = result[0]
+
+        # 2. 딕셔너리 결과 (최신 ocr() 형식)
+        if isinstance(page, dict) or hasattr(page, 'keys'):
+            if 'rec_texts' not in page or 'rec_scores' not in page:
+                return cls.empty('dict')
+            boxes = page.get('rec_boxes')
+            if boxes is None or len(boxes) == 0:
+                boxes = page.get('rec_polys')
+            return cls.from_columns(page['rec_texts'], page['rec_scores'], boxes, 'dict')
+
+        if hasattr(page, 'rec_texts'):
+            return cls.from_raw(page)
+
+        # 3. 구버전 리스트 결과
+        if page is None:
+            return cls.empty('list')
+        if isinstance(page, (list, tuple)):
+            texts, scores, boxes = [], [], []
+            for line in page:
+                if not line or len(line) < 2:
+                    continue
+                text_info = line[1]
+                if isinstance(text_info, (list, tuple)) and len(text_info) >= 2:
+                    text, confidence = text_info[0], text_info[1]
+                elif isinstance(text_info, str):
+                    text, confidence = text_info, 1.0
+                else:
+                    continue
+                texts.append(text)
+                scores.append(confidence)
+                boxes.append(np.asarray(line[0])[:4])
+            return cls.from_columns(texts, scores, boxes, 'list')
+
+        return cls.empty()
+
+    @classmethod
+    def from_dicts(cls, items):
+        """
+        [{'text', 'confidence', 'bbox'}, ...] 리스트에서 결과 생성 (캐시/JSON 복원용)
+        """
+        if isinstance(items, cls):
+            return items
+        items = list(items)
+        if not items:
+            return cls.empty('dicts')
+        # 'bbox'가 없거나 []인 항목은 박스 없음으로 표시 (to_dicts()에서 다시 [])
+        has_box = np.fromiter((len(item.get('bbox') or []) >= 4 for item in items), dtype=bool, count=len(items))
+        boxes = [item['bbox'] if present else [[0, 0]] * 4 for item, present in zip(items, has_box)]
+        return cls.from_columns([item['text'] for item in items],
+                                [item.get('confidence', 0.0) for item in items],
+                                boxes, 'dicts', has_box)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __bool__(self):
+        return len(self.texts) > 0
+
+    def __iter__(self):
+        return iter(self.to_dicts())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.select(np.arange(len(self))[index])
+        return self.to_dicts()[index]
+
+    def __repr__(self):
+        return f"OCRResult({len(self)} blocks)"
+
+    def select(self, index):
+        """
+        인덱스 배열 또는 불리언 마스크로 일부 결과 선택
+
+        Args:
+            index: 정수 인덱스 배열 또는 불리언 마스크
+
+        Returns:
+            OCRResult: 선택된 결과
+        """
+        index = np.asarray(index)
+        if index.dtype == bool:
+            index = np.flatnonzero(index)
+        return OCRResult([self.texts[i] for i in index], self.scores[index],
+                         self.boxes[index], self.source_format, self.has_box[index])
+
+    def filter_confidence(self, min_confidence):
+        """
+        신뢰도가 기준 이상인 결과만 선택 (배열 연산)
+
+        Args:
+            min_confidence (float): 최소 신뢰도
+
+        Returns:
+            OCRResult: 필터링된 결과
+        """
+        return self.select(self.scores >= min_confidence)
+
+    def mean_confidence(self):
+        """평균 신뢰도 (결과가 없으면 0.0)"""
+        return float(self.scores.mean()) if len(self) else 0.0
+
+    def plain_text(self, separator='\n'):
+        """텍스트만 줄바꿈으로 연결"""
+        return separator.join(self.texts)
+
+    def to_dicts(self):
+        """
+        기존 형식의 딕셔너리 리스트로 변환 (처음 호출 시 한 번만 생성)
+
+        Returns:
+            list: [{'text', 'confidence', 'bbox'}, ...] - 박스가 없는 항목의 'bbox'는 []
+        """
+        if self._dicts is None:
+            self._dicts = [
+                {'text': text, 'confidence': confidence, 'bbox': bbox if present else []}
+                for text, confidence, bbox, present in zip(self.texts, self.scores.tolist(),
+                                                           self.boxes.tolist(), self.has_box.tolist())
+            ]
+        return self._dicts
+
+    def to_json(self, **kwargs):
+        """결과 리스트를 JSON 문자열로 변환"""
+        kwargs.setdefault('ensure_ascii', False)
+        return json.dumps(self.to_dicts(), **kwargs)
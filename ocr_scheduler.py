@@ -0,0 +1,284 @@
+# 이미지 크기별 처리 레인 스케줄러
+#
+# 큰 스캔 한 장(4096x3072, 약 8초)이 뒤에 쌓인 작은 영수증(약 1초) 수십 장을 막지 않도록
+# 작업을 픽셀 수로 레인에 나누고, 레인마다 워커 몫을 따로 둡니다.
+#
+# - 워커에 담당 레인이 있으면(워커 수 >= 레인 수) 자기 레인을 먼저 처리하고, 비어 있을 때만
+#   더 작은 레인의 작업을 돕습니다. 작은 레인 워커는 큰 작업을 가져가지 않으므로 작은 작업이
+#   큰 작업 뒤에서 기다리지 않고, 큰 레인은 전용 워커가 있어 굶지 않습니다.
+# - 담당 레인이 없는 워커(워커 수 < 레인 수, 또는 추론 스레드가 하나인 서비스)는 레인 몫에 비례한
+#   가중 라운드 로빈으로 레인을 고르며, max_wait_seconds 이상 기다린 작업을 먼저 꺼냅니다.
+import math
+import time
+import threading
+from collections import deque
+from ocr_metrics import metrics
+
+class Lane:
+    def __init__(self, name, max_pixels=None, share=1):
+        """
+        처리 레인
+
+        Args:
+            name (str): 레인 이름 (보고서/메트릭에 사용)
+            max_pixels (int): 이 레인에 들어가는 최대 픽셀 수 (None이면 상한 없음 - 마지막 레인)
+            share (int): 워커 몫 (워커 배분과 가중 라운드 로빈의 가중치)
+        """
+        self.name = name
+        self.max_pixels = max_pixels
+        self.share = max(1, share)
+
+    def to_dict(self):
+        return {'name': self.name, 'max_pixels': self.max_pixels, 'share': self.share}
+
+# README 성능 표 기준: 1024x768 약 1초, 2048x1536 약 3초, 4096x3072 약 8초
+DEFAULT_LANES = (
+    Lane('small', 2_000_000, share=2),
+    Lane('medium', 6_000_000, share=1),
+    Lane('large', None, share=1),
+)
+
+def estimate_pixels(source):
+    """
+    작업 비용 추정용 픽셀 수 (파일은 헤더만 읽음)
+
+    Args:
+        source: 이미지 경로, 바이트 또는 배열
+
+    Returns:
+        int: 너비 x 높이 - 읽을 수 없는 형식(PDF 등)이면 None (가장 큰 레인으로 보냄)
+    """
+    from ocr_visualize import image_size
+
+    try:
+        width, height = image_size(source)
+    except Exception:
+        return None
+    return width * height
+
+def _percentile(values, q):
+    """최근접 순위 방식 분위수 (q: 0~100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))]
+
+class _Ticket:
+    """레인에 들어간 작업 하나 (대기/처리 시간 측정용)"""
+    __slots__ = ('item', 'lane', 'enqueued', 'started')
+
+    def __init__(self, item, lane):
+        self.item = item
+        self.lane = lane
+        self.enqueued = time.perf_counter()
+        self.started = None
+
+class _LaneStats:
+    """레인별 대기/처리 시간 (평균은 전체, 분위수는 최근 samples개 기준)"""
+
+    def __init__(self, samples=10000):
+        self.count = 0
+        self.wait_sum = 0.0
+        self.latency_sum = 0.0
+        self.waits = deque(maxlen=samples)
+        self.latencies = deque(maxlen=samples)
+
+class LaneFull(Exception):
+    """레인 대기열이 가득 참 (block=False로 넣을 때)"""
+
+class SizeScheduler:
+    def __init__(self, lanes=DEFAULT_LANES, capacity=64, max_wait_seconds=30.0):
+        """
+        픽셀 수 기준 레인 스케줄러 (스레드 안전)
+
+        Args:
+            lanes (tuple): Lane 목록 (max_pixels 오름차순, 마지막 레인은 상한 없음)
+            capacity (int): 레인별 최대 대기 작업 수
+            max_wait_seconds (float): 담당 레인이 없는 워커가 이 시간 이상 기다린 작업을 먼저 꺼냄
+        """
+        if not lanes:
+            raise ValueError("레인이 하나 이상 필요합니다")
+        self.lanes = tuple(lanes)
+        self.capacity = max(1, capacity)
+        self.max_wait_seconds = max_wait_seconds
+        self._queues = [deque() for _ in self.lanes]
+        self._stats = [_LaneStats() for _ in self.lanes]
+        self._current = [0] * len(self.lanes)
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def lane_for(self, pixels):
+        """픽셀 수에 맞는 레인 번호 (None이면 마지막 레인)"""
+        if pixels is not None:
+            for index, lane in enumerate(self.lanes):
+                if lane.max_pixels is None or pixels <= lane.max_pixels:
+                    return index
+        return len(self.lanes) - 1
+
+    def worker_lanes(self, workers):
+        """
+        워커별 담당 레인 (레인 몫에 비례, 레인마다 최소 1명)
+
+        Returns:
+            list: 워커별 레인 번호 - 워커 수가 레인 수보다 적으면 모두 None (가중 라운드 로빈)
+        """
+        if workers < len(self.lanes):
+            return [None] * workers
+        counts = [1] * len(self.lanes)
+        total_share = sum(lane.share for lane in self.lanes)
+        for _ in range(workers - len(self.lanes)):
+            # 몫 대비 배정이 가장 적은 레인에 한 명씩 추가
+            index = min(range(len(self.lanes)),
+                        key=lambda i: (counts[i] / (self.lanes[i].share / total_share), i))
+            counts[index] += 1
+        return [index for index, count in enumerate(counts) for _ in range(count)]
+
+    def put(self, item, pixels=None, block=True):
+        """
+        작업 추가
+
+        Args:
+            item: 작업
+            pixels (int): 픽셀 수 (None이면 마지막 레인)
+            block (bool): 레인이 가득 찼을 때 기다릴지 여부 (False면 LaneFull)
+
+        Returns:
+            int: 들어간 레인 번호 (닫힌 뒤에는 None)
+        """
+        index = self.lane_for(pixels)
+        with self._cond:
+            while len(self._queues[index]) >= self.capacity and not self._closed:
+                if not block:
+                    raise LaneFull(f"{self.lanes[index].name} 레인 대기열이 가득 찼습니다 ({self.capacity})")
+                self._cond.wait()
+            if self._closed:
+                return None
+            self._queues[index].append(_Ticket(item, index))
+            self._cond.notify_all()
+        return index
+
+    def _pick(self, home):
+        """꺼낼 레인 번호 (잠금을 잡은 상태에서 호출, 없으면 None)"""
+        if home is not None:
+            # 자기 레인 → 더 작은 레인 순서 (큰 작업은 그 레인 워커만 처리)
+            for index in range(home, -1, -1):
+                if self._queues[index]:
+                    return index
+            return None
+
+        ready = [index for index, queue in enumerate(self._queues) if queue]
+        if not ready:
+            return None
+        # 오래 기다린 작업 우선 (가중치가 작은 레인이 굶지 않도록)
+        now = time.perf_counter()
+        oldest = min(ready, key=lambda index: self._queues[index][0].enqueued)
+        if now - self._queues[oldest][0].enqueued >= self.max_wait_seconds:
+            return oldest
+        # 부드러운 가중 라운드 로빈 (nginx 방식)
+        total = 0
+        for index in ready:
+            self._current[index] += self.lanes[index].share
+            total += self.lanes[index].share
+        chosen = max(ready, key=lambda index: self._current[index])
+        self._current[chosen] -= total
+        return chosen
+
+    def get(self, home=None, timeout=None, lane=None):
+        """
+        다음 작업 꺼내기
+
+        Args:
+            home (int): 워커의 담당 레인 (None이면 가중 라운드 로빈)
+            timeout (float): 최대 대기 시간 (None이면 작업이 오거나 닫힐 때까지, 0이면 기다리지 않음)
+            lane (int): 이 레인에서만 꺼냄 (같은 크기끼리 배치를 채울 때)
+
+        Returns:
+            _Ticket: 작업 (ticket.item) - 닫혔고 남은 작업이 없거나 시간이 지나면 None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if lane is not None:
+                    index = lane if self._queues[lane] else None
+                else:
+                    index = self._pick(home)
+                if index is not None:
+                    ticket = self._queues[index].popleft()
+                    ticket.started = time.perf_counter()
+                    self._cond.notify_all()
+                    return ticket
+                if self._closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def task_done(self, ticket):
+        """작업 완료 기록 (레인별 대기 시간과 처리 시간)"""
+        finished = time.perf_counter()
+        wait = ticket.started - ticket.enqueued
+        latency = finished - ticket.started
+        name = self.lanes[ticket.lane].name
+        with self._cond:
+            stats = self._stats[ticket.lane]
+            stats.count += 1
+            stats.wait_sum += wait
+            stats.latency_sum += latency
+            stats.waits.append(wait)
+            stats.latencies.append(latency)
+        metrics.observe(f'lane_{name}_wait', wait)
+        metrics.observe(f'lane_{name}_latency', latency)
+
+    def close(self, discard=False):
+        """
+        더 이상 작업을 받지 않음 (남은 작업은 계속 꺼낼 수 있음)
+
+        Args:
+            discard (bool): 남은 작업도 버림 (중단 시)
+        """
+        with self._cond:
+            self._closed = True
+            if discard:
+                for queue in self._queues:
+                    queue.clear()
+            self._cond.notify_all()
+
+    def pending(self):
+        """레인별 대기 작업 수 합계"""
+        with self._cond:
+            return sum(len(queue) for queue in self._queues)
+
+    def report(self):
+        """
+        레인별 대기/처리 시간
+
+        Returns:
+            dict: 레인 이름 -> {'completed', 'queued', 'wait_mean', 'wait_p95',
+                                'latency_mean', 'latency_p95', 'total_p95'}
+        """
+        report = {}
+        with self._cond:
+            for lane, queue, stats in zip(self.lanes, self._queues, self._stats):
+                count = stats.count
+                totals = [w + l for w, l in zip(stats.waits, stats.latencies)]
+                report[lane.name] = {
+                    'completed': count,
+                    'queued': len(queue),
+                    'wait_mean': stats.wait_sum / count if count else 0.0,
+                    'wait_p95': _percentile(stats.waits, 95),
+                    'latency_mean': stats.latency_sum / count if count else 0.0,
+                    'latency_p95': _percentile(stats.latencies, 95),
+                    'total_p95': _percentile(totals, 95)
+                }
+        return report
+
+    def print_report(self):
+        """레인별 대기/처리 시간 출력"""
+        print("\n=== 크기별 레인 ===")
+        print(f"{'레인':<8} {'완료':>7} {'대기':>5} {'대기 평균':>9} {'대기 p95':>9} "
+              f"{'처리 평균':>9} {'처리 p95':>9} {'전체 p95':>9}")
+        for name, row in self.report().items():
+            print(f"{name:<8} {row['completed']:>7} {row['queued']:>5} {row['wait_mean']:>8.2f}s "
+                  f"{row['wait_p95']:>8.2f}s {row['latency_mean']:>8.2f}s {row['latency_p95']:>8.2f}s "
+                  f"{row['total_p95']:>8.2f}s")
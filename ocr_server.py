@@ -0,0 +1,527 @@
+# 상주형 OCR 서비스 (asyncio HTTP + 요청 마이크로 배치)
+#
+# 사용 예:
+#   python ocr_server.py serve --engine paddle --lang korean --port 8866
+#   python ocr_server.py serve --engine stub                      # 가짜 엔진으로 로컬 테스트
+#   python ocr_server.py client --url http://127.0.0.1:8866 image.jpg
+#   python ocr_server.py serve --unix /tmp/ocr.sock               # 로컬 데몬 (ocr_daemon.py로 접속)
+#   python ocr_server.py serve --ocr simple --layout --crop-cache  # CLI와 같은 OCR 설정으로 서비스
+#
+# 요청:
+#   POST /ocr?name=image.jpg   본문: 이미지 바이트 또는 multipart/form-data (image 필드)
+#   GET  /health               상태 및 큐 길이
+#   GET  /metrics              Prometheus 텍스트 형식 메트릭
+# 응답 JSON은 save_results()가 저장하는 형식과 같습니다:
+#   {"image_path": ..., "total_blocks": N, "results": [{"text", "confidence", "bbox"}, ...]}
+#   (레이아웃 설정이 있으면 "layout" 항목 포함)
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import email.parser
+import email.policy
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit, parse_qs, quote
+from concurrent.futures import ThreadPoolExecutor
+
+from ocr_metrics import metrics
+from ocr_layout import LayoutConfig
+from ocr_cascade import CascadeConfig
+from ocr_preprocess import PreprocessConfig
+from ocr_scheduler import DEFAULT_LANES, Lane, LaneFull, SizeScheduler, estimate_pixels
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                411: 'Length Required', 413: 'Payload Too Large', 429: 'Too Many Requests',
+                500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+class QueueFullError(Exception):
+    """요청 큐가 가득 차서 새 요청을 받을 수 없음"""
+
+class OCRService:
+    def __init__(self, ocr, max_batch_size=8, max_wait_ms=10, max_queue=64, rec_batch_size=None, lanes=None):
+        """
+        OCR 객체를 상주시킨 채 동시 요청을 마이크로 배치로 묶어 처리하는 서비스
+
+        첫 요청이 도착하면 최대 max_wait_ms 동안 추가 요청을 기다렸다가
+        최대 max_batch_size개를 한 번의 배치 추론으로 처리합니다.
+        대기 중인 요청이 max_queue개를 넘으면 새 요청은 거절됩니다(HTTP 429).
+        lanes를 지정하면 요청을 픽셀 수로 레인에 나눠 같은 레인끼리만 배치로 묶고,
+        레인 몫에 비례한 가중 라운드 로빈으로 번갈아 처리합니다 (큰 이미지가 작은 요청을 막지 않음).
+
+        추론은 ocr 객체의 경로를 그대로 사용하므로 전처리, 타일 모드, 캐스케이드, 조각 캐시,
+        결과 캐시, 레이아웃 설정이 CLI와 같게 적용되고 응답도 save_results()의 JSON과 같습니다.
+
+        Args:
+            ocr: 설정을 마친 GPUAcceleratedOCR(배치 추론) 또는 SimpleOCR(요청별 추론) 객체
+            max_batch_size (int): 배치당 최대 이미지 수
+            max_wait_ms (float): 배치를 채우기 위한 최대 대기 시간 (밀리초)
+            max_queue (int): 대기 큐 최대 길이
+            rec_batch_size (int): 인식기 배치 크기 (None이면 엔진 설정 유지, 배치 추론에만 적용)
+            lanes (tuple or bool): 크기별 레인 (True면 DEFAULT_LANES, None이면 레인 하나)
+                                   max_queue는 레인별 대기열 길이로 적용
+        """
+        self.ocr = ocr
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.rec_batch_size = rec_batch_size
+        self.lanes = DEFAULT_LANES if lanes is True else (tuple(lanes) if lanes else (Lane('all'),))
+        self.scheduler = SizeScheduler(self.lanes, capacity=max_queue)
+        self._ready = None
+        # Paddle 예측기는 스레드 안전하지 않으므로 추론은 단일 스레드에서
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ocr-infer')
+        self.stats = {'requests': 0, 'rejected': 0, 'errors': 0, 'batches': 0, 'batched_images': 0}
+        # 서비스 시작 시간 (build_service()가 엔진 로드/워밍업 시간을 기록)
+        self.startup = {}
+        self._batch_task = None
+
+    async def start(self):
+        """배치 처리 루프 시작 (이벤트 루프 안에서 호출)"""
+        self._ready = asyncio.Event()
+        self._batch_task = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        """배치 처리 루프 중지"""
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+            try:
+                await self._batch_task
+            except asyncio.CancelledError:
+                pass
+        self.scheduler.close(discard=True)
+        self.executor.shutdown(wait=True)
+        self.ocr.flush_output()
+
+    async def submit(self, name, data):
+        """
+        이미지 한 장 처리 요청
+
+        Args:
+            name (str): 이미지 이름 (응답의 image_path)
+            data (bytes): 인코딩된 이미지 바이트
+
+        Returns:
+            dict: save_results()의 JSON과 같은 형식의 결과
+
+        Raises:
+            QueueFullError: 대기 큐가 가득 찬 경우
+            ValueError: 이미지를 디코딩할 수 없는 경우
+        """
+        future = asyncio.get_running_loop().create_future()
+        # 레인이 여럿이면 헤더만 읽어 픽셀 수로 레인 결정
+        pixels = estimate_pixels(data) if len(self.lanes) > 1 else None
+        try:
+            self.scheduler.put((name, data, future), pixels, block=False)
+        except LaneFull as e:
+            self.stats['rejected'] += 1
+            raise QueueFullError(str(e))
+        self.stats['requests'] += 1
+        self._ready.set()
+        return await future
+
+    async def _next(self, lane=None, timeout=None):
+        """다음 요청 꺼내기 (lane을 지정하면 그 레인에서만, timeout이 지나면 None)"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            ticket = self.scheduler.get(timeout=0, lane=lane)
+            if ticket is not None:
+                return ticket
+            # 이벤트 루프 안에서만 넣고 꺼내므로 확인과 clear() 사이에 요청이 끼어들지 않음
+            self._ready.clear()
+            if deadline is None:
+                await self._ready.wait()
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._ready.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    async def _batch_loop(self):
+        """큐에서 요청을 모아 배치로 처리"""
+        loop = asyncio.get_running_loop()
+        while True:
+            tickets = [await self._next()]
+            deadline = loop.time() + self.max_wait
+            while len(tickets) < self.max_batch_size:
+                # 같은 레인끼리만 배치로 묶음 (큰 이미지와 섞이면 배치 전체가 큰 이미지만큼 느려짐)
+                ticket = await self._next(tickets[0].lane, deadline - loop.time())
+                if ticket is None:
+                    break
+                tickets.append(ticket)
+
+            batch = [ticket.item for ticket in tickets]
+            items = [(name, data) for name, data, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.process_batch, items)
+            except Exception as e:
+                results = [e] * len(batch)
+            for ticket in tickets:
+                self.scheduler.task_done(ticket)
+
+            self.stats['batches'] += 1
+            self.stats['batched_images'] += len(batch)
+            for (_, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    self.stats['errors'] += 1
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def process_batch(self, items):
+        """
+        요청 묶음을 디코딩하고 OCR 객체로 처리 (추론 스레드에서 실행)
+
+        Args:
+            items (list): (이름, 이미지 바이트) 목록
+
+        Returns:
+            list: 요청별 결과 딕셔너리(OCRDocument.to_dict()) 또는 예외 객체
+        """
+        results = [None] * len(items)
+        documents, owners = [], []
+        for index, (name, data) in enumerate(items):
+            document = self.ocr.document(data, name)
+            try:
+                # 디코딩 실패는 요청 오류(400)로 돌려주기 위해 먼저 디코딩
+                document.image
+            except Exception as e:
+                results[index] = ValueError(f"이미지를 디코딩할 수 없습니다: {e}")
+                continue
+            documents.append(document)
+            owners.append(index)
+
+        if documents and hasattr(self.ocr, 'extract_text_batch'):
+            # GPUAcceleratedOCR: 캐시 적중이 아닌 이미지를 한 번의 배치 추론으로 (문서에 결과가 채워짐)
+            self.ocr.extract_text_batch(documents, batch_size=len(documents),
+                                        rec_batch_size=self.rec_batch_size)
+        for index, document in zip(owners, documents):
+            # SimpleOCR는 여기서 한 장씩 추론 (배치 추론을 거친 문서는 채워진 결과 사용)
+            results[index] = document.to_dict()
+        return results
+
+    def health(self):
+        """상태 정보"""
+        batches = self.stats['batches']
+        health = {
+            'status': 'ok',
+            'queue_depth': self.scheduler.pending(),
+            'max_queue': self.max_queue,
+            'mean_batch_size': self.stats['batched_images'] / batches if batches else 0.0,
+            'startup': self.startup,
+            **self.stats
+        }
+        if len(self.lanes) > 1:
+            # 레인별 대기 시간/처리 시간 (처리 시간은 그 요청이 속한 배치 전체 시간)
+            health['lanes'] = self.scheduler.report()
+        cascade = self.ocr.cascade_report()
+        if cascade is not None:
+            # 2단계로 넘어간 라인/페이지 비율과 단계별 인식 시간
+            health['cascade'] = cascade
+        return health
+
+def _extract_multipart_image(content_type, body):
+    """
+    multipart/form-data 본문에서 이미지 파트 추출
+
+    Returns:
+        tuple: (파일 이름, 이미지 바이트) - 없으면 (None, None)
+    """
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + body)
+    fallback = (None, None)
+    for part in message.iter_parts():
+        data = part.get_payload(decode=True)
+        if data is None:
+            continue
+        field = part.get_param('name', header='content-disposition')
+        filename = part.get_filename()
+        if field == 'image':
+            return filename or field, data
+        if filename and fallback[1] is None:
+            fallback = (filename, data)
+    return fallback
+
+class OCRHTTPServer:
+    def __init__(self, service, max_body_mb=32):
+        """
+        OCRService를 HTTP로 노출하는 최소 asyncio 서버 (표준 라이브러리만 사용)
+
+        Args:
+            service (OCRService): OCR 서비스
+            max_body_mb (int): 요청 본문 최대 크기 (MB)
+        """
+        self.service = service
+        self.max_body = int(max_body_mb * 1024 * 1024)
+
+    async def handle(self, reader, writer):
+        """연결 하나 처리 (요청 하나 처리 후 연결 종료)"""
+        try:
+            status, payload, content_type = await self._handle_request(reader)
+        except Exception as e:
+            status, payload, content_type = 500, {'error': str(e)}, 'application/json'
+        await self._send(writer, status, payload, content_type)
+
+    async def _handle_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return 400, {'error': '빈 요청'}, 'application/json'
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            return 400, {'error': '잘못된 요청 줄'}, 'application/json'
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        url = urlsplit(target)
+        if url.path == '/health' and method == 'GET':
+            return 200, self.service.health(), 'application/json'
+        if url.path == '/metrics' and method == 'GET':
+            return 200, metrics.to_prometheus(), 'text/plain; version=0.0.4'
+        if url.path != '/ocr':
+            return 404, {'error': f'알 수 없는 경로: {url.path}'}, 'application/json'
+        if method != 'POST':
+            return 405, {'error': 'POST만 지원합니다'}, 'application/json'
+
+        if 'content-length' not in headers:
+            return 411, {'error': 'Content-Length가 필요합니다'}, 'application/json'
+        try:
+            length = int(headers['content-length'])
+        except ValueError:
+            length = -1
+        if length < 0:
+            return 400, {'error': f"잘못된 Content-Length: {headers['content-length']}"}, 'application/json'
+        if length > self.max_body:
+            return 413, {'error': f'본문이 너무 큽니다 ({length} bytes)'}, 'application/json'
+        body = await reader.readexactly(length)
+
+        name = parse_qs(url.query).get('name', ['upload'])[0]
+        content_type = headers.get('content-type', 'application/octet-stream')
+        if content_type.startswith('multipart/form-data'):
+            filename, body = _extract_multipart_image(content_type, body)
+            if body is None:
+                return 400, {'error': 'multipart 본문에 이미지가 없습니다'}, 'application/json'
+            name = filename or name
+        if not body:
+            return 400, {'error': '이미지 본문이 비어 있습니다'}, 'application/json'
+
+        try:
+            result = await self.service.submit(name, body)
+        except QueueFullError as e:
+            return 429, {'error': str(e)}, 'application/json'
+        except ValueError as e:
+            return 400, {'error': str(e)}, 'application/json'
+
+        return 200, result, 'application/json'
+
+    async def _send(self, writer, status, payload, content_type):
+        if isinstance(payload, (dict, list)):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        else:
+            body = str(payload).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n")
+        if status == 429:
+            head += "Retry-After: 1\r\n"
+        try:
+            writer.write(head.encode('latin-1') + b"\r\n" + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+async def serve(service, host='127.0.0.1', port=8866, max_body_mb=32, unix_path=None):
+    """
+    OCR HTTP 서버 실행 (종료될 때까지 대기)
+
+    Args:
+        service (OCRService): OCR 서비스
+        host (str): 바인드 주소
+        port (int): 포트
+        max_body_mb (int): 요청 본문 최대 크기 (MB)
+        unix_path (str): 지정하면 TCP 대신 이 Unix 소켓에서 대기 (현재 사용자만 접근 가능)
+    """
+    http = OCRHTTPServer(service, max_body_mb)
+    await service.start()
+    if unix_path:
+        # 이전 실행이 비정상 종료되어 남은 소켓 파일 제거
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        server = await asyncio.start_unix_server(http.handle, unix_path)
+        os.chmod(unix_path, 0o600)
+        address = f"unix:{unix_path}"
+    else:
+        server = await asyncio.start_server(http.handle, host, port)
+        address = f"http://{host}:{port}"
+    print(f"OCR 서버 시작: {address} (배치 최대 {service.max_batch_size}장, "
+          f"대기 {service.max_wait * 1000:.0f}ms, 큐 {service.max_queue})", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+        if unix_path and os.path.exists(unix_path):
+            os.unlink(unix_path)
+
+def post_image(url, image_path, timeout=60):
+    """
+    OCR 서버에 이미지 전송 (테스트/CLI 클라이언트)
+
+    Args:
+        url (str): 서버 주소 (예: http://127.0.0.1:8866)
+        image_path (str): 이미지 파일 경로
+        timeout (float): 응답 대기 시간 (초)
+
+    Returns:
+        tuple: (HTTP 상태 코드, 응답 JSON)
+    """
+    with open(image_path, 'rb') as f:
+        data = f.read()
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/ocr?name={quote(os.path.basename(image_path))}",
+        data=data, method='POST', headers={'Content-Type': 'application/octet-stream'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        return e.code, json.loads(body) if body else {}
+
+def _load_ocr_class(name):
+    """
+    스크립트 파일에서 OCR 클래스 로드 (파일 이름에 공백이 있어 일반 import를 쓸 수 없음)
+
+    Args:
+        name (str): 'gpu'(GPUAcceleratedOCR) 또는 'simple'(SimpleOCR)
+    """
+    import importlib.util
+
+    filename, class_name = {'gpu': ('2. PaddleOCR_GPU.py', 'GPUAcceleratedOCR'),
+                            'simple': ('1. PaddleOCR.py', 'SimpleOCR')}[name]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    spec = importlib.util.spec_from_file_location(f"ocr_script_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, class_name)
+
+def build_service(engine_name='paddle', lang='korean', device=None, cache_path=None, warmup=True,
+                  ocr_class='gpu', ocr_options=None, **kwargs):
+    """
+    OCR 객체를 만들어 엔진을 미리 로드(및 워밍업)한 OCRService 생성
+
+    Args:
+        engine_name (str): 'paddle' 또는 'stub'
+        lang (str): 언어 설정
+        device (str): 'cpu', 'gpu' 또는 None (ocr_class='gpu'면 GPU 사용 가능 여부로 결정)
+        cache_path (str): 결과 캐시 파일 경로 (None이면 사용 안 함)
+        warmup (bool): 더미 추론으로 첫 요청 전에 커널을 준비할지 여부
+        ocr_class (str): 'gpu'면 GPUAcceleratedOCR(배치 추론), 'simple'이면 SimpleOCR(요청별 추론)
+        ocr_options (dict): OCR 클래스 생성자 옵션 (preprocess, tiling, cascade, crop_cache,
+                            layout, tuning 등 - CLI와 같은 설정으로 처리)
+        **kwargs: OCRService 옵션
+
+    Returns:
+        OCRService: 서비스 객체 (startup에 콜드/워밍된 시작 시간 기록)
+    """
+    options = dict(ocr_options or {})
+    options.update(lang=lang, cache=cache_path)
+    if engine_name == 'stub':
+        options['device'] = 'stub'
+    if ocr_class == 'gpu':
+        if engine_name != 'stub':
+            options.setdefault('use_gpu', device != 'cpu')
+    else:
+        # 서비스 응답에는 시각화 파일이 필요 없음
+        options.setdefault('visualize', False)
+        if engine_name != 'stub' and device:
+            options['device'] = device
+    ocr = _load_ocr_class(ocr_class)(**options)
+    startup = ocr.warmup() if warmup else dict(ocr.startup)
+    print(f"모델 준비 완료: {startup['load_seconds']:.2f}초")
+    service = OCRService(ocr, **kwargs)
+    service.startup = startup
+    return service
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="상주형 OCR 서비스")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="서버 실행")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8866)
+    serve_parser.add_argument('--engine', choices=['paddle', 'stub'], default='paddle')
+    serve_parser.add_argument('--lang', default='korean')
+    serve_parser.add_argument('--device', choices=['cpu', 'gpu'], default=None)
+    serve_parser.add_argument('--cache', help="결과 캐시 파일 경로")
+    serve_parser.add_argument('--max-batch', type=int, default=8)
+    serve_parser.add_argument('--max-wait-ms', type=float, default=10)
+    serve_parser.add_argument('--max-queue', type=int, default=64)
+    serve_parser.add_argument('--max-body-mb', type=int, default=32)
+    serve_parser.add_argument('--unix', metavar='PATH', help="TCP 대신 Unix 소켓에서 대기 (로컬 데몬)")
+    serve_parser.add_argument('--no-warmup', action='store_true', help="시작 시 더미 추론 생략")
+    serve_parser.add_argument('--lanes', action='store_true', help="크기별 레인으로 나눠 배치 처리")
+    serve_parser.add_argument('--ocr', choices=['gpu', 'simple'], default='gpu',
+                              help="gpu: GPUAcceleratedOCR(배치 추론), simple: SimpleOCR(요청별 추론)")
+    serve_parser.add_argument('--preprocess', action='store_true', help="기울기 보정/이진화/노이즈 제거 전처리")
+    serve_parser.add_argument('--no-tiling', action='store_true', help="큰 이미지도 타일로 나누지 않음")
+    serve_parser.add_argument('--layout', action='store_true', help="응답을 읽기 순서로 정렬하고 layout 항목 추가")
+    serve_parser.add_argument('--cascade', metavar='REC_MODEL_DIR',
+                              help="2단계 캐스케이드 - 신뢰도가 낮은 라인만 이 인식 모델로 재인식")
+    serve_parser.add_argument('--cascade-threshold', type=float, default=0.85, help="2단계로 넘길 신뢰도 기준")
+    serve_parser.add_argument('--crop-cache', nargs='?', const=True, default=None, metavar='PATH',
+                              help="반복되는 텍스트 라인 인식 결과 재사용 (PATH를 주면 SQLite에 저장)")
+
+    client_parser = commands.add_parser('client', help="이미지 전송")
+    client_parser.add_argument('--url', default='http://127.0.0.1:8866')
+    client_parser.add_argument('images', nargs='+')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'client':
+        exit_code = 0
+        for image_path in args.images:
+            status, payload = post_image(args.url, image_path)
+            print(f"[{status}] {image_path}")
+            print(json.dumps(payload, ensure_ascii=False, indent=2))
+            exit_code = exit_code or (0 if status == 200 else 1)
+        return exit_code
+
+    ocr_options = {
+        'preprocess': PreprocessConfig() if args.preprocess else None,
+        'tiling': not args.no_tiling,
+        'layout': LayoutConfig() if args.layout else None,
+        'cascade': CascadeConfig(threshold=args.cascade_threshold,
+                                 heavy_options={'rec_model_dir': args.cascade}) if args.cascade else None,
+        'crop_cache': args.crop_cache
+    }
+    service = build_service(args.engine, args.lang, args.device, args.cache,
+                            warmup=not args.no_warmup, ocr_class=args.ocr, ocr_options=ocr_options,
+                            max_batch_size=args.max_batch,
+                            max_wait_ms=args.max_wait_ms, max_queue=args.max_queue,
+                            lanes=args.lanes or None)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.max_body_mb, args.unix))
+    except KeyboardInterrupt:
+        print("\nOCR 서버 종료")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
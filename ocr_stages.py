@@ -0,0 +1,189 @@
+# 검출 / 방향 분류 / 인식 단계를 분리해서 실행하는 유틸리티
+#
+# PaddleOCR 2.x의 PaddleOCR 객체(TextSystem)는 text_detector, text_classifier,
+# text_recognizer를 속성으로 가지고 있어 단계별로 호출할 수 있습니다.
+# 여러 이미지의 텍스트 라인 조각(crop)을 모아 한 번에 인식기로 보내면
+# 인식기 내부 배치(rec_batch_num)가 이미지 경계를 넘어 채워집니다.
+import time
+import numpy as np
+
+def has_stage_api(engine):
+    """엔진이 단계별 호출(검출/인식 분리)을 지원하는지 확인"""
+    return hasattr(engine, 'text_detector') and hasattr(engine, 'text_recognizer')
+
+def sort_boxes(dt_boxes):
+    """
+    검출 박스를 위→아래, 왼쪽→오른쪽 순서로 정렬 (PaddleOCR과 같은 규칙)
+
+    Args:
+        dt_boxes (numpy.ndarray): Nx4x2 박스 배열
+
+    Returns:
+        list: 정렬된 박스 목록
+    """
+    boxes = sorted(dt_boxes, key=lambda b: (b[0][1], b[0][0]))
+    for i in range(len(boxes) - 1):
+        for j in range(i, -1, -1):
+            # 같은 줄(세로 차이 10px 미만)이면 x 좌표 순으로
+            if abs(boxes[j + 1][0][1] - boxes[j][0][1]) < 10 and boxes[j + 1][0][0] < boxes[j][0][0]:
+                boxes[j], boxes[j + 1] = boxes[j + 1], boxes[j]
+            else:
+                break
+    return boxes
+
+def crop_region(image, box):
+    """
+    회전된 텍스트 영역을 원근 변환으로 잘라내기
+
+    Args:
+        image (numpy.ndarray): BGR 이미지
+        box (numpy.ndarray): 4x2 꼭짓점 좌표
+
+    Returns:
+        numpy.ndarray: 수평으로 펴진 텍스트 라인 이미지
+    """
+    points = np.asarray(box, dtype=np.float32)
+    width = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+    height = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+    width, height = max(width, 1), max(height, 1)
+
+    if (points[0, 1] == points[1, 1] and points[2, 1] == points[3, 1]
+            and points[0, 0] == points[3, 0] and points[1, 0] == points[2, 0]
+            and points[0, 0] >= 0 and points[0, 1] >= 0):
+        # 축 정렬 박스는 원근 변환 없이 잘라내기만 하면 됨
+        left, top = int(points[0, 0]), int(points[0, 1])
+        crop = image[top:top + height, left:left + width]
+    else:
+        import cv2
+
+        target = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+        matrix = cv2.getPerspectiveTransform(points, target)
+        crop = cv2.warpPerspective(image, matrix, (width, height),
+                                   borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC)
+    # 세로로 긴 영역은 세로쓰기로 보고 회전
+    if crop.shape[0] / crop.shape[1] >= 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+def detect(engine, image):
+    """
+    텍스트 영역 검출
+
+    Args:
+        engine: 단계별 호출을 지원하는 PaddleOCR 엔진
+        image (numpy.ndarray): BGR 이미지
+
+    Returns:
+        list: 정렬된 4x2 박스 목록
+    """
+    dt_boxes, _ = engine.text_detector(image)
+    if dt_boxes is None or len(dt_boxes) == 0:
+        return []
+    return sort_boxes(dt_boxes)
+
+def classify(engine, crops):
+    """
+    텍스트 방향 분류 (엔진에 방향 분류기가 켜져 있을 때만)
+
+    Args:
+        engine: PaddleOCR 엔진
+        crops (list): 텍스트 라인 이미지 목록
+
+    Returns:
+        list: 방향이 보정된 텍스트 라인 이미지 목록
+    """
+    if not crops or not getattr(engine, 'use_angle_cls', False):
+        return crops
+    classifier = getattr(engine, 'text_classifier', None)
+    if classifier is None:
+        return crops
+    crops, _, _ = classifier(crops)
+    return crops
+
+def recognize(engine, crops, groups=None):
+    """
+    텍스트 라인 인식 (인식기 내부에서 rec_batch_num 단위로 배치 처리)
+
+    Args:
+        engine: 단계별 호출을 지원하는 PaddleOCR 엔진
+        crops (list): 텍스트 라인 이미지 목록
+        groups (list): 조각별 이미지 번호 (페이지 단위로 판단하는 인식기에만 전달)
+
+    Returns:
+        list: (텍스트, 신뢰도) 목록
+    """
+    if not crops:
+        return []
+    if groups is not None and getattr(engine.text_recognizer, 'accepts_groups', False):
+        rec_res, _ = engine.text_recognizer(crops, groups)
+        return rec_res
+    rec_res, _ = engine.text_recognizer(crops)
+    return rec_res
+
+def run_batch(engine, images, rec_batch_size=None):
+    """
+    여러 이미지를 검출 후 모든 텍스트 라인을 모아 한 번에 인식
+
+    Args:
+        engine: 단계별 호출을 지원하는 PaddleOCR 엔진
+        images (list): BGR 이미지 목록
+        rec_batch_size (int): 인식 배치 크기 (None이면 엔진 설정 유지)
+
+    Returns:
+        tuple: (이미지별 원시 결과 목록, 단계별 소요 시간 dict)
+               원시 결과는 구버전 ocr()과 같은 [[박스, (텍스트, 신뢰도)], ...] 형태
+    """
+    timings = {'det': 0.0, 'cls': 0.0, 'rec': 0.0}
+    if rec_batch_size and hasattr(engine.text_recognizer, 'rec_batch_num'):
+        engine.text_recognizer.rec_batch_num = rec_batch_size
+
+    # 1. 이미지별 검출 후 라인 조각을 한 목록으로 모으기
+    all_boxes, all_crops, owners = [], [], []
+    for index, image in enumerate(images):
+        start = time.perf_counter()
+        boxes = detect(engine, image)
+        timings['det'] += time.perf_counter() - start
+        for box in boxes:
+            all_boxes.append(box)
+            all_crops.append(crop_region(image, box))
+            owners.append(index)
+
+    # 2. 방향 분류와 인식은 이미지 경계를 넘어 한 번에
+    start = time.perf_counter()
+    all_crops = classify(engine, all_crops)
+    timings['cls'] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    rec_res = recognize(engine, all_crops, owners)
+    timings['rec'] += time.perf_counter() - start
+
+    # 3. 이미지별로 다시 나누기 (엔진의 drop_score 미만은 제외)
+    drop_score = getattr(engine, 'drop_score', 0.0)
+    pages = [[] for _ in images]
+    for box, owner, (text, score) in zip(all_boxes, owners, rec_res):
+        if score >= drop_score:
+            pages[owner].append([np.asarray(box).tolist(), (text, float(score))])
+    return [[page] for page in pages], timings
+
+def predict_batch(engine, images, rec_batch_size=None):
+    """
+    이미지 목록을 엔진 종류에 맞는 방식으로 한 번에 추론
+
+    - 단계별 API(2.x): 검출은 이미지별, 방향 분류/인식은 전체 라인 조각을 한 번에
+    - predict()가 있는 최신 API: 이미지 목록을 한 번의 predict() 호출로 전달
+    - 그 외: 이미지별 ocr() 호출
+
+    Args:
+        engine: PaddleOCR 엔진
+        images (list): BGR 이미지 목록
+        rec_batch_size (int): 인식 배치 크기 (단계별 API에서만 적용)
+
+    Returns:
+        list: 이미지별 원시 결과 (단일 이미지 ocr()/predict() 결과와 같은 형태)
+    """
+    if has_stage_api(engine):
+        raw_results, _ = run_batch(engine, images, rec_batch_size)
+        return raw_results
+    if hasattr(engine, 'predict'):
+        return [[page] for page in engine.predict(images)]
+    return [engine.ocr(image) for image in images]
@@ -0,0 +1,84 @@
+# 스트리밍 처리용 이미지 선행 로드(prefetch) 유틸리티
+import io
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+import numpy as np
+from ocr_metrics import metrics
+
+def decode_image_bytes(data):
+    """
+    이미지 바이트를 PaddleOCR 입력용 BGR NumPy 배열로 디코딩
+
+    Args:
+        data (bytes): 인코딩된 이미지 바이트
+
+    Returns:
+        numpy.ndarray: HxWx3 uint8 BGR 배열
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        rgb = np.asarray(image.convert('RGB'))
+    # PaddleOCR은 OpenCV와 같은 BGR 순서를 기대함
+    return np.ascontiguousarray(rgb[:, :, ::-1])
+
+def read_and_decode(image_path):
+    """
+    이미지 파일을 읽고 디코딩
+
+    Args:
+        image_path (str): 이미지 파일 경로
+
+    Returns:
+        tuple: (원본 바이트, BGR 배열) - 원본 바이트는 캐시 키 계산에 사용
+    """
+    with metrics.stage('image_load'):
+        with open(image_path, 'rb') as f:
+            data = f.read()
+        return data, decode_image_bytes(data)
+
+def prefetch(items, loader, max_workers=2, max_ahead=4):
+    """
+    백그라운드 스레드에서 loader를 미리 실행하며 입력 순서대로 결과 반환
+
+    동시에 메모리에 올라가는 결과는 최대 max_ahead개이므로 입력 크기와
+    무관하게 메모리 사용량이 일정합니다. items는 지연 이터레이터여도 됩니다.
+
+    Args:
+        items (iterable): 입력 항목 (예: 이미지 경로)
+        loader (callable): 항목 하나를 로드하는 함수
+        max_workers (int): 로드 스레드 수
+        max_ahead (int): 최대 선행 로드 개수
+
+    Yields:
+        tuple: (항목, 로드 결과, 오류) - 로드 실패 시 결과는 None, 오류는 예외 객체
+    """
+    max_ahead = max(1, max_ahead)
+    iterator = iter(items)
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                  thread_name_prefix='ocr-prefetch')
+
+    def submit_next():
+        for item in iterator:
+            pending.append((item, executor.submit(loader, item)))
+            return True
+        return False
+
+    try:
+        while len(pending) < max_ahead and submit_next():
+            pass
+
+        while pending:
+            item, future = pending.popleft()
+            try:
+                value, error = future.result(), None
+            except Exception as e:
+                value, error = None, e
+            # 하나를 꺼낼 때마다 하나를 채워 선행 로드 개수 유지
+            submit_next()
+            yield item, value, error
+    finally:
+        # 소비자가 중간에 멈춘 경우 남은 작업 취소
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,249 @@
+# 초대형 이미지(도면, 포스터 등)를 겹치는 타일로 나눠 처리하는 유틸리티
+#
+# 검출 모델은 입력을 긴 변 960px 정도로 줄여서 처리하므로 큰 이미지를 한 번에
+# 넣으면 작은 글자가 사라지고, 전처리/후처리 버퍼 때문에 메모리도 크게 늘어납니다.
+# 타일 모드는 이미지를 겹치는 타일로 나눠 타일별로 검출/인식한 뒤 박스를 원본
+# 좌표로 옮기고, 타일 경계에 걸친 텍스트 라인을 하나로 합칩니다.
+import math
+import itertools
+import threading
+import numpy as np
+from PIL import Image
+from ocr_result import OCRResult
+from ocr_metrics import metrics
+from ocr_stages import predict_batch
+
+# 이 픽셀 수를 넘는 이미지는 자동으로 타일 모드로 처리 (약 3264x2448)
+TILE_THRESHOLD_PIXELS = 8_000_000
+
+# 타일 추론 시 메가픽셀당 추정 작업 메모리 (README 측정치 4096x3072 -> 1.2GB 기준)
+MB_PER_MEGAPIXEL = 96
+
+class TileConfig:
+    def __init__(self, threshold_pixels=TILE_THRESHOLD_PIXELS, tile_size=1600, overlap=200,
+                 workers=1, memory_limit_mb=None):
+        """
+        타일 모드 설정
+
+        Args:
+            threshold_pixels (int): 이 픽셀 수를 넘는 이미지만 타일로 처리
+            tile_size (int): 타일 한 변의 최대 길이 (px)
+            overlap (int): 이웃 타일과 겹치는 폭 (px) - 가장 큰 글자 높이보다 커야 함
+            workers (int): 동시에 처리할 타일 수 (2 이상이면 엔진 복제본 사용)
+            memory_limit_mb (float): 타일 추론 작업 메모리 한도 (MB, None이면 tile_size 그대로)
+                                     동시 처리 타일 수 x 타일 크기가 한도를 넘지 않도록 타일을 줄임
+        """
+        self.threshold_pixels = threshold_pixels
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.workers = max(1, workers)
+        self.memory_limit_mb = memory_limit_mb
+
+    def effective_tile_size(self):
+        """메모리 한도를 반영한 타일 크기"""
+        tile_size = self.tile_size
+        if self.memory_limit_mb:
+            megapixels = self.memory_limit_mb / self.workers / MB_PER_MEGAPIXEL
+            tile_size = min(tile_size, int(math.sqrt(megapixels * 1_000_000)))
+        # 겹침 영역보다 충분히 커야 타일이 전진함
+        return max(tile_size, self.overlap * 2 + 64)
+
+    def to_dict(self):
+        """결과에 영향을 주는 설정 딕셔너리 (캐시 키에 포함, 동시 처리 타일 수는 제외)"""
+        return {'threshold_pixels': self.threshold_pixels, 'tile_size': self.effective_tile_size(),
+                'overlap': self.overlap}
+
+def image_pixels(image):
+    """
+    이미지 픽셀 수 (파일은 헤더만 읽음)
+
+    Args:
+        image: 이미지 경로 또는 NumPy 배열
+
+    Returns:
+        int: 가로 x 세로 픽셀 수
+    """
+    if hasattr(image, 'shape'):
+        return int(image.shape[0]) * int(image.shape[1])
+    with Image.open(image) as pil_image:
+        width, height = pil_image.size
+    return width * height
+
+def needs_tiling(image, config):
+    """이미지가 타일 모드 대상인지 확인 (설정이 없으면 False)"""
+    if not config:
+        return False
+    return image_pixels(image) > config.threshold_pixels
+
+def iter_tiles(height, width, tile_size, overlap):
+    """
+    겹치는 타일 영역 생성
+
+    Args:
+        height (int): 이미지 높이
+        width (int): 이미지 너비
+        tile_size (int): 타일 한 변의 최대 길이
+        overlap (int): 겹치는 폭
+
+    Yields:
+        tuple: (top, left, bottom, right)
+    """
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        step = tile_size - overlap
+        count = math.ceil((length - overlap) / step)
+        # 마지막 타일이 이미지 끝에 맞도록 간격을 고르게 조정
+        return [round(i * (length - tile_size) / (count - 1)) for i in range(count)]
+
+    for top in starts(height):
+        for left in starts(width):
+            yield top, left, min(top + tile_size, height), min(left + tile_size, width)
+
+def _join_text(left_text, right_text):
+    """
+    경계에서 잘린 두 조각의 텍스트 연결 (겹침 영역에서 중복 인식된 부분 제거)
+    """
+    for size in range(min(len(left_text), len(right_text)), 0, -1):
+        if left_text.endswith(right_text[:size]):
+            return left_text + right_text[size:]
+    return f"{left_text} {right_text}"
+
+def _box_bounds(boxes):
+    """Nx4x2 박스의 축 정렬 경계 (x0, y0, x1, y1) 배열"""
+    return np.concatenate([boxes.min(axis=1), boxes.max(axis=1)], axis=1).astype(np.float32)
+
+def merge_tile_results(parts, height, width, overlap, edge_margin=4):
+    """
+    타일별 결과(원본 좌표)를 하나의 결과로 합치기
+
+    1. 박스 중심이 타일의 핵심 영역(겹침 폭의 절반을 뺀 영역)에 있는 것만 남겨
+       겹침 영역에서 두 번 인식된 라인을 제거
+    2. 타일 세로 경계에 닿은 조각 중 같은 줄에 있고 가로로 이어지는 것을 하나로 합침
+
+    Args:
+        parts (list): ((top, left, bottom, right), OCRResult) 목록 - 박스는 원본 좌표
+        height (int): 원본 이미지 높이
+        width (int): 원본 이미지 너비
+        overlap (int): 타일 겹침 폭
+        edge_margin (int): 경계에 닿았다고 볼 거리 (px)
+
+    Returns:
+        OCRResult: 합쳐진 결과
+    """
+    half = overlap / 2
+    texts, scores, boxes, has_box, seam, tile_ids = [], [], [], [], [], []
+    for tile_id, ((top, left, bottom, right), result) in enumerate(parts):
+        if not len(result):
+            continue
+        bounds = _box_bounds(result.boxes)
+        center_x = (bounds[:, 0] + bounds[:, 2]) / 2
+        center_y = (bounds[:, 1] + bounds[:, 3]) / 2
+        keep = ((center_x >= (left + half if left > 0 else 0))
+                & (center_x < (right - half if right < width else width))
+                & (center_y >= (top + half if top > 0 else 0))
+                & (center_y < (bottom - half if bottom < height else height)))
+        touches = (((bounds[:, 0] <= left + edge_margin) & (left > 0))
+                   | ((bounds[:, 2] >= right - 1 - edge_margin) & (right < width)))
+        index = np.flatnonzero(keep)
+        texts.extend(result.texts[i] for i in index)
+        scores.append(result.scores[index])
+        boxes.append(result.boxes[index])
+        has_box.append(result.has_box[index])
+        seam.append(touches[index])
+        tile_ids.append(np.full(len(index), tile_id))
+
+    if not texts:
+        return OCRResult.empty('tiled')
+    scores = np.concatenate(scores)
+    boxes = np.concatenate(boxes)
+    has_box = np.concatenate(has_box)
+    seam = np.concatenate(seam)
+    tile_ids = np.concatenate(tile_ids)
+    bounds = _box_bounds(boxes)
+    alive = np.ones(len(texts), dtype=bool)
+
+    # 경계 조각을 왼쪽부터 훑으며 같은 줄의 다른 타일 조각과 합치기
+    candidates = np.flatnonzero(seam)
+    candidates = candidates[np.argsort(bounds[candidates, 0], kind='stable')]
+    for position, i in enumerate(candidates):
+        if not alive[i]:
+            continue
+        for j in candidates[position + 1:]:
+            if not alive[j] or tile_ids[j] == tile_ids[i]:
+                continue
+            if bounds[j, 0] > bounds[i, 2] + edge_margin:
+                break
+            line_overlap = min(bounds[i, 3], bounds[j, 3]) - max(bounds[i, 1], bounds[j, 1])
+            min_height = min(bounds[i, 3] - bounds[i, 1], bounds[j, 3] - bounds[j, 1])
+            if line_overlap < 0.5 * max(min_height, 1):
+                continue
+            texts[i] = _join_text(texts[i], texts[j])
+            scores[i] = min(scores[i], scores[j])
+            bounds[i, :2] = np.minimum(bounds[i, :2], bounds[j, :2])
+            bounds[i, 2:] = np.maximum(bounds[i, 2:], bounds[j, 2:])
+            x0, y0, x1, y1 = bounds[i]
+            boxes[i] = [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+            tile_ids[i] = tile_ids[j]
+            alive[j] = False
+
+    # 위→아래, 같은 줄은 왼쪽→오른쪽 순서로 정렬
+    index = np.flatnonzero(alive)
+    line_height = max(float(np.median(bounds[index, 3] - bounds[index, 1])), 1.0)
+    rows = np.floor(bounds[index, 1] / (line_height / 2))
+    index = index[np.lexsort((bounds[index, 0], rows))]
+    return OCRResult([texts[i] for i in index], scores[index], boxes[index], 'tiled', has_box[index])
+
+def extract_tiled(engine, image, config, engine_factory=None):
+    """
+    큰 이미지를 타일로 나눠 OCR 실행
+
+    동시에 처리 중인 타일은 최대 config.workers개이므로 작업 메모리는 대략
+    workers x 타일 크기에 비례하며 원본 이미지 크기와 무관합니다.
+    (원본 이미지 자체는 디코딩된 상태로 한 번 메모리에 올라갑니다)
+
+    Args:
+        engine: PaddleOCR 엔진
+        image (numpy.ndarray): BGR 이미지
+        config (TileConfig): 타일 설정
+        engine_factory (callable): 복제본 번호를 받아 엔진을 돌려주는 함수
+                                   (workers가 2 이상일 때 스레드별 엔진 생성에 사용)
+
+    Returns:
+        OCRResult: 원본 좌표 기준으로 합쳐진 결과
+    """
+    from ocr_stream import prefetch
+
+    height, width = image.shape[:2]
+    tile_size = config.effective_tile_size()
+    tiles = list(iter_tiles(height, width, tile_size, config.overlap))
+    workers = config.workers if engine_factory is not None else 1
+    print(f"타일 모드: {width}x{height} -> {len(tiles)}개 타일 "
+          f"(크기 {tile_size}px, 겹침 {config.overlap}px, 동시 {workers}개)")
+
+    # Paddle 예측기는 스레드 안전하지 않으므로 스레드마다 별도 엔진 사용
+    local = threading.local()
+    replica_ids = itertools.count()
+
+    def run_tile(tile):
+        if not hasattr(local, 'engine'):
+            replica = next(replica_ids)
+            local.engine = engine if replica == 0 else engine_factory(replica)
+        top, left, bottom, right = tile
+        with metrics.stage('tile'):
+            raw = predict_batch(local.engine, [np.ascontiguousarray(image[top:bottom, left:right])])[0]
+            result = OCRResult.from_raw(raw)
+        # 타일 좌표 -> 원본 좌표
+        # (엔진이 돌려준 배열을 그대로 쓰는 경우가 있으므로 제자리 연산 대신 새 배열)
+        result.boxes = result.boxes + np.array([left, top], dtype=result.boxes.dtype)
+        return result
+
+    parts = []
+    for tile, result, error in prefetch(tiles, run_tile, max_workers=workers, max_ahead=workers):
+        if error is not None:
+            raise error
+        parts.append((tile, result))
+    metrics.inc('tiles', len(tiles))
+
+    with metrics.stage('tile_merge'):
+        return merge_tile_results(parts, height, width, config.overlap)
@@ -0,0 +1,233 @@
+# OCR 결과 시각화 (축소 캔버스 래스터, SVG/JSON 오버레이)
+#
+# 폰트는 한 번만 로드해 재사용하고, 박스 좌표는 배열 연산으로 한 번에 변환한 뒤
+# 한 번의 순회로 그립니다. 큰 이미지는 축소된 캔버스에 그리며, JPEG 원본은
+# 디코딩 단계에서부터 축소(draft)하여 전체 해상도 디코딩을 피합니다.
+import io
+import os
+import json
+import itertools
+from functools import lru_cache
+from xml.sax.saxutils import escape, quoteattr
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+OUTPUT_FORMATS = ('jpg', 'png', 'svg', 'json')
+
+class VisualizeConfig:
+    def __init__(self, format='jpg', max_side=None, labels=True, min_confidence=None,
+                 max_confidence=None, sample_every=1, font_path=None, font_size=14, quality=85):
+        """
+        시각화 설정
+
+        Args:
+            format (str): 'jpg', 'png' (래스터) 또는 'svg', 'json' (원본 없이 오버레이만)
+            max_side (int): 래스터 캔버스의 긴 변 최대 길이 (None이면 원본 크기)
+            labels (bool): 박스 옆에 텍스트/신뢰도 표시
+            min_confidence (float): 이 값 미만의 박스는 그리지 않음
+            max_confidence (float): 이 값 이상의 박스는 그리지 않음 (낮은 신뢰도만 확인할 때)
+            sample_every (int): N장마다 한 장만 시각화 (1이면 모두)
+            font_path (str): 라벨 폰트 파일 (한글 표시에는 한글 TrueType 폰트 필요, None이면 기본 폰트)
+            font_size (int): 라벨 폰트 크기
+            quality (int): JPEG 품질
+        """
+        if format not in OUTPUT_FORMATS:
+            raise ValueError(f"지원하지 않는 시각화 형식: {format} (지원: {', '.join(OUTPUT_FORMATS)})")
+        self.format = format
+        self.max_side = max_side
+        self.labels = labels
+        self.min_confidence = min_confidence
+        self.max_confidence = max_confidence
+        self.sample_every = max(1, sample_every)
+        self.font_path = font_path
+        self.font_size = font_size
+        self.quality = quality
+        self._counter = itertools.count()
+
+    def should_render(self):
+        """표본 추출 - 호출 순서 기준으로 sample_every장마다 True"""
+        return next(self._counter) % self.sample_every == 0
+
+    def suffix(self):
+        """출력 파일 접미사"""
+        return '_visual.jpg' if self.format == 'jpg' else f"_visual.{self.format}"
+
+DEFAULT_CONFIG = VisualizeConfig()
+
+@lru_cache(maxsize=16)
+def get_font(font_path=None, size=14):
+    """라벨 폰트 (경로/크기별로 한 번만 로드)"""
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, size)
+        except OSError as e:
+            print(f"폰트 로드 실패, 기본 폰트 사용: {e}")
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow 10.1 미만은 크기 지정 불가
+        return ImageFont.load_default()
+
+def _is_path(image):
+    return isinstance(image, (str, os.PathLike))
+
+def image_size(image):
+    """원본 이미지 크기 (width, height) - 파일/바이트는 헤더만 읽음"""
+    if hasattr(image, 'shape'):
+        return int(image.shape[1]), int(image.shape[0])
+    if isinstance(image, Image.Image):
+        return image.size
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        image = io.BytesIO(bytes(image))
+    with Image.open(image) as pil_image:
+        return pil_image.size
+
+def _load_canvas(image, max_side):
+    """
+    그리기용 RGB 캔버스와 원본 대비 축소 비율
+
+    Returns:
+        tuple: (PIL 이미지, (가로 비율, 세로 비율))
+    """
+    width, height = image_size(image)
+    target = None
+    if max_side and max(width, height) > max_side:
+        scale = max_side / max(width, height)
+        target = (max(1, round(width * scale)), max(1, round(height * scale)))
+
+    if hasattr(image, 'shape'):
+        array = np.asarray(image)
+        if target is not None:
+            # 정수 간격으로 먼저 줄인 뒤 남은 비율만 보간
+            step = max(1, int(max(width, height) / max_side))
+            array = array[::step, ::step]
+        if array.ndim == 2:
+            canvas = Image.fromarray(array).convert('RGB')
+        else:
+            canvas = Image.fromarray(np.ascontiguousarray(array[:, :, 2::-1]))
+    else:
+        if isinstance(image, Image.Image):
+            canvas = image
+        else:
+            canvas = Image.open(io.BytesIO(bytes(image)) if not _is_path(image) else image)
+            if target is not None:
+                # JPEG은 디코딩 단계에서 1/2, 1/4, 1/8로 축소 가능
+                canvas.draft('RGB', target)
+        canvas = canvas.convert('RGB')
+
+    if target is not None and canvas.size != target:
+        canvas = canvas.resize(target, Image.BILINEAR)
+    return canvas, (canvas.width / width, canvas.height / height)
+
+def select_boxes(texts, config):
+    """신뢰도 조건에 맞는 결과만 선택 (배열 연산)"""
+    mask = np.ones(len(texts), dtype=bool)
+    if config.min_confidence is not None:
+        mask &= texts.scores >= config.min_confidence
+    if config.max_confidence is not None:
+        mask &= texts.scores < config.max_confidence
+    return texts if mask.all() else texts.select(mask)
+
+def render_raster(image, texts, output_path, config=DEFAULT_CONFIG):
+    """
+    박스와 라벨을 그린 래스터 이미지 저장
+
+    Args:
+        image: 원본 이미지 (경로, 바이트, BGR 배열 또는 PIL 이미지)
+        texts (OCRResult): 표시할 결과
+        output_path (str): 출력 경로
+        config (VisualizeConfig): 시각화 설정
+    """
+    canvas, (scale_x, scale_y) = _load_canvas(image, config.max_side)
+    draw = ImageDraw.Draw(canvas)
+    if not texts.has_box.all():
+        # 박스가 없는 항목은 그리지 않음
+        texts = texts.select(texts.has_box)
+    count = len(texts)
+    if count:
+        # 모든 박스를 한 번에 축소 좌표로 변환하고 닫힌 다각형 좌표열로 만듦
+        quads = np.rint(texts.boxes.astype(np.float32) * np.array([scale_x, scale_y], dtype=np.float32))
+        closed = np.concatenate([quads, quads[:, :1]], axis=1).astype(np.int32).reshape(count, 10)
+        for points in closed.tolist():
+            draw.line(points, fill='red', width=2)
+
+        if config.labels:
+            font = get_font(config.font_path, config.font_size)
+            line_height = font.getbbox('Ag')[3] + 2
+            anchors = closed[:, :2].tolist()
+            for (x, y), text, confidence in zip(anchors, texts.texts, texts.scores.tolist()):
+                label = f"{text} ({confidence:.2f})"
+                top = max(0, y - line_height)
+                draw.rectangle((x, top, x + int(draw.textlength(label, font=font)) + 2, top + line_height),
+                               fill='yellow')
+                draw.text((x + 1, top), label, fill='black', font=font)
+
+    if config.format == 'png':
+        canvas.save(output_path, format='PNG')
+    else:
+        canvas.save(output_path, format='JPEG', quality=config.quality)
+
+def write_svg_overlay(texts, size, output_path, image_href=None):
+    """
+    원본 좌표계의 SVG 오버레이 저장 (원본 이미지 위에 겹쳐 보거나 브라우저에서 확인)
+
+    Args:
+        texts (OCRResult): 표시할 결과
+        size (tuple): 원본 크기 (width, height)
+        output_path (str): 출력 경로
+        image_href (str): 배경으로 참조할 원본 이미지 경로 (None이면 박스만)
+    """
+    width, height = size
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'viewBox="0 0 {width} {height}">']
+    if image_href:
+        parts.append(f'<image href={quoteattr(image_href)} width="{width}" height="{height}"/>')
+    parts.append('<g fill="none" stroke="red" stroke-width="2">')
+    for text, confidence, quad, present in zip(texts.texts, texts.scores.tolist(), texts.boxes.tolist(),
+                                               texts.has_box.tolist()):
+        if not present:
+            continue
+        points = ' '.join(f"{x},{y}" for x, y in quad)
+        parts.append(f'<polygon points="{points}"><title>{escape(text)} ({confidence:.2f})</title></polygon>')
+    parts.append('</g></svg>')
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+
+def write_json_overlay(texts, size, output_path):
+    """원본 좌표계의 경량 JSON 오버레이 저장 (열 형식: texts, scores, boxes)"""
+    width, height = size
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'width': width,
+            'height': height,
+            'texts': texts.texts,
+            'scores': np.round(texts.scores, 4).tolist(),
+            'boxes': [box if present else [] for box, present in zip(texts.boxes.tolist(), texts.has_box.tolist())]
+        }, f, ensure_ascii=False, separators=(',', ':'))
+
+def visualize(image, texts, output_path, config=None):
+    """
+    설정에 따라 결과 시각화 저장
+
+    Args:
+        image: 원본 이미지 (경로, 바이트, BGR 배열 또는 PIL 이미지)
+        texts (OCRResult): 추출 결과
+        output_path (str): 출력 경로
+        config (VisualizeConfig): 시각화 설정 (None이면 기본값: 원본 크기 JPEG)
+
+    Returns:
+        str: 저장한 경로 (표본 추출로 건너뛰면 None)
+    """
+    config = config or DEFAULT_CONFIG
+    if not config.should_render():
+        return None
+    texts = select_boxes(texts, config)
+    if config.format == 'svg':
+        write_svg_overlay(texts, image_size(image), output_path,
+                          image_href=os.fspath(image) if _is_path(image) else None)
+    elif config.format == 'json':
+        write_json_overlay(texts, image_size(image), output_path)
+    else:
+        render_raster(image, texts, output_path, config)
+    print(f"시각화 저장: {output_path}")
+    return output_path
@@ -0,0 +1,358 @@
+# 여러 장비가 하나의 입력 집합을 나눠 처리하는 임대(lease) 기반 작업 대기열
+#
+# 공유 스토리지의 SQLite 파일 하나를 대기열로 사용합니다. 워커는 항목을 일정 시간
+# 임대하여 가져가고, 처리하는 동안 주기적으로 임대를 연장합니다. 워커가 죽으면
+# 임대가 만료되어 다른 워커가 그 항목을 다시 가져갑니다.
+#
+# 네트워크 파일 시스템에서는 WAL의 공유 메모리가 동작하지 않으므로 롤백 저널
+# (journal_mode=DELETE)과 파일 잠금만 사용합니다. 공유 스토리지는 POSIX 파일 잠금을
+# 지원해야 합니다 (NFSv4, SMB 등). 한 대의 Linux 장비에서 여러 워커 프로세스로도 테스트할 수 있습니다.
+import os
+import sys
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+
+class WorkQueue:
+    def __init__(self, queue_path="ocr_queue.sqlite", lease_seconds=300, max_attempts=3,
+                 worker_id=None, poll_seconds=5.0):
+        """
+        임대 기반 공유 작업 대기열
+
+        Args:
+            queue_path (str): 대기열 데이터베이스 파일 경로 (모든 워커가 같은 파일 사용)
+            lease_seconds (float): 임대 시간 - 이 시간 동안 연장이 없으면 다른 워커가 가져감
+            max_attempts (int): 항목별 최대 시도 횟수 (초과하면 'failed'로 확정)
+            worker_id (str): 워커 이름 (None이면 '호스트:PID')
+            poll_seconds (float): 다른 워커의 임대가 남아 있을 때 다시 확인하는 간격
+        """
+        self.queue_path = queue_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self._deferred = []
+        # iter_claims()로 반환했지만 아직 complete()되지 않은 경로
+        self._in_flight = set()
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread = None
+
+        parent = os.path.dirname(os.path.abspath(queue_path))
+        os.makedirs(parent, exist_ok=True)
+        self._connect()
+
+    def _connect(self):
+        """현재 프로세스용 연결 반환 (fork 후에는 새로 연결)"""
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        conn = sqlite3.connect(self.queue_path, timeout=60, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "path TEXT PRIMARY KEY, status TEXT NOT NULL, owner TEXT, lease_until REAL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, finished REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, lease_until)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS workers ("
+            "worker_id TEXT PRIMARY KEY, started REAL NOT NULL, last_seen REAL NOT NULL, "
+            "completed INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def _transaction(self, func):
+        """쓰기 트랜잭션 하나로 func(conn) 실행 (시작 시점에 쓰기 잠금 획득)"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def enqueue(self, paths, batch=1000):
+        """
+        입력 경로 추가 (이미 있는 경로는 무시하므로 여러 워커가 같은 트리를 넣어도 안전)
+
+        Args:
+            paths (iterable): 입력 경로 (지연 이터레이터 가능)
+            batch (int): 한 트랜잭션에 넣을 경로 수
+
+        Returns:
+            int: 새로 추가된 항목 수
+        """
+        added = 0
+        iterator = iter(paths)
+        while True:
+            rows = [(os.fspath(path),) for _, path in zip(range(batch), iterator)]
+            if not rows:
+                return added
+
+            def insert(conn, rows=rows):
+                before = conn.total_changes
+                conn.executemany("INSERT OR IGNORE INTO tasks (path, status) VALUES (?, 'pending')", rows)
+                return conn.total_changes - before
+            added += self._transaction(insert)
+
+    def claim(self, count=8):
+        """
+        처리할 항목을 최대 count개 임대
+
+        대기 중인 항목과 임대가 만료된 항목(죽은 워커의 항목)을 가져갑니다.
+        시도 횟수가 한도에 도달한 채 임대가 만료된 항목은 'failed'로 확정합니다.
+
+        Returns:
+            list: 임대한 경로 목록 (가져갈 항목이 없으면 빈 목록)
+        """
+        def take(conn):
+            now = time.time()
+            conn.execute("UPDATE tasks SET status = 'failed', owner = NULL, "
+                         "error = COALESCE(error, '임대 만료 (워커 중단)') "
+                         "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                         (now, self.max_attempts))
+            rows = conn.execute(
+                "SELECT path FROM tasks WHERE status = 'pending' "
+                "OR (status = 'leased' AND lease_until < ?) LIMIT ?", (now, count)).fetchall()
+            paths = [row[0] for row in rows]
+            # 처음 임대할 때 워커 등록 (status 조회만 하는 프로세스는 워커 목록에 나타나지 않음)
+            conn.execute("INSERT OR IGNORE INTO workers VALUES (?, ?, ?, 0)", (self.worker_id, now, now))
+            conn.executemany(
+                "UPDATE tasks SET status = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE path = ?", [(self.worker_id, now + self.lease_seconds, path) for path in paths])
+            conn.execute("UPDATE workers SET last_seen = ? WHERE worker_id = ?", (now, self.worker_id))
+            return paths
+        return self._transaction(take)
+
+    def heartbeat(self):
+        """이 워커가 임대 중인 모든 항목의 임대 연장"""
+        def extend(conn):
+            now = time.time()
+            conn.execute("UPDATE tasks SET lease_until = ? WHERE status = 'leased' AND owner = ?",
+                         (now + self.lease_seconds, self.worker_id))
+            conn.execute("UPDATE workers SET last_seen = ? WHERE worker_id = ?", (now, self.worker_id))
+        self._transaction(extend)
+
+    def start_heartbeat(self, interval=None):
+        """백그라운드 스레드에서 주기적으로 임대 연장 (기본 간격: 임대 시간의 1/3)"""
+        if self._heartbeat_thread is not None:
+            return
+        interval = interval or max(1.0, self.lease_seconds / 3)
+
+        def run():
+            while not self._heartbeat_stop.wait(interval):
+                try:
+                    self.heartbeat()
+                except sqlite3.Error as e:
+                    print(f"임대 연장 실패: {e}")
+
+        self._heartbeat_thread = threading.Thread(target=run, name='ocr-queue-heartbeat', daemon=True)
+        self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        if self._heartbeat_thread is not None:
+            self._heartbeat_stop.set()
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+            self._heartbeat_stop.clear()
+
+    def complete(self, path, status, error=None, defer=False):
+        """
+        처리 결과 기록
+
+        Args:
+            path (str): 임대한 경로
+            status (str): 'saved', 'empty' 또는 'error' - 'error'는 시도 횟수가 남아 있으면 다시 대기
+            error (str): 오류 메시지
+            defer (bool): True면 commit()을 호출할 때 기록 (결과가 디스크에 확정된 뒤 기록하는 경우)
+        """
+        with self._lock:
+            self._deferred.append((os.fspath(path), status, error, time.time()))
+            self._in_flight.discard(os.fspath(path))
+        if not defer:
+            self.commit()
+
+    def commit(self):
+        """미뤄 둔 처리 결과를 한 트랜잭션으로 기록 (임대를 빼앗긴 항목은 무시)"""
+        with self._lock:
+            rows, self._deferred = self._deferred, []
+        if not rows:
+            return
+
+        def finish(conn):
+            done = [(status, error, finished, path, self.worker_id)
+                    for path, status, error, finished in rows if status != 'error']
+            failed = [(self.max_attempts, error, finished, path, self.worker_id)
+                      for path, status, error, finished in rows if status == 'error']
+            conn.executemany("UPDATE tasks SET status = ?, error = ?, finished = ?, lease_until = NULL "
+                             "WHERE path = ? AND owner = ? AND status = 'leased'", done)
+            # 시도 횟수가 남았으면 다시 대기열로, 아니면 실패로 확정
+            conn.executemany("UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                             "error = ?, finished = ?, owner = NULL, lease_until = NULL "
+                             "WHERE path = ? AND owner = ? AND status = 'leased'", failed)
+            conn.execute("UPDATE workers SET completed = completed + ?, last_seen = ? WHERE worker_id = ?",
+                         (len(done), time.time(), self.worker_id))
+        self._transaction(finish)
+
+    def release(self):
+        """이 워커가 임대 중인 항목을 대기 상태로 반환 (정상 종료 시, 시도 횟수는 되돌림)"""
+        def give_back(conn):
+            conn.execute("UPDATE tasks SET status = 'pending', owner = NULL, lease_until = NULL, "
+                         "attempts = MAX(attempts - 1, 0) WHERE status = 'leased' AND owner = ?",
+                         (self.worker_id,))
+        self._transaction(give_back)
+        with self._lock:
+            self._in_flight.clear()
+
+    def iter_claims(self, batch=8, wait=True):
+        """
+        대기열이 빌 때까지 항목을 임대하여 하나씩 반환 (처리 중에는 임대 자동 연장)
+
+        Args:
+            batch (int): 한 번에 임대할 항목 수
+            wait (bool): 다른 워커가 임대 중인 항목이 남아 있으면 만료될 때까지 기다렸다가
+                         가져갈지 여부 (False면 대기 중인 항목이 없을 때 바로 종료)
+                         반환한 항목이 아직 처리 중이면 기다리지 않고 종료 - 소비자가 선행 로드로
+                         다음 항목을 요청하는 동안 기다리면 두 워커가 서로의 임대를 기다리게 됨
+
+        Yields:
+            str: 임대한 경로
+        """
+        self.start_heartbeat()
+        while True:
+            paths = self.claim(batch)
+            if paths:
+                with self._lock:
+                    self._in_flight.update(paths)
+                yield from paths
+                continue
+            # 이 워커의 임대(처리 중이거나 커밋을 미룬 항목)는 기다리지 않음
+            with self._lock:
+                busy = bool(self._in_flight)
+            if not wait or busy or not self._has_foreign_leases():
+                return
+            time.sleep(self.poll_seconds)
+
+    def _has_foreign_leases(self):
+        """다른 워커가 임대 중인 항목이 있는지 확인"""
+        with self._lock:
+            conn = self._connect()
+            return conn.execute("SELECT 1 FROM tasks WHERE status = 'leased' AND owner != ? LIMIT 1",
+                                (self.worker_id,)).fetchone() is not None
+
+    def progress(self, window_seconds=60):
+        """
+        전체 워커의 진행 상황과 처리량
+
+        Args:
+            window_seconds (float): 최근 처리량을 계산할 구간 (초)
+
+        Returns:
+            dict: 상태별 항목 수, 전체/최근 처리량(항목/초), 워커별 처리 건수와 최근 처리량
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+            first, last = conn.execute("SELECT MIN(started), MAX(last_seen) FROM workers").fetchone()
+            recent = dict(conn.execute(
+                "SELECT owner, COUNT(*) FROM tasks WHERE finished >= ? AND status IN ('saved', 'empty') "
+                "GROUP BY owner", (now - window_seconds,)).fetchall())
+            workers = conn.execute(
+                "SELECT worker_id, completed, last_seen FROM workers ORDER BY worker_id").fetchall()
+        finished = counts.get('saved', 0) + counts.get('empty', 0)
+        elapsed = (last - first) if first is not None and last > first else 0.0
+        return {
+            'total': sum(counts.values()),
+            'pending': counts.get('pending', 0),
+            'leased': counts.get('leased', 0),
+            'saved': counts.get('saved', 0),
+            'empty': counts.get('empty', 0),
+            'failed': counts.get('failed', 0),
+            'items_per_sec': finished / elapsed if elapsed else 0.0,
+            'recent_items_per_sec': sum(recent.values()) / window_seconds,
+            'workers': [{
+                'worker_id': worker_id,
+                'completed': completed,
+                'recent_items_per_sec': recent.get(worker_id, 0) / window_seconds,
+                'active': now - last_seen < self.lease_seconds
+            } for worker_id, completed, last_seen in workers]
+        }
+
+    def print_progress(self):
+        """진행 상황 출력"""
+        report = self.progress()
+        done = report['saved'] + report['empty'] + report['failed']
+        print(f"\n=== 작업 대기열: {self.queue_path} ===")
+        print(f"전체 {report['total']}개 | 완료 {done}개 (텍스트 없음 {report['empty']}, 실패 {report['failed']}) | "
+              f"처리 중 {report['leased']}개 | 대기 {report['pending']}개")
+        print(f"처리량: 전체 평균 {report['items_per_sec']:.2f}개/초, "
+              f"최근 {report['recent_items_per_sec']:.2f}개/초")
+        for worker in report['workers']:
+            state = '활성' if worker['active'] else '중지'
+            print(f"  {worker['worker_id']:<32} {state} 완료 {worker['completed']:>8}개 "
+                  f"최근 {worker['recent_items_per_sec']:.2f}개/초")
+
+    def close(self):
+        """임대 연장을 멈추고, 기록하지 못한 결과를 기록한 뒤 남은 임대를 반환"""
+        self.stop_heartbeat()
+        self.commit()
+        self.release()
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="공유 OCR 작업 대기열 관리")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = commands.add_parser('enqueue', help="폴더의 이미지를 대기열에 추가")
+    enqueue_parser.add_argument('queue')
+    enqueue_parser.add_argument('input_folder')
+
+    status_parser = commands.add_parser('status', help="전체 워커의 진행 상황")
+    status_parser.add_argument('queue')
+    status_parser.add_argument('--watch', type=float, default=None, help="N초마다 반복 출력")
+
+    args = parser.parse_args(argv)
+    queue = WorkQueue(args.queue, worker_id=f"{socket.gethostname()}:{args.command}")
+
+    if args.command == 'enqueue':
+        from ocr_files import iter_files
+        # batch_process와 같은 키 (루트 기준 상대 경로) - 처리할 때 입력 폴더와 다시 결합
+        added = queue.enqueue(os.path.relpath(path, args.input_folder)
+                              for path in iter_files(args.input_folder, include_documents=True))
+        print(f"대기열에 {added}개 추가")
+        return 0
+
+    try:
+        while True:
+            queue.print_progress()
+            if not args.watch:
+                break
+            time.sleep(args.watch)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+# 대량 배치용 샤드 출력 (추가 전용 JSONL + 선택적 열 기반 파일 + 매니페스트)
+#
+# 이미지마다 작은 파일을 만드는 대신 결과 레코드를 일정 크기의 샤드 파일에
+# 이어 씁니다. 샤드가 닫힐 때만 fsync하고 매니페스트를 갱신하므로, 매니페스트에
+# 기록된 샤드는 모두 디스크에 완전히 기록된 것입니다.
+import os
+import json
+import time
+import numpy as np
+
+MANIFEST_NAME = 'manifest.json'
+COLUMNAR_FORMATS = ('npz', 'parquet')
+
+def _fsync_write(path, content):
+    """임시 파일에 쓰고 fsync한 뒤 교체 (매니페스트용)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class ShardedResultWriter:
+    def __init__(self, output_dir, prefix='ocr', shard_records=10000, shard_bytes=256 * 1024 * 1024,
+                 columnar=None, buffer_bytes=1024 * 1024, on_shard_closed=None):
+        """
+        OCR 결과를 추가 전용 샤드 파일로 기록하는 출력기
+
+        레코드 형식은 save_results()의 JSON과 같습니다 ({'image_path', 'total_blocks',
+        'results'}, 다중 페이지 문서는 'page_index' 추가, 실패는 'error').
+
+        Args:
+            output_dir (str): 출력 폴더
+            prefix (str): 샤드 파일 이름 접두사
+            shard_records (int): 샤드당 최대 레코드 수
+            shard_bytes (int): 샤드당 최대 JSONL 크기 (바이트)
+            columnar (str): 열 기반 출력 형식 ('npz', 'parquet' 또는 None)
+                            parquet은 pyarrow가 설치되어 있어야 함
+            buffer_bytes (int): 파일 쓰기 버퍼 크기
+            on_shard_closed (callable): 샤드가 디스크에 확정되고 매니페스트에 등록된 뒤 호출할 함수
+                                        (예: 배치 진행 기록 커밋)
+        """
+        if columnar is not None and columnar not in COLUMNAR_FORMATS:
+            raise ValueError(f"지원하지 않는 열 기반 형식: {columnar} (지원: {', '.join(COLUMNAR_FORMATS)})")
+        if columnar == 'parquet':
+            import pyarrow  # 설치 여부를 시작할 때 확인
+
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.shard_records = max(1, shard_records)
+        self.shard_bytes = shard_bytes
+        self.columnar = columnar
+        self.buffer_bytes = buffer_bytes
+        self.on_shard_closed = on_shard_closed
+        # 같은 폴더에 여러 번 실행해도 기존 샤드를 덮어쓰지 않도록 실행 ID 사용
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.manifest = self._load_manifest()
+        self.manifest['runs'].append({'run_id': self.run_id, 'started': time.time(), 'complete': False})
+        self._shard_index = 0
+        self._file = None
+        self._closed = False
+        self.total_records = 0
+
+    def _load_manifest(self):
+        """기존 매니페스트 읽기 (없으면 새로 생성) - 이전 실행의 샤드 목록을 이어서 기록"""
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        return {'format_version': 1, 'shards': [], 'runs': [], 'total_records': 0}
+
+    def _open_shard(self):
+        name = f"{self.prefix}-{self.run_id}-{self._shard_index:05d}"
+        self._shard_name = name
+        self._shard_path = os.path.join(self.output_dir, f"{name}.jsonl")
+        self._file = open(self._shard_path, 'ab', buffering=self.buffer_bytes)
+        self._shard_count = 0
+        self._shard_size = 0
+        self._columns = {'image_path': [], 'page_index': [], 'line_count': [],
+                         'text': [], 'confidence': [], 'bbox': [], 'has_bbox': []}
+
+    def write(self, image_path, texts, error=None, page_index=None):
+        """
+        결과 한 건 기록 (버퍼에 추가, 샤드 경계에서만 디스크 동기화)
+
+        Args:
+            image_path (str): 이미지(또는 문서) 경로
+            texts (OCRResult): OCR 결과
+            error: 처리 오류 (예외 객체 또는 메시지, 없으면 None)
+            page_index (int): 다중 페이지 문서의 페이지 번호
+        """
+        if self._file is None:
+            self._open_shard()
+
+        record = {'image_path': image_path}
+        if page_index is not None:
+            record['page_index'] = page_index
+        if error is not None:
+            record['error'] = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+        record['total_blocks'] = len(texts)
+        record['results'] = texts.to_dicts()
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+        self._file.write(line)
+
+        if self.columnar is not None:
+            columns = self._columns
+            columns['image_path'].append(image_path)
+            columns['page_index'].append(-1 if page_index is None else page_index)
+            columns['line_count'].append(len(texts))
+            columns['text'].extend(texts.texts)
+            columns['confidence'].append(texts.scores)
+            columns['bbox'].append(texts.boxes)
+            columns['has_bbox'].append(texts.has_box)
+
+        self._shard_count += 1
+        self._shard_size += len(line)
+        self.total_records += 1
+        if self._shard_count >= self.shard_records or self._shard_size >= self.shard_bytes:
+            self._close_shard()
+
+    def _close_shard(self):
+        """현재 샤드를 디스크에 동기화하고 매니페스트에 등록"""
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+        shard = {
+            'run_id': self.run_id,
+            'jsonl': os.path.basename(self._shard_path),
+            'records': self._shard_count,
+            'bytes': self._shard_size
+        }
+        if self.columnar is not None:
+            shard['columnar'] = os.path.basename(self._write_columnar())
+        self.manifest['shards'].append(shard)
+        self.manifest['total_records'] += self._shard_count
+        self._save_manifest()
+        self._shard_index += 1
+        if self.on_shard_closed is not None:
+            self.on_shard_closed()
+
+    def _write_columnar(self):
+        """
+        현재 샤드의 결과를 열 기반 파일로 저장
+
+        라인 단위 열(text, confidence, bbox, has_bbox - 박스가 없는 라인의 bbox는 0)과 이미지 단위 열(image_path, page_index,
+        line_count)로 나뉘며, line_count의 누적합으로 라인이 어느 이미지에 속하는지 알 수 있습니다.
+        """
+        columns = self._columns
+        confidence = (np.concatenate(columns['confidence']) if columns['confidence']
+                      else np.zeros(0, dtype=np.float32))
+        bbox = (np.concatenate(columns['bbox']) if columns['bbox']
+                else np.zeros((0, 4, 2), dtype=np.int32))
+        has_bbox = (np.concatenate(columns['has_bbox']) if columns['has_bbox']
+                    else np.zeros(0, dtype=bool))
+        line_count = np.asarray(columns['line_count'], dtype=np.int32)
+        page_index = np.asarray(columns['page_index'], dtype=np.int32)
+        base = os.path.join(self.output_dir, self._shard_name)
+
+        if self.columnar == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            image_ids = np.repeat(np.arange(len(line_count), dtype=np.int32), line_count)
+            table = pa.table({
+                'image_path': pa.array(columns['image_path'], pa.string()).take(pa.array(image_ids)),
+                'page_index': page_index[image_ids],
+                'text': pa.array(columns['text'], pa.string()),
+                'confidence': confidence,
+                'bbox': pa.FixedSizeListArray.from_arrays(pa.array(bbox.reshape(-1)), 8),
+                'has_bbox': has_bbox
+            })
+            path = f"{base}.parquet"
+            pq.write_table(table, path)
+        else:
+            path = f"{base}.npz"
+            with open(path, 'wb') as f:
+                np.savez(f, image_path=np.asarray(columns['image_path'], dtype=str),
+                         page_index=page_index, line_count=line_count,
+                         text=np.asarray(columns['text'], dtype=str),
+                         confidence=confidence, bbox=bbox, has_bbox=has_bbox)
+                f.flush()
+                os.fsync(f.fileno())
+        return path
+
+    def _save_manifest(self):
+        _fsync_write(self.manifest_path, json.dumps(self.manifest, ensure_ascii=False, indent=2))
+
+    def close(self):
+        """마지막 샤드를 닫고 실행 완료를 매니페스트에 기록"""
+        if self._closed:
+            return
+        self._close_shard()
+        self.manifest['runs'][-1].update({'complete': True, 'finished': time.time(),
+                                          'records': self.total_records})
+        self._save_manifest()
+        self._closed = True
+        print(f"샤드 출력 완료: {self.total_records}건, 매니페스트 {self.manifest_path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def iter_records(output_dir):
+    """
+    매니페스트에 등록된 샤드의 레코드를 순서대로 읽기
+
+    Args:
+        output_dir (str): 샤드 출력 폴더
+
+    Yields:
+        dict: 결과 레코드
+    """
+    with open(os.path.join(output_dir, MANIFEST_NAME), encoding='utf-8') as f:
+        manifest = json.load(f)
+    for shard in manifest['shards']:
+        with open(os.path.join(output_dir, shard['jsonl']), encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
@@ -0,0 +1,63 @@
+# 레이아웃 분석 테스트 (표 격자 / 영수증 / 다단 기사의 읽기 순서)
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ocr_layout import LayoutConfig, analyze_layout
+from ocr_result import OCRResult
+
+def _box(x, y, width, height=30):
+    return [[x, y], [x + width, y], [x + width, y + height], [x, y + height]]
+
+def _result(items):
+    """(텍스트, 박스) 목록으로 결과 생성 - 검출 순서를 섞어 읽기 순서가 정렬에서 나오는지 확인"""
+    items = [items[i] for i in np.random.default_rng(0).permutation(len(items))]
+    return OCRResult([text for text, _ in items], np.ones(len(items)), [box for _, box in items])
+
+def _analyze(items):
+    result = _result(items)
+    layout = analyze_layout(result, LayoutConfig(tables=True))
+    return layout.text(result), layout.to_dict(result)
+
+@pytest.mark.parametrize('columns', [2, 3])
+def test_uniform_grid_reads_by_row(columns):
+    items = [(f"{'kvw'[c]}{r}", _box(100 + 300 * c, 100 + 50 * r, 150))
+             for r in range(4) for c in range(columns)]
+
+    text, structure = _analyze(items)
+
+    assert text == '\n'.join('\t'.join(f"{'kvw'[c]}{r}" for c in range(columns)) for r in range(4))
+    assert [p['type'] for p in structure['paragraphs']] == ['table']
+    assert structure['columns'] == 1
+
+def test_receipt_reads_item_and_price_rows():
+    rows = [('아메리카노', 160, '4,500'), ('카페라떼', 130, '5,000'),
+            ('치즈케이크', 170, '6,500'), ('합계', 70, '16,000')]
+    items = []
+    for r, (name, width, price) in enumerate(rows):
+        items.append((name, _box(40, 80 + 40 * r, width)))
+        items.append((price, _box(420, 80 + 40 * r, 12 * len(price))))
+
+    text, structure = _analyze(items)
+
+    assert text == '\n'.join(f"{name}\t{price}" for name, _, price in rows)
+    assert [p['type'] for p in structure['paragraphs']] == ['table']
+
+def test_two_column_article_reads_column_by_column():
+    # 양쪽 정렬된 두 단 (줄 높이가 맞고 폭이 같음, 문단 끝 줄만 짧음)
+    items = []
+    for c, x in enumerate((50, 410)):
+        for r in range(6):
+            width = 180 if r == 5 else 300
+            items.append((f"c{c}l{r}", _box(x, 100 + 40 * r, width)))
+
+    text, structure = _analyze(items)
+
+    assert text == '\n\n'.join('\n'.join(f"c{c}l{r}" for r in range(6)) for c in range(2))
+    assert [(p['type'], p['column']) for p in structure['paragraphs']] == [('text', 0), ('text', 1)]
+    assert structure['columns'] == 2
@@ -0,0 +1,79 @@
+# 공유 작업 대기열 다중 프로세스 테스트 (가짜 엔진 사용, PaddleOCR 불필요)
+import os
+import sys
+import sqlite3
+import subprocess
+
+import numpy as np
+import pytest
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ocr_workqueue import main as workqueue_main
+
+SCRIPT = os.path.join(ROOT, '1. PaddleOCR.py')
+
+def _make_tree(folder, count=12):
+    """하위 폴더를 포함한 입력 트리 생성 (상대 경로 목록 반환)"""
+    rng = np.random.default_rng(0)
+    relatives = []
+    for index in range(count):
+        relative = os.path.join('scans' if index % 2 else 'forms', f"page_{index:02d}.png")
+        path = os.path.join(folder, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Image.fromarray(rng.integers(0, 255, (64, 96, 3), dtype=np.uint8)).save(path)
+        relatives.append(relative)
+    return relatives
+
+def _run_workers(input_folder, output_folder, queue_path, extra=(), count=2, timeout=120):
+    """같은 대기열로 batch_process 프로세스 여러 개를 동시에 실행하고 종료 코드 반환"""
+    command = [sys.executable, SCRIPT, 'batch', input_folder, output_folder,
+               '--queue', queue_path, '--device', 'stub', *extra]
+    processes = [subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                 for _ in range(count)]
+    codes = []
+    try:
+        for process in processes:
+            # 대기열이 빈 뒤에도 끝나지 않으면 TimeoutExpired로 실패
+            _, stderr = process.communicate(timeout=timeout)
+            assert process.returncode == 0, stderr.decode('utf-8', 'replace')
+            codes.append(process.returncode)
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+    return codes
+
+def _statuses(queue_path):
+    with sqlite3.connect(queue_path) as conn:
+        return dict(conn.execute("SELECT path, status FROM tasks").fetchall())
+
+@pytest.mark.parametrize('chunk_args', [(), ('--workers', '2')])
+def test_two_workers_drain_queue(tmp_path, chunk_args):
+    input_folder = str(tmp_path / 'in')
+    output_folder = str(tmp_path / 'out')
+    queue_path = str(tmp_path / 'queue.sqlite')
+    relatives = _make_tree(input_folder)
+
+    _run_workers(input_folder, output_folder, queue_path, chunk_args)
+
+    statuses = _statuses(queue_path)
+    assert sorted(statuses) == sorted(relatives)
+    assert set(statuses.values()) <= {'saved', 'empty'}
+    for relative in relatives:
+        assert os.path.exists(os.path.join(output_folder, os.path.splitext(relative)[0] + '.txt'))
+
+def test_enqueue_command_uses_batch_keys(tmp_path):
+    input_folder = str(tmp_path / 'in')
+    output_folder = str(tmp_path / 'out')
+    queue_path = str(tmp_path / 'queue.sqlite')
+    relatives = _make_tree(input_folder)
+
+    assert workqueue_main(['enqueue', queue_path, input_folder]) == 0
+    assert sorted(_statuses(queue_path)) == sorted(relatives)
+
+    _run_workers(input_folder, output_folder, queue_path, ('--no-enqueue',))
+
+    assert set(_statuses(queue_path).values()) <= {'saved', 'empty'}